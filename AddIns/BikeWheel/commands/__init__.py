@@ -1,6 +1,10 @@
 # Here you define the commands that will be added to your add-in.
+import time
+from ..lib import fusion360utils as futil
 
 # Import the modules corresponding to the commands you created.
+# The entry modules only hold the command's identity and event wiring, each one imports its logic module
+# the first time its command is run.
 # If you want to add an additional command, duplicate one of the existing directories and import it here.
 # You need to use aliases (import "entry" as "my_module") assuming you have the default module named "entry".
 from .spoke import entry as Spoke
@@ -21,8 +25,12 @@ commands = [
 # Assumes you defined a "start" function in each of your modules.
 # The start function will be run when the add-in is started.
 def start():
+    total = time.perf_counter()
     for command in commands:
+        start = time.perf_counter()
         command.start()
+        futil.log(f'{command.CMD_NAME} registered in {(time.perf_counter() - start) * 1000:.1f} ms')
+    futil.log(f'Commands registered in {(time.perf_counter() - total) * 1000:.1f} ms')
 
 
 # Assumes you defined a "stop" function in each of your modules.
@@ -1,9 +1,12 @@
+import json
 import os
 from math import pi
 from enum import Enum
 
 import adsk.core as core
 import adsk.fusion as fusion
+from ...lib import catalog, geometryutils, preview, profiling, fusion360utils as futil
+from ... import config
 
 app = core.Application.get()
 if app:
@@ -15,6 +18,11 @@ if not design:
     alert("You must be in the design workspace to use this command")
 skipValidate = False
 
+# Attribute group used to find hubs built earlier, in this session or before the document was saved
+ATTRIBUTE_GROUP = config.attribute_group
+
+PREVIEW_EVENT_ID = f"{config.COMPANY_NAME}_{config.ADDIN_NAME}_hubPreview"
+
 class HubType(Enum):
     Front = 1
     Rear = 2
@@ -30,106 +38,10 @@ class AxleType(Enum):
     ThruRoad = 3
     ThruMTB = 4
 
-hubData = {
-    "Chris King R45D CL Front": {
-        "type": HubType.Front,
-        "brake": BrakeType.CenterLock,
-        "axle": AxleType.ThruRoad,
-        "old": 10.0,
-        "leftFlangeDia": 5.74,
-        "rightFlangeDia": 5.74,
-        "centerToLeftFlange": 2.23,
-        "centerToRightFlange": 3.06,
-    },
-    "Chris King R45D CL Rear": {
-        "type": HubType.Rear,
-        "brake": BrakeType.CenterLock,
-        "axle": AxleType.ThruRoad,
-        "old": 14.2,
-        "leftFlangeDia": 5.74,
-        "rightFlangeDia": 5.74,
-        "centerToLeftFlange": 3.3,
-        "centerToRightFlange": 1.87,
-    },
-    "Hope Pro 4 Boost Front": {
-        "type": HubType.Front,
-        "brake": BrakeType.Sixbolt,
-        "axle": AxleType.ThruMTB,
-        "old": 11.0,
-        "leftFlangeDia": 5.7,
-        "rightFlangeDia": 5.7,
-        "centerToLeftFlange": 2.5,
-        "centerToRightFlange": 3.3,
-    },
-    "Hope Pro 4 Boost Rear": {
-        "type": HubType.Rear,
-        "brake": BrakeType.Sixbolt,
-        "axle": AxleType.ThruMTB,
-        "old": 14.8,
-        "leftFlangeDia": 5.7,
-        "rightFlangeDia": 5.7,
-        "centerToLeftFlange": 3.5,
-        "centerToRightFlange": 2.2,
-    },
-    "Phil Wood CL Shimano Compatible Front": {
-        "type": HubType.Front,
-        "brake": BrakeType.CenterLock,
-        "axle": AxleType.QR,
-        "old": 10.0,
-        "leftFlangeDia": 6.6,
-        "rightFlangeDia": 6.6,
-        "centerToLeftFlange": 1.9,
-        "centerToRightFlange": 3.4,
-    },
-    "Phil Wood CL Shimano Compatible Rear": {
-        "type": HubType.Rear,
-        "brake": BrakeType.CenterLock,
-        "axle": AxleType.QR,
-        "old": 13.5,
-        "leftFlangeDia": 6.6,
-        "rightFlangeDia": 6.6,
-        "centerToLeftFlange": 3.5,
-        "centerToRightFlange": 1.8,
-    },
-    "White Industries Track Front": {
-        "type": HubType.Front,
-        "brake": BrakeType.Rim,
-        "axle": AxleType.Solid,
-        "old": 10.0,
-        "leftFlangeDia": 6.5,
-        "rightFlangeDia": 6.5,
-        "centerToLeftFlange": 3.3,
-        "centerToRightFlange": 3.3,
-    },
-    "White Industries Track Rear non-f/f": {
-        "type": HubType.Rear,
-        "brake": BrakeType.Rim,
-        "axle": AxleType.Solid,
-        "old": 12.0,
-        "leftFlangeDia": 7.3,
-        "rightFlangeDia": 7.3,
-        "centerToLeftFlange": 3.55,
-        "centerToRightFlange": 3.0,
-    }
-}
 _origin = createPoint(0, 0, 0)
 _locknutToRotorFront = 0.99
 _locknutToRotorRear = 1.45
 
-axleDiameters = {
-    "Front": {
-        "QR" : 0.9,
-        "ThruMTB": 1.5,
-        "ThruRoad": 1.2,
-        "Solid": 0.9
-    },
-    "Rear": {
-        "QR": 1.0,
-        "ThruMTB": 1.2,
-        "ThruRoad": 1.2,
-        "Solid": 1.0
-    }
-}
 
 class HubLogic:
     @property
@@ -155,6 +67,15 @@ class HubLogic:
         self.centerToRightFlange = 3.33
         self.spokes = 32
 
+    @property
+    def key(self):
+        # Hubs that share these values are geometrically identical and can share one component
+        hubType, brakeType, axleType = hubTypes(self)
+        return json.dumps([
+            self.preset, hubType, brakeType, axleType, self.axleDia, self.old,
+            self.leftFlangeDia, self.rightFlangeDia, self.centerToLeftFlange, self.centerToRightFlange, self.spokes,
+        ])
+
     def CreateCommandInputs(self, inputs: core.CommandInputs):
         global skipValidate
         skipValidate = True
@@ -163,7 +84,7 @@ class HubLogic:
             "preset", "Preset", core.DropDownStyles.TextListDropDownStyle
         )
         self.presetInput.listItems.add("None", True)
-        for hub in hubData:
+        for hub in catalog.get_catalog().hubs():
             self.presetInput.listItems.add(hub, False)
 
         self.hubTypeInput = inputs.addRadioButtonGroupCommandInput(
@@ -238,6 +159,9 @@ class HubLogic:
         )
         self.errorMessageTextInput.isFullWidth = True
 
+        self.CreateValidator()
+        self.preview = preview.MeshPreview(PREVIEW_EVENT_ID, hubPreview)
+
         skipValidate = False
 
     def HandleInputsChanged(self, args: core.InputChangedEventArgs):
@@ -245,10 +169,10 @@ class HubLogic:
         if not skipValidate:
             if changedInput.id == "preset":
                 if self.presetInput.selectedItem.name != "None":
-                    chosenHub = hubData[self.presetInput.selectedItem.name]
-                    hubType: HubType = chosenHub["type"]
-                    brakeType: BrakeType = chosenHub["brake"]
-                    axleType: AxleType = chosenHub["axle"]
+                    chosenHub = catalog.get_catalog().hub(self.presetInput.selectedItem.name)
+                    hubType = HubType[chosenHub["type"]]
+                    brakeType = BrakeType[chosenHub["brake"]]
+                    axleType = AxleType[chosenHub["axle"]]
                     if hubType == HubType.Front:
                         self.frontOption.isSelected = True
                     else:
@@ -300,47 +224,69 @@ class HubLogic:
                 #     self.centerToLeftFlangeInput.value = 3.55
                 #     self.centerToRightFlangeInput.value = 3.0
             elif changedInput.id == "hubType" or changedInput.id == "axleType":
-                self.axleDia = axleDiameters[self.hubTypeInput.selectedItem.name][self.axleTypeInput.selectedItem.name]
+                self.axleDia = catalog.get_catalog().axleDiameter(self.hubTypeInput.selectedItem.name, self.axleTypeInput.selectedItem.name)
 
     def HandleValidateInputs(self, args: core.ValidateInputsEventArgs):
-        self.errorMessageTextInput.text = ""
         if not skipValidate:
-            args.areInputsValid = False
-            if self.oldInput.value <= 0:
-                self.errorMessageTextInput.text = "OLD must be greater than 0"
-            elif (
-                self.leftFlangeDiaInput.value <= 0
-                or self.rightFlangeDiaInput.value <= 0
-            ):
-                self.errorMessageTextInput.text = (
-                    "Flange Diameters must be greater than 0"
-                )
-            elif self.centerToLeftFlangeInput.value <= 0:
-                self.errorMessageTextInput.text = (
-                    "Center to Left Flange must be greater than 0"
-                )
-            elif self.centerToRightFlangeInput.value <= 0:
-                self.errorMessageTextInput.text = (
-                    "Center to Right Flange must be greater than 0"
-                )
-            elif (
-                self.centerToLeftFlangeInput.value + self.centerToRightFlangeInput.value
-                > self.oldInput.value
-            ):
-                self.errorMessageTextInput.text = (
-                    "Sum of left and right flange distances cannot be larger than OLD"
-                )
-            elif (
-                self.leftFlangeDiaInput.value <= self.axleDia + 2.5
-                or self.rightFlangeDiaInput.value <= self.axleDia + 2.5
-            ):
-                self.errorMessageTextInput.text = (
-                    "One or both Flange Diameters is too small"
-                )
-            else:
-                args.areInputsValid = True
+            message = self.validator.validate()
+            self.errorMessageTextInput.text = message
+            args.areInputsValid = not message
+            if message:
+                # Leaving the last valid hub on screen would suggest these dimensions build it
+                self.preview.cancel()
+
+    def CreateValidator(self):
+        validator = self.validator = futil.Validator()
+        validator.input("old", lambda: self.oldInput.value)
+        validator.input("leftFlangeDia", lambda: self.leftFlangeDiaInput.value)
+        validator.input("rightFlangeDia", lambda: self.rightFlangeDiaInput.value)
+        validator.input("centerToLeftFlange", lambda: self.centerToLeftFlangeInput.value)
+        validator.input("centerToRightFlange", lambda: self.centerToRightFlangeInput.value)
+        validator.input("axleDia", lambda: self.axleDia)
+
+        @validator.rule("old")
+        def oldPositive(old):
+            if old <= 0:
+                return "OLD must be greater than 0"
+
+        @validator.rule("leftFlangeDia", "rightFlangeDia")
+        def flangeDiasPositive(left, right):
+            if left <= 0 or right <= 0:
+                return "Flange Diameters must be greater than 0"
+
+        @validator.rule("centerToLeftFlange")
+        def centerToLeftPositive(centerToLeft):
+            if centerToLeft <= 0:
+                return "Center to Left Flange must be greater than 0"
+
+        @validator.rule("centerToRightFlange")
+        def centerToRightPositive(centerToRight):
+            if centerToRight <= 0:
+                return "Center to Right Flange must be greater than 0"
+
+        @validator.rule("centerToLeftFlange", "centerToRightFlange", "old")
+        def flangesWithinOld(centerToLeft, centerToRight, old):
+            if centerToLeft + centerToRight > old:
+                return "Sum of left and right flange distances cannot be larger than OLD"
+
+        @validator.rule("leftFlangeDia", "rightFlangeDia", "axleDia")
+        def flangeDiasClearAxle(left, right, axleDia):
+            if left <= axleDia + 2.5 or right <= axleDia + 2.5:
+                return "One or both Flange Diameters is too small"
+
+    def HandlePreview(self, args: core.CommandEventArgs):
+        self.preview.request(
+            self.axleTypeInput.selectedItem.name,
+            self.axleDia,
+            self.oldInput.value,
+            self.leftFlangeDiaInput.value,
+            self.rightFlangeDiaInput.value,
+            self.centerToLeftFlangeInput.value,
+            self.centerToRightFlangeInput.value,
+        )
 
     def HandleExecute(self, args: core.CommandEventArgs):
+        self.preview.cancel()
         self.preset = self.presetInput.selectedItem.name
         self.old = self.oldInput.value
         self.spokes = self.spokesInput.value
@@ -351,63 +297,135 @@ class HubLogic:
         self.rightFlangeDia = self.rightFlangeDiaInput.value
         self.centerToLeftFlange = self.centerToLeftFlangeInput.value
         self.centerToRightFlange = self.centerToRightFlangeInput.value
-        createHub(self)
+        with profiling.recording('hub', config.trace_dir, log=futil.log):
+            createHub(self)
+
+    def HandleDestroy(self, args: core.CommandEventArgs):
+        self.preview.close()
+
+
+# Axle, flanges and a plain shell revolved from one outline, with the extents buildHub uses but no bosses or holes.
+# Runs on the preview timer thread, so it only does plain Python.
+def hubPreview(axleType: str, axleDia: float, old: float, leftFlangeDia: float, rightFlangeDia: float,
+               centerToLeftFlange: float, centerToRightFlange: float):
+    axleRad = axleDia / 2
+    axleEnd = (old + 3 if axleType == "Solid" else old + 0.4) / 2
+    boreRad = 0 if axleType == "Solid" else axleRad - 0.2
+    leftFlangeRad = leftFlangeDia / 2 + 0.3
+    rightFlangeRad = rightFlangeDia / 2 + 0.3
+    shellRad = max(axleRad + 0.3, min(leftFlangeDia, rightFlangeDia) / 4)
+    outline = [
+        (-axleEnd, boreRad),
+        (axleEnd, boreRad),
+        (axleEnd, axleRad),
+        (centerToRightFlange + 0.1, axleRad),
+        (centerToRightFlange + 0.1, rightFlangeRad),
+        (centerToRightFlange - 0.1, rightFlangeRad),
+        (centerToRightFlange - 0.1, shellRad),
+        (-centerToLeftFlange + 0.1, shellRad),
+        (-centerToLeftFlange + 0.1, leftFlangeRad),
+        (-centerToLeftFlange - 0.1, leftFlangeRad),
+        (-centerToLeftFlange - 0.1, axleRad),
+        (-axleEnd, axleRad),
+    ]
+    return [preview.revolve(outline)]
+
+
+class HubResources:
+    """Imports the hub DXF sketches on first use instead of all up front"""
+    def __init__(self, comp: fusion.Component, resource_dir: str) -> None:
+        self.comp = comp
+        self.resource_dir = resource_dir
+        self._sketches = {}
+
+    def path(self, name: str) -> str:
+        return f'{self.resource_dir}/{name}.dxf'
+
+    def sketch(self, name: str) -> fusion.Sketch:
+        if name not in self._sketches:
+            importManager = app.importManager
+            options = importManager.createDXF2DImportOptions(self.path(name), self.comp.yZConstructionPlane)
+            options.isViewFit = False
+            # Set the flag true to merge all the layers of DXF into single sketch.
+            options.isSingleSketchResult = True
+            with profiling.span('hub dxf import', sketch=name):
+                importManager.importToTarget(options, self.comp)
+            self._sketches[name] = self.comp.sketches.itemByName(name)
+        return self._sketches[name]
+
+    def hollowProfile(self, name: str, minLoops: int = 2) -> fusion.Profile:
+        return geometryutils.hollow_profile(self.sketch(name), self.path(name), minLoops)
+
+# The wheel command passes enums, the hub dialog passes the radio button names
+def hubTypes(logic: HubLogic):
+    hubType = logic.hubType.name if isinstance(logic.hubType, HubType) else logic.hubType
+    brakeType = logic.brakeType
+    if isinstance(brakeType, BrakeType):
+        brakeType = "Disc CenterLock" if brakeType == BrakeType.CenterLock else brakeType.name
+    axleType = logic.axleType.name if isinstance(logic.axleType, AxleType) else logic.axleType
+    return hubType, brakeType, axleType
+
+@profiling.traced()
+def createHub(logic: HubLogic):
+    # A hub that was already built with the same parameters is placed again instead of rebuilt
+    key = logic.key
+    template = findHubTemplate(key)
+    if template:
+        occurrence = design.rootComponent.occurrences.addExistingComponent(template, core.Matrix3D.create())
+    else:
+        occurrence = buildHub(logic, key)
 
+    # return edges to use for spoke joints
+    return hubSpokeHoleEdges(occurrence)
+
+@profiling.traced()
+def findHubTemplate(key: str):
+    for attribute in design.findAttributes(ATTRIBUTE_GROUP, "hubKey"):
+        component = fusion.Component.cast(attribute.parent)
+        if component and attribute.value == key:
+            return component
+    return None
+
+# Returns the tagged spoke hole edges of a hub occurrence, left and right, in the order buildHub returned them
+@profiling.traced()
+def hubSpokeHoleEdges(occurrence: fusion.Occurrence):
+    component = occurrence.component
+    edges = {"left": {}, "right": {}}
+    for attribute in design.findAttributes(ATTRIBUTE_GROUP, "spokeHole"):
+        edge = fusion.BRepEdge.cast(attribute.parent)
+        if edge and edge.body.parentComponent == component:
+            side, index = attribute.value.split(":")
+            edges[side][int(index)] = edge.createForAssemblyContext(occurrence)
+    return [[sideEdges[index] for index in sorted(sideEdges)] for sideEdges in (edges["left"], edges["right"])]
+
+# Component name of a hub, the spoke count is part of it unless the hub is a preset
+def hubName(logic: HubLogic):
+    if logic.preset != "None":
+        return logic.preset
+    hubType, _, axleType = hubTypes(logic)
+    return f"{hubType} {axleType} {logic.old}  x {logic.spokes}"
 
-def createHub(logic: HubLogic):
+@profiling.traced()
+def buildHub(logic: HubLogic, key: str):
+    hubType, brakeType, axleType = hubTypes(logic)
     leftFlangeRad = logic.leftFlangeDia / 2
     rightFlangeRad = logic.rightFlangeDia / 2
     axleRad = logic.axleDia / 2
-    if logic.axleType == "Solid":
+    if axleType == "Solid":
         axleExtent = logic.old + 3
     else:
         axleExtent = logic.old + 0.4
 
-    importManager = app.importManager
-    
     rootComp = design.rootComponent
     # Create a new component by creating an occurrence.
     occurence = rootComp.occurrences.addNewComponent(core.Matrix3D.create())
     newComp = occurence.component
-    if logic.preset != "None":
-        newComp.name = logic.preset
-    else:
-        newComp.name = f"{logic.hubType} {logic.axleType} {logic.old}  x {logic.spokes}"
+    newComp.name = hubName(logic)
 
     sketches = newComp.sketches
 
-    # Get dxf import options
-    freehubBaseOptions = importManager.createDXF2DImportOptions(f'{logic.resource_dir}/freehub_base.dxf', newComp.yZConstructionPlane)
-    freehubBaseOptions.isViewFit = False
-    freehubSplinesOptions = importManager.createDXF2DImportOptions(f'{logic.resource_dir}/freehub_splines.dxf', newComp.yZConstructionPlane)
-    freehubSplinesOptions.isViewFit = False
-    sixBoltBossOptions = importManager.createDXF2DImportOptions(f'{logic.resource_dir}/six_bolt_boss.dxf', newComp.yZConstructionPlane)
-    sixBoltBossOptions.isViewFit = False
-    centerlockBossOptions = importManager.createDXF2DImportOptions(f'{logic.resource_dir}/centerlock_boss.dxf', newComp.yZConstructionPlane)
-    centerlockBossOptions.isViewFit = False
-    centerlockSplinesOptions = importManager.createDXF2DImportOptions(f'{logic.resource_dir}/centerlock_splines.dxf', newComp.yZConstructionPlane)
-    centerlockSplinesOptions.isViewFit = False
-
-
-    # Set the flag true to merge all the layers of DXF into single sketch.
-    freehubBaseOptions.isSingleSketchResult = True
-    freehubSplinesOptions.isSingleSketchResult = True
-    sixBoltBossOptions.isSingleSketchResult = True
-    centerlockBossOptions.isSingleSketchResult = True
-    centerlockSplinesOptions.isSingleSketchResult = True
-
-    # Import dxf file to root component
-    importManager.importToTarget(freehubBaseOptions, newComp)
-    importManager.importToTarget(freehubSplinesOptions, newComp)
-    importManager.importToTarget(sixBoltBossOptions, newComp)
-    importManager.importToTarget(centerlockBossOptions, newComp)
-    importManager.importToTarget(centerlockSplinesOptions, newComp)
-
-    freehubBaseSketch = sketches.itemByName('freehub_base')
-    freehubSplinesSketch = sketches.itemByName('freehub_splines')
-    sixBoltBossSketch = sketches.itemByName('six_bolt_boss')
-    centerlockBossSketch = sketches.itemByName('centerlock_boss')
-    centerlockSplinesSketch = sketches.itemByName('centerlock_splines')
+    # DXF sketches are only imported once the hub/brake type actually asks for them
+    resources = HubResources(newComp, logic.resource_dir)
 
     # sketch axle
     axleSketch = fusion.Sketch.cast(sketches.add(newComp.yZConstructionPlane))
@@ -419,7 +437,7 @@ def createHub(logic: HubLogic):
     extrudes = newComp.features.extrudeFeatures
     collection = core.ObjectCollection.create()
     for profile in axleSketch.profiles:
-        if logic.axleType == "Solid":
+        if axleType == "Solid":
             collection.add(profile)
         elif profile.profileLoops.count == 2:
             collection.add(profile)
@@ -427,7 +445,8 @@ def createHub(logic: HubLogic):
         collection, fusion.FeatureOperations.NewBodyFeatureOperation
     )
     axleExtrudeInput.setSymmetricExtent(core.ValueInput.createByReal(axleExtent), True)
-    axleExtrude = extrudes.add(axleExtrudeInput)
+    with profiling.span('hub axleExtrude'):
+        axleExtrude = extrudes.add(axleExtrudeInput)
     axleExtrude.bodies.item(0).name = "Axle"
 
     # sketch flanges
@@ -454,10 +473,10 @@ def createHub(logic: HubLogic):
     extentDir = fusion.ExtentDirections.NegativeExtentDirection
     lFlangeExtrudeInput.startExtent = offsetStart
     lFlangeExtrudeInput.setOneSideExtent(extentDef, extentDir)
-    lFlangeExtrude = extrudes.add(lFlangeExtrudeInput)
+    with profiling.span('hub lFlangeExtrude'):
+        lFlangeExtrude = extrudes.add(lFlangeExtrudeInput)
     lFlangeBody = lFlangeExtrude.bodies.item(0)
     lFlangeBody.name = "Left Flange"
-    lFlangeBodyOutsideFaceEdges = lFlangeExtrude.endFaces.item(0).edges
 
     rFlangeExtrudeInput = extrudes.createInput(
         rightFlangeProfile, fusion.FeatureOperations.NewBodyFeatureOperation
@@ -471,10 +490,10 @@ def createHub(logic: HubLogic):
     extentDir = fusion.ExtentDirections.PositiveExtentDirection
     rFlangeExtrudeInput.startExtent = offsetStart
     rFlangeExtrudeInput.setOneSideExtent(extentDef, extentDir)
-    rFlangeExtrude = extrudes.add(rFlangeExtrudeInput)
+    with profiling.span('hub rFlangeExtrude'):
+        rFlangeExtrude = extrudes.add(rFlangeExtrudeInput)
     rFlangeBody = rFlangeExtrude.bodies.item(0)
     rFlangeBody.name = "Right Flange"
-    rFlangeBodyOutsideFaceEdges = rFlangeExtrude.endFaces.item(0).edges
 
     # cut single spoke hole
     leftSpokeHoleSketch = fusion.Sketch.cast(sketches.add(newComp.yZConstructionPlane))
@@ -490,7 +509,8 @@ def createHub(logic: HubLogic):
     leftSpokeHoleExtrudeInput.setOneSideExtent(
         extent, fusion.ExtentDirections.NegativeExtentDirection
     )
-    leftSpokeHoleCut = extrudes.add(leftSpokeHoleExtrudeInput)
+    with profiling.span('hub leftSpokeHoleExtrude'):
+        leftSpokeHoleCut = extrudes.add(leftSpokeHoleExtrudeInput)
 
     rightSpokeHoleSketch = fusion.Sketch.cast(sketches.add(newComp.yZConstructionPlane))
     circles = rightSpokeHoleSketch.sketchCurves.sketchCircles
@@ -505,7 +525,8 @@ def createHub(logic: HubLogic):
     rightSpokeHoleExtrudeInput.setOneSideExtent(
         extent, fusion.ExtentDirections.PositiveExtentDirection
     )
-    rightSpokeHoleCut = extrudes.add(rightSpokeHoleExtrudeInput)
+    with profiling.span('hub rightSpokeHoleExtrude'):
+        rightSpokeHoleCut = extrudes.add(rightSpokeHoleExtrudeInput)
 
     # circular pattern spoke hole
     # TODO figure out why this breaks every other run
@@ -518,32 +539,26 @@ def createHub(logic: HubLogic):
     spokeHolePatternInput.quantity = core.ValueInput.createByReal(logic.spokes / 2)
     spokeHolePatternInput.totalAngle = core.ValueInput.createByReal(2 * pi)
     spokeHolePatternInput.patternComputeOption = fusion.PatternComputeOptions.OptimizedPatternCompute
-    spokeHolePattern = patterns.add(spokeHolePatternInput)
+    with profiling.span('hub spokeHolePattern'):
+        spokeHolePattern = patterns.add(spokeHolePatternInput)
 
     # get edges for wheel assembly
-    lSpokeHoleEdges = []
-    rSpokeHoleEdges = []
-    lSpokeHoleEdges.append(leftSpokeHoleCut.sideFaces.item(0).edges.item(0))
-    rSpokeHoleEdges.append(rightSpokeHoleCut.sideFaces.item(0).edges.item(0))
-    for face in spokeHolePattern.faces:
-        for edge in face.edges:
-            if edge in lFlangeBodyOutsideFaceEdges:
-                lSpokeHoleEdges.append(edge)
-            elif edge in rFlangeBodyOutsideFaceEdges:
-                rSpokeHoleEdges.append(edge)
+    features = {
+        "leftFlange": lFlangeExtrude,
+        "rightFlange": rFlangeExtrude,
+        "leftSpokeHole": leftSpokeHoleCut,
+        "rightSpokeHole": rightSpokeHoleCut,
+        "spokeHolePattern": spokeHolePattern,
+    }
+    lSpokeHoleEdges, rSpokeHoleEdges = spokeHoleEdges(newComp, features)
 
     # offest one flange body
     moves = newComp.features.moveFeatures
     collection = core.ObjectCollection.create()
     collection.add(rFlangeBody)
-    transform = core.Matrix3D.create()
-    transform.setToRotation(
-        (2 * pi) / logic.spokes,
-        newComp.xConstructionAxis.geometry.direction,
-        _origin,
-    )
-    flangeRotateInput = moves.createInput(collection, transform)
-    moves.add(flangeRotateInput)
+    flangeRotateInput = moves.createInput(collection, flangeRotation(newComp, logic.spokes))
+    with profiling.span('hub flangeRotate'):
+        features["flangeRotate"] = moves.add(flangeRotateInput)
 
     # sketch axle hardware
     axleHardwareSketch = fusion.Sketch.cast(sketches.add(newComp.xZConstructionPlane))
@@ -563,7 +578,8 @@ def createHub(logic: HubLogic):
         fusion.FeatureOperations.NewBodyFeatureOperation,
     )
     hardwareRevolveInput.setAngleExtent(False, core.ValueInput.createByReal(2 * pi))
-    axleHardwareRevolve = revolves.add(hardwareRevolveInput)
+    with profiling.span('hub hardwareRevolve'):
+        axleHardwareRevolve = revolves.add(hardwareRevolveInput)
     axleHardwareRevolve.bodies.item(0).name = "Axle Hardware"
 
     # sketch hub body
@@ -575,7 +591,7 @@ def createHub(logic: HubLogic):
     point2 = createPoint((-logic.old / 2) + 0.5, leftBodyRad, 0)
     point3 = createPoint(-logic.centerToLeftFlange, leftBodyRad, 0)
     point4 = createPoint(logic.centerToRightFlange, rightBodyRad, 0)
-    if logic.hubType == "Front":
+    if hubType == "Front":
         point5 = createPoint((logic.old / 2) - 0.5, leftBodyRad, 0)
         point6 = createPoint((logic.old / 2) - 0.5, 0, 0)
     else:
@@ -597,11 +613,12 @@ def createHub(logic: HubLogic):
         fusion.FeatureOperations.NewBodyFeatureOperation,
     )
     bodyRevolveInput.setAngleExtent(False, core.ValueInput.createByReal(2 * pi))
-    bodyRevolve = revolves.add(bodyRevolveInput)
+    with profiling.span('hub bodyRevolve'):
+        bodyRevolve = revolves.add(bodyRevolveInput)
     bodyRevolve.bodies.item(0).name = "Hub Body"
 
     # if rear
-    if logic.hubType == "Rear":
+    if hubType == "Rear":
         # sketch freehub
         freehubSketch = fusion.Sketch.cast(sketches.add(newComp.xZConstructionPlane))
         lines = freehubSketch.sketchCurves.sketchLines
@@ -618,6 +635,7 @@ def createHub(logic: HubLogic):
 
         # extrude freehub Base
         collection = core.ObjectCollection.create()
+        freehubBaseSketch = resources.sketch('freehub_base')
         collection.add(freehubBaseSketch.profiles.item(0))
         collection.add(freehubBaseSketch.profiles.item(1))
         freehubBaseExtrudeInput = extrudes.createInput(collection, fusion.FeatureOperations.NewBodyFeatureOperation)
@@ -631,12 +649,14 @@ def createHub(logic: HubLogic):
         extentDir = fusion.ExtentDirections.PositiveExtentDirection
         freehubBaseExtrudeInput.startExtent = offsetStart
         freehubBaseExtrudeInput.setOneSideExtent(extentDef, extentDir)
-        freehubBaseExtrude = extrudes.add(freehubBaseExtrudeInput)
+        with profiling.span('hub freehubBaseExtrude'):
+            freehubBaseExtrude = extrudes.add(freehubBaseExtrudeInput)
         freehubBaseBody = freehubBaseExtrude.bodies.item(0)
         freehubBaseBody.name = "Freehub Base"
 
         # extrude freehub splines
         collection = core.ObjectCollection.create()
+        freehubSplinesSketch = resources.sketch('freehub_splines')
         # collection.add(freehubSplinesSketch.profiles.item(0))
         collection.add(freehubSplinesSketch.profiles.item(1))
         freehubSplinesExtrudeInput = extrudes.createInput(collection, fusion.FeatureOperations.NewBodyFeatureOperation)
@@ -650,16 +670,14 @@ def createHub(logic: HubLogic):
         extentDir = fusion.ExtentDirections.PositiveExtentDirection
         freehubSplinesExtrudeInput.startExtent = offsetStart
         freehubSplinesExtrudeInput.setOneSideExtent(extentDef, extentDir)
-        freehubSplinesExtrude = extrudes.add(freehubSplinesExtrudeInput)
+        with profiling.span('hub freehubSplinesExtrude'):
+            freehubSplinesExtrude = extrudes.add(freehubSplinesExtrudeInput)
         freehubSplinesBody = freehubSplinesExtrude.bodies.item(0)
         freehubSplinesBody.name = "Freehub Splines"
 
-    if logic.brakeType == "Sixbolt": 
+    if brakeType == "Sixbolt":
         # sketch boss circle
-        for profile in sixBoltBossSketch.profiles:
-            if profile.profileLoops.count > 2:
-                bossProfile = profile
-                break
+        bossProfile = resources.hollowProfile('six_bolt_boss', 3)
 
         # extrude boss
         bossExtrudeInput = extrudes.createInput(
@@ -668,7 +686,7 @@ def createHub(logic: HubLogic):
         offsetStart: fusion.OffsetStartDefinition = fusion.OffsetStartDefinition.create(
             core.ValueInput.createByReal(-logic.centerToLeftFlange)
         )
-        if logic.hubType == "Rear":
+        if hubType == "Rear":
             extent = (logic.old / 2) - logic.centerToLeftFlange - _locknutToRotorRear
         else:
             extent = (logic.old / 2) - logic.centerToLeftFlange - _locknutToRotorFront
@@ -678,16 +696,14 @@ def createHub(logic: HubLogic):
         extentDir = fusion.ExtentDirections.NegativeExtentDirection
         bossExtrudeInput.startExtent = offsetStart
         bossExtrudeInput.setOneSideExtent(extentDef, extentDir)
-        bossExtrude = extrudes.add(bossExtrudeInput)
+        with profiling.span('hub bossExtrude'):
+            bossExtrude = extrudes.add(bossExtrudeInput)
         bossBody = bossExtrude.bodies.item(0)
         bossBody.name = "Rotor Boss"
 
-    if logic.brakeType == "Disc CenterLock":  
+    if brakeType == "Disc CenterLock":
         # sketch boss circle
-        for profile in centerlockSplinesSketch.profiles:
-            if profile.profileLoops.count > 1:
-                bossProfile = profile
-                break
+        bossProfile = resources.hollowProfile('centerlock_splines')
 
         # extrude boss
         bossExtrudeInput = extrudes.createInput(
@@ -696,7 +712,7 @@ def createHub(logic: HubLogic):
         offsetStart: fusion.OffsetStartDefinition = fusion.OffsetStartDefinition.create(
             core.ValueInput.createByReal(-logic.centerToLeftFlange)
         )
-        if logic.hubType == "Rear":
+        if hubType == "Rear":
             extent = (logic.old / 2) - logic.centerToLeftFlange - _locknutToRotorRear
         else:
             extent = (logic.old / 2) - logic.centerToLeftFlange - _locknutToRotorFront
@@ -706,15 +722,13 @@ def createHub(logic: HubLogic):
         extentDir = fusion.ExtentDirections.NegativeExtentDirection
         bossExtrudeInput.startExtent = offsetStart
         bossExtrudeInput.setOneSideExtent(extentDef, extentDir)
-        bossExtrude = extrudes.add(bossExtrudeInput)
+        with profiling.span('hub bossExtrude'):
+            bossExtrude = extrudes.add(bossExtrudeInput)
         bossBody = bossExtrude.bodies.item(0)
         bossBody.name = "Rotor Splines"
 
         # sketch boss circle
-        for profile in centerlockBossSketch.profiles:
-            if profile.profileLoops.count > 1:
-                bossProfile = profile
-                break
+        bossProfile = resources.hollowProfile('centerlock_boss')
 
         # extrude boss
         bossExtrudeInput = extrudes.createInput(
@@ -731,12 +745,85 @@ def createHub(logic: HubLogic):
         extentDir = fusion.ExtentDirections.NegativeExtentDirection
         bossExtrudeInput.startExtent = offsetStart
         bossExtrudeInput.setOneSideExtent(extentDef, extentDir)
-        bossExtrude = extrudes.add(bossExtrudeInput)
+        with profiling.span('hub bossExtrude'):
+            bossExtrude = extrudes.add(bossExtrudeInput)
         bossBody = bossExtrude.bodies.item(0)
         bossBody.name = "Rotor Boss"
         
     # chamfers & fillets
     newComp.isSketchFolderLightBulbOn = False
     
-    # return edges to use for spoke joints
-    return [lSpokeHoleEdges, rSpokeHoleEdges]
+    # Tag the hub, its spoke hole edges and the features updateHubSpokes edits, attributes are saved with the
+    # document so the template outlives the session
+    newComp.attributes.add(ATTRIBUTE_GROUP, "hubKey", key)
+    for role, feature in features.items():
+        feature.attributes.add(ATTRIBUTE_GROUP, "hubFeature", role)
+    tagSpokeHoles(lSpokeHoleEdges, rSpokeHoleEdges)
+    return occurence
+
+# Returns the spoke hole edges on the outside of the left and right flange, see buildHub for the features
+def spokeHoleEdges(component: fusion.Component, features: dict):
+    # The outside face edges are indexed once so each patterned edge is classified with a dict lookup
+    lFlangeOutsideEdges = geometryutils.CircleEdgeIndex(features["leftFlange"].endFaces.item(0).edges)
+    rFlangeOutsideEdges = geometryutils.CircleEdgeIndex(features["rightFlange"].endFaces.item(0).edges)
+    patternFaces = list(features["spokeHolePattern"].faces)
+    lSpokeHoleEdges = lFlangeOutsideEdges.matches([features["leftSpokeHole"].sideFaces.item(0)] + patternFaces)
+    rSpokeHoleEdges = rFlangeOutsideEdges.matches([features["rightSpokeHole"].sideFaces.item(0)] + patternFaces)
+    # Ordered around the axle starting from the seed hole, so index n is always the nth hole on its flange
+    axis = component.xConstructionAxis.geometry.direction
+    lSpokeHoleEdges = geometryutils.angular_order(lSpokeHoleEdges, axis, core.Circle3D.cast(lSpokeHoleEdges[0].geometry).center)
+    rSpokeHoleEdges = geometryutils.angular_order(rSpokeHoleEdges, axis, core.Circle3D.cast(rSpokeHoleEdges[0].geometry).center)
+    return lSpokeHoleEdges, rSpokeHoleEdges
+
+def tagSpokeHoles(lSpokeHoleEdges: list, rSpokeHoleEdges: list):
+    for side, edges in (("left", lSpokeHoleEdges), ("right", rSpokeHoleEdges)):
+        for index, edge in enumerate(edges):
+            edge.attributes.add(ATTRIBUTE_GROUP, "spokeHole", f"{side}:{index}")
+
+# The right flange is turned half a hole spacing against the left one, the pattern spaces holes 4 pi / spokes apart
+def flangeRotation(component: fusion.Component, spokes: int):
+    transform = core.Matrix3D.create()
+    transform.setToRotation((2 * pi) / spokes, component.xConstructionAxis.geometry.direction, _origin)
+    return transform
+
+@profiling.traced()
+def updateHubSpokes(occurrence: fusion.Occurrence, logic: HubLogic):
+    """Changes the spoke count of a hub buildHub built by editing its spoke hole pattern and flange rotation.
+
+    Returns the spoke hole edges like createHub, or None when the hub has to be built again: in a direct
+    design, when its component is placed more than once, when a hub with the new values already exists or
+    when the hub was built before its features were tagged.
+    """
+    component = occurrence.component
+    if design.designType != fusion.DesignTypes.ParametricDesignType:
+        return None
+    if design.rootComponent.occurrencesByComponent(component).count != 1 or findHubTemplate(logic.key):
+        return None
+    features = {}
+    for attribute in design.findAttributes(ATTRIBUTE_GROUP, "hubFeature"):
+        feature = attribute.parent
+        if feature and feature.parentComponent == component:
+            features[attribute.value] = feature
+    if not {"leftFlange", "rightFlange", "leftSpokeHole", "rightSpokeHole", "spokeHolePattern", "flangeRotate"} <= features.keys():
+        return None
+
+    features["spokeHolePattern"].quantity.expression = str(logic.spokes // 2)
+    # A move can only be changed with the timeline rolled back to just before it
+    flangeRotate = fusion.MoveFeature.cast(features["flangeRotate"])
+    flangeRotate.timelineObject.rollTo(True)
+    flangeRotate.transform = flangeRotation(component, logic.spokes)
+    design.timeline.moveToEnd()
+
+    for attribute in design.findAttributes(ATTRIBUTE_GROUP, "spokeHole"):
+        edge = fusion.BRepEdge.cast(attribute.parent)
+        if edge and edge.body.parentComponent == component:
+            attribute.deleteMe()
+    tagSpokeHoles(*spokeHoleEdges(component, features))
+    # The name and the template key still describe the old spoke count, findHubTemplate would hand this hub out for it
+    component.name = hubName(logic)
+    hubKey = component.attributes.itemByName(ATTRIBUTE_GROUP, "hubKey")
+    if hubKey:
+        hubKey.value = logic.key
+    else:
+        component.attributes.add(ATTRIBUTE_GROUP, "hubKey", logic.key)
+    return hubSpokeHoleEdges(occurrence)
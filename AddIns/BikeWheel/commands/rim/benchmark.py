@@ -0,0 +1,60 @@
+# Times the two rim hole cutting methods for every spoke count from 16 to 48.
+# The command only offers this when config.DEBUG is set.
+import os
+import tempfile
+import time
+import adsk, adsk.core as core
+from . import logic
+from ...lib import fusion360utils as futil
+
+app = core.Application.get()
+
+SPOKE_COUNTS = (16, 20, 24, 28, 32, 36, 40, 48)
+METHODS = ('pattern', 'combine')
+REPORT_PATH = os.path.join(tempfile.gettempdir(), 'rim_hole_benchmark.csv')
+
+def run(rimLogic: logic.RimLogic, spokeCounts=SPOKE_COUNTS, methods=METHODS):
+    """Builds the selected rim and size with every spoke count and method, deleting each rim once it is timed.
+
+    :returns:
+        A list of (spokes, method, status, seconds) rows.
+    """
+    rootComp = logic.design.rootComponent
+    selectedMethod = rimLogic.holeMethod
+    selectedSpokeCount = rimLogic.spokeCount
+
+    progressDialog = app.userInterface.createProgressDialog()
+    progressDialog.isCancelButtonShown = True
+    progressDialog.show('Rim Hole Benchmark', 'Build %v of %m', 0, len(spokeCounts) * len(methods))
+
+    rows = []
+    for spokes in spokeCounts:
+        for method in methods:
+            if progressDialog.wasCancelled:
+                break
+            rimLogic.holeMethod = method
+            rimLogic.spokeCount = spokes
+            status = 'OK'
+            start = time.perf_counter()
+            try:
+                logic.createRim(rimLogic)
+            except RuntimeError:
+                status = 'Failed'
+            rows.append((spokes, method, status, time.perf_counter() - start))
+            # createRim always adds its rim as the last occurrence of the root component
+            rootComp.occurrences.item(rootComp.occurrences.count - 1).deleteMe()
+            progressDialog.progressValue = len(rows)
+            adsk.doEvents()
+
+    progressDialog.hide()
+    rimLogic.holeMethod = selectedMethod
+    rimLogic.spokeCount = selectedSpokeCount
+
+    with open(REPORT_PATH, 'w') as file:
+        file.write('spokes,method,status,ms\n')
+        for spokes, method, status, seconds in rows:
+            file.write(f'{spokes},{method},{status},{seconds * 1000:.1f}\n')
+    for spokes, method, status, seconds in rows:
+        futil.log(f'{spokes:>2} holes {method:>8}: {status} {seconds * 1000:.1f} ms', force_console=True)
+    futil.log(f'Rim hole benchmark written to {REPORT_PATH}', force_console=True)
+    return rows
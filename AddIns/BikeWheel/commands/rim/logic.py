@@ -1,7 +1,10 @@
-from math import pi
+import functools
+from math import pi, sin, cos, atan2
 import os
 import adsk.core as core
 import adsk.fusion as fusion
+from ...lib import catalog, dxfutils, geometryutils, preview, profiling, fusion360utils as futil
+from ... import config
 
 app = core.Application.get()
 if app:
@@ -13,78 +16,10 @@ if not design:
     alert('You must be in the design workspace to use this command')
 skipValidate = False
 
-rimProfiles = {
-    'DT Swiss 545D': {
-        'profile': '/rim_profiles/DT_Swiss_545D.dxf',
-        'sizes': {
-            '26"': 54.2,
-            '700c': 60.5
-        },
-        'spokes': [32, 36]
-    },
-    'Mavic CXP Pro': {
-        'profile': '/rim_profiles/Mavic_CXP_Pro.dxf',
-        'sizes': {
-            '700c': 59.5
-        },
-        'spokes': [28, 32, 36]
-    },
-    'Mavic Open Elite': {
-        'profile': '/rim_profiles/Mavic_Open_Elite.dxf',
-        'sizes': {
-            '700c': 58.1
-        },
-        'spokes': [32, 36]
-    },
-    'Velocity A23': {
-        'profile': '/rim_profiles/Velocity_A23.dxf',
-        'sizes': {
-            '650b': 56.2,
-            '700c': 60.13,
-        },
-        'spokes': [18, 20, 24, 28, 32, 36]
-    },
-    'Velocity Deep V': {
-        'profile': '/rim_profiles/Velocity_Deep_V.dxf',
-        'sizes': {
-            '700c': 58.1
-        },
-        'spokes': [16, 18, 20, 24, 28, 32, 36, 40, 48]
-    },
-    'Velocity Dyad': {
-        'profile': '/rim_profiles/Velocity_Dyad.dxf',
-        'sizes': {
-            '26"': 53.5,
-            '650b': 55.9,
-            '700c': 59.7
-        },
-        'spokes': [28, 32, 36, 40, 48]
-    },
-    'VO Enterprise': {
-        'profile': '/rim_profiles/VO_Enterprise.dxf',
-        'sizes': {
-            '700c': 60.52,
-            '27"': 61.27
-        },
-        'spokes': [32, 36]
-    },
-    'VO Voyager': {
-        'profile': '/rim_profiles/VO_Voyager.dxf',
-        'sizes': {
-            '26"': 54.17,
-            '650b': 56.5,
-            '700c': 60.14,
-        },
-        'spokes': [32, 36]
-    },
-    'WTB KOM Light 121': {
-        'profile': '/rim_profiles/WTB_KOM_Light_121.dxf',
-        'sizes': {
-            '29"': 60.5,
-        },
-        'spokes': [28, 32]
-    }
-}
+PREVIEW_EVENT_ID = f'{config.COMPANY_NAME}_{config.ADDIN_NAME}_rimPreview'
+# Points kept of the rim profile outline for the preview
+PREVIEW_OUTLINE_POINTS = 96
+
 
 class RimLogic():
     @property
@@ -97,6 +32,11 @@ class RimLogic():
 
     def __init__(self) -> None:
         self.rim = 'DT Swiss 545D'
+        # 'combine' cuts every hole with one tool body, 'pattern' extrudes one hole and patterns it
+        self.holeMethod = 'combine'
+        # Sideways offset of the holes towards their flange, alternating left and right
+        self.holeOffset = 0
+        self.benchmark = False
     
     def CreateCommandInputs(self, inputs: core.CommandInputs):
         global skipValidate
@@ -107,19 +47,27 @@ class RimLogic():
         self.sizeInput: core.DropDownCommandInput = inputs.addDropDownCommandInput('size', 'Size', drop_down_style)
         self.spokesInput: core.DropDownCommandInput = inputs.addDropDownCommandInput('spokes', 'Spokes', drop_down_style)
 
-        for rimName in rimProfiles.keys():
+        rims = catalog.get_catalog()
+        for rimName in rims.rims():
             self.rimInput.listItems.add(rimName, rimName == self.rim)
         
-        rimSizes = rimProfiles[self.rimInput.selectedItem.name]['sizes'].keys()
+        rimSizes = rims.sizes(self.rimInput.selectedItem.name)
         for size in rimSizes:
-            self.sizeInput.listItems.add(size, size == list(rimSizes)[0])
-        spokeCounts = rimProfiles[self.rimInput.selectedItem.name]['spokes']
+            self.sizeInput.listItems.add(size, size == rimSizes[0])
+        spokeCounts = rims.spokeCounts(self.rimInput.selectedItem.name)
         for count in spokeCounts:
             self.spokesInput.listItems.add(str(count), count == spokeCounts[0])
 
+        self.benchmarkInput = None
+        if config.DEBUG:
+            self.benchmarkInput = inputs.addBoolValueInput('benchmark', 'Benchmark Holes', True, '', self.benchmark)
+            self.benchmarkInput.tooltip = 'Time both hole cutting methods for every spoke count from 16 to 48'
+
         self.errorMessageTextInput = inputs.addTextBoxCommandInput('errMessage', '', '', 2, True)
         self.errorMessageTextInput.isFullWidth = True
 
+        self.preview = preview.MeshPreview(PREVIEW_EVENT_ID, rimPreview)
+
         skipValidate = False
 
     def HandleInputsChanged(self, args: core.InputChangedEventArgs):
@@ -129,23 +77,52 @@ class RimLogic():
             if changedInput.id == 'rim':
                 self.sizeInput.listItems.clear()
                 self.spokesInput.listItems.clear()
-                rimSizes = rimProfiles[self.rimInput.selectedItem.name]['sizes'].keys()
+                rims = catalog.get_catalog()
+                rimSizes = rims.sizes(self.rimInput.selectedItem.name)
                 for size in rimSizes:
-                    self.sizeInput.listItems.add(size, size == list(rimSizes)[0])
-                spokeCounts = rimProfiles[self.rimInput.selectedItem.name]['spokes']
+                    self.sizeInput.listItems.add(size, size == rimSizes[0])
+                spokeCounts = rims.spokeCounts(self.rimInput.selectedItem.name)
                 for count in spokeCounts:
                     self.spokesInput.listItems.add(str(count), count == spokeCounts[0])
 
     def HandleValidateInputs(self, args: core.ValidateInputsEventArgs):
         pass
 
+    def HandlePreview(self, args: core.CommandEventArgs):
+        rim = catalog.get_catalog().rim(self.rimInput.selectedItem.name)
+        self.preview.request(f'{self.resource_dir}{rim["profile"]}', rim['sizes'][self.sizeInput.selectedItem.name])
+
     def HandleExecute(self, args: core.CommandEventArgs):
-        self.rimProfilePath = f'{self.resource_dir}{rimProfiles[self.rimInput.selectedItem.name]["profile"]}'
+        self.preview.cancel()
+        self.rimProfilePath = f'{self.resource_dir}{catalog.get_catalog().rim(self.rimInput.selectedItem.name)["profile"]}'
         self.rim = self.rimInput.selectedItem.name
         self.size = self.sizeInput.selectedItem.name
         self.spokeCount = int(self.spokesInput.selectedItem.name)
-        createRim(self)
+        if self.benchmarkInput and self.benchmarkInput.value:
+            from . import benchmark
+            benchmark.run(self)
+        else:
+            with profiling.recording('rim', config.trace_dir, log=futil.log):
+                createRim(self)
+
+    def HandleDestroy(self, args: core.CommandEventArgs):
+        self.preview.close()
+
+# The outer loop of the largest region of a rim profile, the one createRim revolves, in cm
+@functools.lru_cache(maxsize=None)
+def rimOutline(path: str):
+    loops, regions, _ = dxfutils.build_regions(dxfutils.read_entities(path))
+    outer = max((loops[region[0]] for region in regions), key=lambda loop: abs(dxfutils.loop_area(loop)))
+    # The DXF profiles are drawn in mm
+    return [(x / 10, y / 10) for x, y in preview.decimate(outer, PREVIEW_OUTLINE_POINTS)]
+
+# The rim profile revolved around the wheel axis without its valve and spoke holes.
+# Runs on the preview timer thread, so it only does plain Python.
+def rimPreview(profilePath: str, rimErd: float):
+    outline = [(x, rimErd / 2 - y) for x, y in rimOutline(profilePath)]
+    return [preview.revolve(outline, rimErd / 2)]
     
+@profiling.traced()
 def createRim(self: RimLogic):
     schraederRadius = 0.4
     prestaRadius = 0.3
@@ -167,7 +144,8 @@ def createRim(self: RimLogic):
     dxfOptions.isSingleSketchResult = True
 
     # Import dxf file to root component
-    importManager.importToTarget(dxfOptions, newComp)
+    with profiling.span('rim dxf import'):
+        importManager.importToTarget(dxfOptions, newComp)
 
     sketches = newComp.sketches
 
@@ -175,15 +153,12 @@ def createRim(self: RimLogic):
     rimProfileSketch = sketches.item(0)
     # The profile we want is the one that contains the inner void(s) of the double wall
     if rimProfileSketch.profiles.count > 1:
-        for profile in rimProfileSketch.profiles:
-            if profile.profileLoops.count > 1:
-                rimProfile = profile
-                break
+        rimProfile = geometryutils.hollow_profile(rimProfileSketch, self.rimProfilePath)
     else: # single wall rims only have one profile
         rimProfile = rimProfileSketch.profiles.item(0)
 
     # Draw line to revolve around
-    rimErd = rimProfiles[self.rim]['sizes'][self.size]
+    rimErd = catalog.get_catalog().rim(self.rim)['sizes'][self.size]
     revolveAxisSketch = fusion.Sketch.cast(sketches.add(newComp.xYConstructionPlane))
     revolveAxisSketch.name = 'Revolve Axis'
     lines = revolveAxisSketch.sketchCurves.sketchLines
@@ -193,7 +168,10 @@ def createRim(self: RimLogic):
     revolves = newComp.features.revolveFeatures
     revolveInput = revolves.createInput(rimProfile, revolveAxis, fusion.FeatureOperations.NewBodyFeatureOperation)
     revolveInput.setAngleExtent(False, core.ValueInput.createByReal(2 * pi))
-    rimRevolve = revolves.add(revolveInput)
+    with profiling.span('rim revolve'):
+        rimRevolve = revolves.add(revolveInput)
+    tagFeature(rimRevolve, 'revolve')
+    tagFeature(revolveAxisSketch, 'revolveAxis')
 
     # Mirror and join revolved body
     # mirrors = newComp.features.mirrorFeatures
@@ -210,6 +188,7 @@ def createRim(self: RimLogic):
     circles = valveHoleSketch.sketchCurves.sketchCircles
     circles.addByCenterRadius(createPoint(0, rimErd / 2, 0), schraederRadius)
     valveHoleProfile = valveHoleSketch.profiles.item(0)
+    tagFeature(valveHoleSketch, 'valveHole')
 
     # Cut valve hole in rim
     extrudes = newComp.features.extrudeFeatures
@@ -217,13 +196,121 @@ def createRim(self: RimLogic):
     extentDef = fusion.ThroughAllExtentDefinition.create()
     extendDir = fusion.ExtentDirections.NegativeExtentDirection
     extrudeInput.setOneSideExtent(extentDef, extendDir)
-    extrudes.add(extrudeInput)
+    with profiling.span('rim valveHoleCut'):
+        extrudes.add(extrudeInput)
+
+    holeOffset = catalog.get_catalog().rim(self.rim).get('holeOffset', self.holeOffset)
+    if self.holeMethod == 'pattern':
+        jointFaces = cutHolesByPattern(newComp, revolveAxis, rimErd, self.spokeCount, spokeHoleRadius, nippleHoleRadius)
+    else:
+        jointFaces = cutHolesByCombine(newComp, rimRevolve.bodies.item(0), rimErd, self.spokeCount, spokeHoleRadius, nippleHoleRadius, holeOffset)
+        if jointFaces is None:
+            jointFaces = cutHolesByPattern(newComp, revolveAxis, rimErd, self.spokeCount, spokeHoleRadius, nippleHoleRadius)
+
+    tagRimHoles(jointFaces)
+
+    newComp.isSketchFolderLightBulbOn = False
+    newComp.isConstructionFolderLightBulbOn = False
+
+    # return joint faces
+    return jointFaces
+
+# Tags the hole faces so the joint faces of a rim that is kept when a wheel is updated can be found again
+def tagRimHoles(jointFaces: list):
+    for index, face in enumerate(jointFaces):
+        face.attributes.add(config.attribute_group, 'rimHole', str(index))
+
+# Tags a feature or sketch updateRim edits with its role
+def tagFeature(entity, role: str):
+    entity.attributes.add(config.attribute_group, 'rimFeature', role)
+
+@profiling.traced()
+def updateRim(occurrence: fusion.Occurrence, self: RimLogic):
+    """Changes the size or spoke count of a rim createRim built, returns its joint faces like createRim.
+
+    The revolve axis and the valve hole are moved to the new ERD, patterned holes get the new plane angle,
+    nipple hole offset and quantities and combined holes are cut again. Returns None when the rim has to be
+    built again: in a direct design, when its component is placed more than once or when the rim was built
+    before its features were tagged.
+    """
+    component = occurrence.component
+    if design.designType != fusion.DesignTypes.ParametricDesignType:
+        return None
+    if design.rootComponent.occurrencesByComponent(component).count != 1:
+        return None
+    features = {}
+    for attribute in design.findAttributes(config.attribute_group, 'rimFeature'):
+        feature = attribute.parent
+        if feature and feature.parentComponent == component:
+            features[attribute.value] = feature
+    patterned = {'spokeHoleSketch', 'spokeHole', 'spokeHolePattern', 'nippleHole', 'nippleHolePattern'} <= features.keys()
+    combined = {'holeTools', 'holeCut'} <= features.keys()
+    if not {'revolve', 'revolveAxis', 'valveHole'} <= features.keys() or not (patterned or combined):
+        return None
+
+    spokeHoleRadius = 0.225
+    nippleHoleRadius = 0.3
+    rimErd = catalog.get_catalog().rim(self.rim)['sizes'][self.size]
+    if not patterned:
+        # The tool body was built for the old holes, taking the cut back first also saves recomputing it below
+        features['holeCut'].deleteMe()
+        features['holeTools'].deleteMe()
+
+    revolveAxis = features['revolveAxis'].sketchCurves.sketchLines.item(0)
+    # Both sketches are on the XY plane and centered on the ERD, so they move up or down by the same step
+    step = rimErd / 2 - revolveAxis.startSketchPoint.geometry.y
+    if abs(step) > 1e-9:
+        transform = core.Matrix3D.create()
+        transform.translation = core.Vector3D.create(0, step, 0)
+        for sketch in (features['revolveAxis'], features['valveHole']):
+            curves = core.ObjectCollection.create()
+            for curve in sketch.sketchCurves:
+                curves.add(curve)
+            sketch.move(curves, transform)
+
+    if patterned:
+        plane = fusion.ConstructionPlaneByAngleDefinition.cast(features['spokeHoleSketch'].referencePlane.definition)
+        plane.angle.value = 2 * pi / self.spokeCount / 2
+        fusion.OffsetStartDefinition.cast(features['nippleHole'].startExtent).offset.value = rimErd / 2
+        for name in ('spokeHolePattern', 'nippleHolePattern'):
+            features[name].quantity.expression = str(self.spokeCount)
+        jointFaces = [features['spokeHole'].sideFaces.item(0)] + list(features['spokeHolePattern'].faces)
+    else:
+        holeOffset = catalog.get_catalog().rim(self.rim).get('holeOffset', self.holeOffset)
+        jointFaces = cutHolesByCombine(component, features['revolve'].bodies.item(0), rimErd, self.spokeCount, spokeHoleRadius, nippleHoleRadius, holeOffset)
+        if jointFaces is None:
+            jointFaces = cutHolesByPattern(component, revolveAxis, rimErd, self.spokeCount, spokeHoleRadius, nippleHoleRadius)
+
+    for attribute in design.findAttributes(config.attribute_group, 'rimHole'):
+        face = fusion.BRepFace.cast(attribute.parent)
+        if face and face.body.parentComponent == component:
+            attribute.deleteMe()
+    tagRimHoles(jointFaces)
+    component.name = f'Rim {self.rim} x {self.size} x {self.spokeCount}'
+    return jointFaces
+
+# Returns the tagged hole faces of a rim occurrence in hole order, in the context of the occurrence
+@profiling.traced()
+def rimHoleFaces(occurrence: fusion.Occurrence):
+    component = occurrence.component
+    faces = {}
+    for attribute in design.findAttributes(config.attribute_group, 'rimHole'):
+        face = fusion.BRepFace.cast(attribute.parent)
+        if face and face.body.parentComponent == component:
+            faces[int(attribute.value)] = face.createForAssemblyContext(occurrence)
+    return [faces[index] for index in sorted(faces)]
+
+# Cuts one spoke hole and one nipple hole and circular patterns each of them around the rim
+@profiling.traced()
+def cutHolesByPattern(newComp: fusion.Component, revolveAxis: fusion.SketchLine, rimErd: float, spokeCount: int, spokeHoleRadius: float, nippleHoleRadius: float):
+    sketches = newComp.sketches
+    extrudes = newComp.features.extrudeFeatures
 
     # Cut spoke holes in rim
     # Create angled plane for first extrude cut
     constructionPlanes = newComp.constructionPlanes
     spokeHolePlaneInput: fusion.ConstructionPlaneInput = constructionPlanes.createInput()
-    spokeHolePlaneInput.setByAngle(revolveAxis, core.ValueInput.createByReal(2 * pi / self.spokeCount / 2), newComp.xYConstructionPlane)
+    spokeHolePlaneInput.setByAngle(revolveAxis, core.ValueInput.createByReal(2 * pi / spokeCount / 2), newComp.xYConstructionPlane)
     spokeHolePlane = constructionPlanes.add(spokeHolePlaneInput)
 
     # Create sketch for spoke hole cut
@@ -233,24 +320,27 @@ def createRim(self: RimLogic):
     circles.addByCenterRadius(createPoint(0, 0, 0), nippleHoleRadius)
     spokeHoleProfile = spokeHoleSketch.profiles.item(0)
     nippleHoleProfile = spokeHoleSketch.profiles.item(1)
+    tagFeature(spokeHoleSketch, 'spokeHoleSketch')
 
     # Extrude first spoke hole
     spokeHoleExtrudeInput = extrudes.createInput(spokeHoleProfile, fusion.FeatureOperations.CutFeatureOperation)
     extentDef = fusion.ThroughAllExtentDefinition.create()
     extentDir = fusion.ExtentDirections.NegativeExtentDirection
     spokeHoleExtrudeInput.setOneSideExtent(extentDef, extentDir)
-    spokeHoleExtrudeFeature = extrudes.add(spokeHoleExtrudeInput)
+    with profiling.span('rim spokeHoleExtrude'):
+        spokeHoleExtrudeFeature = extrudes.add(spokeHoleExtrudeInput)
 
     # Round pattern the spoke hole
     patterns = newComp.features.circularPatternFeatures
     collection = core.ObjectCollection.create()
     collection.add(spokeHoleExtrudeFeature)
     spokeHolePatternInput = patterns.createInput(collection, revolveAxis)
-    spokeHolePatternInput.quantity = core.ValueInput.createByReal(self.spokeCount)
+    spokeHolePatternInput.quantity = core.ValueInput.createByReal(spokeCount)
     spokeHolePatternInput.isSymmetric = False
     spokeHolePatternInput.totalAngle = core.ValueInput.createByReal(2 * pi)
     # spokeHolePatternInput.patternComputeOption = 0
-    spokeHolePatternFeature = patterns.add(spokeHolePatternInput)
+    with profiling.span('rim spokeHolePattern'):
+        spokeHolePatternFeature = patterns.add(spokeHolePatternInput)
 
     # Enlarge spoke holes in outer rim wall
     nippleHoleExtrudeInput = extrudes.createInput(nippleHoleProfile, fusion.FeatureOperations.CutFeatureOperation)
@@ -259,24 +349,104 @@ def createRim(self: RimLogic):
     extentDir = fusion.ExtentDirections.NegativeExtentDirection
     nippleHoleExtrudeInput.startExtent = offsetStart
     nippleHoleExtrudeInput.setOneSideExtent(extentDef, extentDir)
-    nippleHoleExtrudeFeature = extrudes.add(nippleHoleExtrudeInput)
+    with profiling.span('rim nippleHoleExtrude'):
+        nippleHoleExtrudeFeature = extrudes.add(nippleHoleExtrudeInput)
 
     # Round pattern the nipple hole
     collection = core.ObjectCollection.create()
     collection.add(nippleHoleExtrudeFeature)
     nippleHolePatternInput = patterns.createInput(collection, revolveAxis)
-    nippleHolePatternInput.quantity = core.ValueInput.createByReal(self.spokeCount)
+    nippleHolePatternInput.quantity = core.ValueInput.createByReal(spokeCount)
     nippleHolePatternInput.isSymmetric = False
     nippleHolePatternInput.patternComputeOption = 0
     nippleHolePatternInput.totalAngle = core.ValueInput.createByReal(2 * pi)
-    nippleHolePatternFeature = patterns.add(nippleHolePatternInput)
+    with profiling.span('rim nippleHolePattern'):
+        nippleHolePatternFeature = patterns.add(nippleHolePatternInput)
 
-    newComp.isSketchFolderLightBulbOn = False
-    newComp.isConstructionFolderLightBulbOn = False
+    tagFeature(spokeHoleExtrudeFeature, 'spokeHole')
+    tagFeature(spokeHolePatternFeature, 'spokeHolePattern')
+    tagFeature(nippleHoleExtrudeFeature, 'nippleHole')
+    tagFeature(nippleHolePatternFeature, 'nippleHolePattern')
 
-    # return joint faces
     jointFaces = []
     jointFaces.append(spokeHoleExtrudeFeature.sideFaces.item(0))
     for face in spokeHolePatternFeature.faces:
         jointFaces.append(face)
-    return jointFaces
\ No newline at end of file
+    return jointFaces
+
+# Builds every spoke and nipple hole as one temporary tool body and cuts them all with a single combine.
+# Returns None when the joint face of a hole cannot be found, after taking the cut back so the holes can be patterned instead.
+@profiling.traced()
+def cutHolesByCombine(newComp: fusion.Component, rimBody: fusion.BRepBody, rimErd: float, spokeCount: int, spokeHoleRadius: float, nippleHoleRadius: float, holeOffset: float = 0):
+    tempBRep = fusion.TemporaryBRepManager.get()
+
+    # Holes sit half a spacing either side of the valve hole, which is on the -Z side of the rim.
+    # Each one runs out from the wheel axis, and alternate holes are offset towards the left (-X) and right flange.
+    def holeAngle(index):
+        return pi / spokeCount + 2 * pi * index / spokeCount
+
+    tools = None
+    for index in range(spokeCount):
+        angle = holeAngle(index)
+        offset = -holeOffset if index % 2 == 0 else holeOffset
+        def along(distance):
+            return createPoint(offset, rimErd / 2 + distance * sin(angle), -distance * cos(angle))
+        # The spoke hole goes through every wall, the nipple hole only opens up the wall outside the ERD
+        spokeHole = tempBRep.createCylinderOrCone(along(0), spokeHoleRadius, along(rimErd), spokeHoleRadius)
+        nippleHole = tempBRep.createCylinderOrCone(along(rimErd / 2), nippleHoleRadius, along(rimErd), nippleHoleRadius)
+        tempBRep.booleanOperation(spokeHole, nippleHole, fusion.BooleanTypes.UnionBooleanType)
+        if tools is None:
+            tools = spokeHole
+        else:
+            tempBRep.booleanOperation(tools, spokeHole, fusion.BooleanTypes.UnionBooleanType)
+
+    # Temporary bodies can only be added to a parametric design inside a base feature
+    if design.designType == fusion.DesignTypes.ParametricDesignType:
+        baseFeature = newComp.features.baseFeatures.add()
+        baseFeature.startEdit()
+        toolBody = newComp.bRepBodies.add(tools, baseFeature)
+        baseFeature.finishEdit()
+    else:
+        toolBody = newComp.bRepBodies.add(tools)
+
+    combines = newComp.features.combineFeatures
+    collection = core.ObjectCollection.create()
+    collection.add(toolBody)
+    combineInput = combines.createInput(rimBody, collection)
+    combineInput.operation = fusion.FeatureOperations.CutFeatureOperation
+    combineInput.isKeepToolBodies = False
+    with profiling.span('rim combine'):
+        combine = combines.add(combineInput)
+
+    # Every hole wall of spoke hole size belongs to one hole, found from its angle around the axis.
+    # Where a hole passes through more than one wall the wall nearest the axis is the joint face, like the pattern's seed face.
+    jointFaces = [None] * spokeCount
+    distances = [None] * spokeCount
+    for face in combine.bodies.item(0).faces:
+        cylinder = core.Cylinder.cast(face.geometry)
+        if not cylinder or abs(cylinder.radius - spokeHoleRadius) > 1e-6:
+            continue
+        point = face.pointOnFace
+        dy = point.y - rimErd / 2
+        dz = point.z
+        index = round((atan2(dy, -dz) - holeAngle(0)) * spokeCount / (2 * pi)) % spokeCount
+        distance = dy * dy + dz * dz
+        if distances[index] is None or distance < distances[index]:
+            jointFaces[index] = face
+            distances[index] = distance
+
+    missing = [str(index + 1) for index, face in enumerate(jointFaces) if face is None]
+    if missing:
+        message = f'No joint face found for rim hole {", ".join(missing)} of {spokeCount} after the combine cut'
+        # A direct design has no timeline to take the cut back with
+        if design.designType != fusion.DesignTypes.ParametricDesignType:
+            raise Exception(message)
+        combine.deleteMe()
+        baseFeature.deleteMe()
+        futil.log(f'{message}, cutting the holes by pattern instead', core.LogLevels.WarningLogLevel)
+        return None
+    # Only a parametric design can take the cut back to cut it again, see updateRim
+    if design.designType == fusion.DesignTypes.ParametricDesignType:
+        tagFeature(baseFeature, 'holeTools')
+        tagFeature(combine, 'holeCut')
+    return jointFaces
@@ -1,7 +1,9 @@
 from enum import Enum
-from math import pi
+from math import pi, sin, cos
 import adsk.core as core
 import adsk.fusion as fusion
+from ...lib import preview, profiling, fusion360utils as futil
+from ... import config
 
 app = core.Application.get()
 if app:
@@ -13,6 +15,10 @@ if not design:
     alert('You must be in the design workspace to use this command')
 skipValidate = False
 
+PREVIEW_EVENT_ID = f'{config.COMPANY_NAME}_{config.ADDIN_NAME}_spokePreview'
+# Straight segments the j-bend is drawn with in the preview
+PREVIEW_BEND_STEPS = 6
+
 # class SpokeType(Enum):
 #     BUTTEDSTRAIGHT = 1
 #     BUTTEDJ = 2
@@ -45,6 +51,9 @@ class SpokeLogic():
         self.errorMessageTextInput = inputs.addTextBoxCommandInput('errMessage', '', '', 2, True)
         self.errorMessageTextInput.isFullWidth = True
 
+        self.CreateValidator()
+        self.preview = preview.MeshPreview(PREVIEW_EVENT_ID, spokePreview)
+
         skipValidate = False
 
     def HandleInputsChanged(self, args: core.InputChangedEventArgs):
@@ -65,32 +74,97 @@ class SpokeLogic():
                     self.buttedInput.isVisible = True
 
     def HandleValidateInputs(self, args: core.ValidateInputsEventArgs):
-        unitsMgr = design.unitsManager
         if not skipValidate:
-            self.errorMessageTextInput.text = ''
-            if not self.lengthInput.isValidExpression:
-                self.errorMessageTextInput.text = 'The spoke length is invalid'
-                args.areInputsValid = False
-                return
-                     
-            if self.lengthInput.value < 10 or self.lengthInput.value > 50:
-                self.errorMessageTextInput.text = 'The spoke length should be between 100 and 500 mm'
-                args.areInputsValid = False
+            message = self.validator.validate()
+            self.errorMessageTextInput.text = message
+            args.areInputsValid = not message
+            if message:
+                # The spoke drawn for the last valid length and diameter would not match the dialog any more
+                self.preview.cancel()
                 return
-            if self.bladedInput.value == True and self.buttedInput.value == True:
-                self.errorMessageTextInput.text = 'Bladed and Butted cannot both be checked'
-                args.areInputsValid = False
-                return
-            args.areInputsValid = True
-            self.bladed = self.bladedInput.value
-            self.butted = self.buttedInput.value
-            self.length = unitsMgr.evaluateExpression(self.lengthInput.expression)
-            self.diameter = unitsMgr.evaluateExpression(self.diameterInput.selectedItem.name)
-            self.straightPull = self.straightPullInput.value
+            values = self.validator.values
+            self.bladed = values['bladed']
+            self.butted = values['butted']
+            self.length = values['length']
+            self.diameter = values['diameter']
+            self.straightPull = values['straightPull']
+
+    def CreateValidator(self):
+        unitsMgr = design.unitsManager
+        validator = self.validator = futil.Validator()
+        validator.input('lengthValid', lambda: self.lengthInput.isValidExpression)
+        # The value of a value input is in the internal unit, cm, whatever unit the expression was typed in
+        validator.input('length', lambda: self.lengthInput.value)
+        validator.input('butted', lambda: self.buttedInput.value)
+        validator.input('bladed', lambda: self.bladedInput.value)
+        validator.input('straightPull', lambda: self.straightPullInput.value)
+        validator.input('diameterName', lambda: self.diameterInput.selectedItem.name)
+
+        @validator.derive('diameter', 'diameterName')
+        def diameter(name):
+            return unitsMgr.evaluateExpression(name)
+
+        @validator.rule('lengthValid')
+        def lengthIsValid(lengthValid):
+            if not lengthValid:
+                return 'The spoke length is invalid'
+
+        @validator.rule('length')
+        def lengthInRange(length):
+            if length < 10 or length > 50:
+                return 'The spoke length should be between 100 and 500 mm'
+
+        @validator.rule('bladed', 'butted')
+        def notBladedAndButted(bladed, butted):
+            if bladed and butted:
+                return 'Bladed and Butted cannot both be checked'
+
+    def HandlePreview(self, args: core.CommandEventArgs):
+        self.preview.request(self.length, self.diameter, self.butted or self.bladed, self.straightPull)
 
     def HandleExecute(self, args: core.CommandEventArgs):
-        createSpoke(self)
-
+        self.preview.cancel()
+        with profiling.recording('spoke', config.trace_dir, log=futil.log):
+            createSpoke(self)
+
+    def HandleDestroy(self, args: core.CommandEventArgs):
+        self.preview.close()
+
+    @property
+    def key(self):
+        # Spokes that share these values are geometrically identical and can share one component
+        return (self.length, self.diameter, self.butted, self.bladed, self.straightPull)
+
+# The spoke path as a polyline with the radius of the spoke at each point, along the same path createSpoke sweeps.
+# Bladed sections are drawn as round as butted ones. Runs on the preview timer thread, so it only does plain Python.
+def spokePreview(length: float, diameter: float, thinned: bool, straightPull: bool):
+    headOffset = .305 # cm
+    bendRadius = .3375 # cm
+    radius = diameter / 2
+    if straightPull:
+        shaft = length + 0.15
+        path = [(0, 0)]
+        direction = (1, 0)
+    else:
+        shaft = length - bendRadius + radius
+        path = [(0, 0)]
+        for step in range(PREVIEW_BEND_STEPS + 1):
+            angle = pi / 2 * step / PREVIEW_BEND_STEPS
+            path.append((headOffset + bendRadius * sin(angle), bendRadius - bendRadius * cos(angle)))
+        direction = (0, 1)
+    radii = [radius] * len(path)
+
+    # Butted spokes are thinned between the 1.5 cm at the head and the 1.5 cm at the thread, over 1 cm each way
+    start = path[-1]
+    stations = [(shaft, radius)]
+    if thinned:
+        stations = [(1.5, radius), (2.5, diameter * .375), (shaft - 2.5, diameter * .375), (shaft - 1.5, radius)] + stations
+    for distance, stationRadius in stations:
+        path.append((start[0] + direction[0] * distance, start[1] + direction[1] * distance))
+        radii.append(stationRadius)
+    return [preview.tube(path, radii)]
+
+@profiling.traced()
 def createSpoke(self: SpokeLogic):
     nonRound = True if self.butted or self.bladed else False
     threadLength = 1.0 # cm
@@ -162,7 +236,8 @@ def createSpoke(self: SpokeLogic):
         sweepInput.distanceOne = core.ValueInput.createByReal(1.5 / adjustedLength)
 
     # Sweep first body section
-    spokeBody = sweeps.add(sweepInput)
+    with profiling.span('spoke sweep'):
+        spokeBody = sweeps.add(sweepInput)
 
     if not nonRound:
         # Get face that threads will later be applied to
@@ -189,7 +264,8 @@ def createSpoke(self: SpokeLogic):
         endExtrudeInput = extrudes.createInput(profile5, fusion.FeatureOperations.NewBodyFeatureOperation)
         endExtrudeDistance = fusion.DistanceExtentDefinition.create(core.ValueInput.createByString('15 mm'))
         endExtrudeInput.setOneSideExtent(endExtrudeDistance, fusion.ExtentDirections.NegativeExtentDirection)
-        endExtrude = extrudes.add(endExtrudeInput) # end section
+        with profiling.span('spoke endExtrude'):
+            endExtrude = extrudes.add(endExtrudeInput) # end section
 
         tipFace = endExtrude.startFaces.item(0)
         profile4 = endExtrude.endFaces.item(0) # Profile 4 (wide end of second taper)
@@ -222,17 +298,20 @@ def createSpoke(self: SpokeLogic):
         taper1Input = lofts.createInput(fusion.FeatureOperations.JoinFeatureOperation)
         taper1Input.loftSections.add(profile1)
         taper1Input.loftSections.add(profile2)
-        taper1Loft = lofts.add(taper1Input) # first tapered section
+        with profiling.span('spoke taper1'):
+            taper1Loft = lofts.add(taper1Input) # first tapered section
 
         centerLoftInput = lofts.createInput(fusion.FeatureOperations.JoinFeatureOperation)
         centerLoftInput.loftSections.add(profile2)
         centerLoftInput.loftSections.add(profile3)
-        centerLoft = lofts.add(centerLoftInput) # center section
+        with profiling.span('spoke centerLoft'):
+            centerLoft = lofts.add(centerLoftInput) # center section
 
         taper2Input = lofts.createInput(fusion.FeatureOperations.JoinFeatureOperation)
         taper2Input.loftSections.add(profile3)
         taper2Input.loftSections.add(profile4)
-        taper2Loft = lofts.add(taper2Input) # second tapered section
+        with profiling.span('spoke taper2'):
+            taper2Loft = lofts.add(taper2Input) # second tapered section
         
 
     # Sketch the spoke head revolve profile
@@ -256,7 +335,8 @@ def createSpoke(self: SpokeLogic):
     revolveInput = revolves.createInput(headProfile, newComp.xConstructionAxis, fusion.FeatureOperations.JoinFeatureOperation)
     angle = core.ValueInput.createByReal(2 * pi)
     revolveInput.setAngleExtent(True, angle)
-    headRevolve = revolves.add(revolveInput)
+    with profiling.span('spoke headRevolve'):
+        headRevolve = revolves.add(revolveInput)
 
     # get edge for wheel assembly
     for edge in headRevolve.sideFaces.item(0).edges:
@@ -296,7 +376,8 @@ def createSpoke(self: SpokeLogic):
     
     # Create a split face feature of surface intersection split type
     splitFaceInput = splitFaceFeats.createInput(facesCol, threadStartPlane, True)
-    split = splitFaceFeats.add(splitFaceInput)
+    with profiling.span('spoke splitFace'):
+        split = splitFaceFeats.add(splitFaceInput)
     
     # Get face to add threads to
     threadFace = split.faces.item(0)
@@ -307,7 +388,8 @@ def createSpoke(self: SpokeLogic):
     threadInput.threadLength = core.ValueInput.createByReal(threadLength)
     
     # create the thread
-    thread = threads.add(threadInput)
+    with profiling.span('spoke thread'):
+        thread = threads.add(threadInput)
 
     newComp.isConstructionFolderLightBulbOn = False
-    return (jointEdge, threadFace)
\ No newline at end of file
+    return (jointEdge, threadFace, occurence)
\ No newline at end of file
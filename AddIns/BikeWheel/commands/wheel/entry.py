@@ -3,9 +3,9 @@
 
 import adsk.core
 import os
+import time
 from ...lib import fusion360utils as futil
 from ... import config
-from . import logic
 app = adsk.core.Application.get()
 ui = app.userInterface
 
@@ -33,10 +33,6 @@ PANEL_AFTER = config.my_panel_after
 # Resource location for command icons, here we assume a sub folder in this directory named "resources".
 ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources', '')
 
-# Local list of event handlers used to maintain a reference so
-# they are not released and garbage collected.
-local_handlers = []
-
 
 # Executed when add-in is run.
 def start():
@@ -93,12 +89,19 @@ def command_created(args: adsk.core.CommandCreatedEventArgs):
     # https://help.autodesk.com/view/fusion360/ENU/?contextId=CommandInputs
     inputs = args.command.commandInputs
 
-    # Connect to the events that are needed by this command.
-    futil.add_handler(args.command.execute, command_execute, local_handlers=local_handlers)
-    futil.add_handler(args.command.inputChanged, command_input_changed, local_handlers=local_handlers)
-    futil.add_handler(args.command.executePreview, command_preview, local_handlers=local_handlers)
-    futil.add_handler(args.command.validateInputs, command_validate_input, local_handlers=local_handlers)
-    futil.add_handler(args.command.destroy, command_destroy, local_handlers=local_handlers)
+    # Connect to the events that are needed by this command. The handlers are kept in a scope named after
+    # the command so they are not garbage collected while the dialog is open, and released when it is destroyed.
+    scope = futil.handler_scope(CMD_ID)
+    futil.add_handler(args.command.execute, command_execute, scope=scope)
+    futil.add_handler(args.command.inputChanged, command_input_changed, scope=scope)
+    futil.add_handler(args.command.executePreview, command_preview, scope=scope)
+    futil.add_handler(args.command.validateInputs, command_validate_input, scope=scope)
+    futil.add_handler(args.command.destroy, command_destroy, scope=scope)
+
+    # The logic module is only imported once the command is first run, so registering the button at add-in start stays cheap
+    load_start = time.perf_counter()
+    from . import logic
+    futil.log(f'{CMD_NAME} logic ready in {(time.perf_counter() - load_start) * 1000:.1f} ms')
 
     global wheel_logic
     wheel_logic = logic.WheelLogic()
@@ -122,7 +125,7 @@ def command_execute(args: adsk.core.CommandEventArgs):
 # This event handler is called when the command needs to compute a new preview in the graphics window.
 def command_preview(args: adsk.core.CommandEventArgs):
     # General logging for debug.
-    futil.log(f'{CMD_NAME} Command Preview Event')
+    futil.log(lambda: f'{CMD_NAME} Command Preview Event')
     # inputs = args.command.commandInputs
 
 
@@ -134,14 +137,14 @@ def command_input_changed(args: adsk.core.InputChangedEventArgs):
 
     if changed_input.id != 'errMessage':
         # General logging for debug.
-        futil.log(f'{CMD_NAME} Input Changed Event fired from a change to {changed_input.id}')
+        futil.log(lambda: f'{CMD_NAME} Input Changed Event fired from a change to {changed_input.id}')
         wheel_logic.HandleInputsChanged(args)
 
 # This event handler is called when the user interacts with any of the inputs in the dialog
 # which allows you to verify that all of the inputs are valid and enables the OK button.
 def command_validate_input(args: adsk.core.ValidateInputsEventArgs):
     # General logging for debug.
-    futil.log(f'{CMD_NAME} Validate Input Event')
+    futil.log(lambda: f'{CMD_NAME} Validate Input Event')
 
     wheel_logic.HandleValidateInputs(args)
         
@@ -151,5 +154,5 @@ def command_destroy(args: adsk.core.CommandEventArgs):
     # General logging for debug.
     futil.log(f'{CMD_NAME} Command Destroy Event')
 
-    global local_handlers
-    local_handlers = []
+    futil.release_scope(CMD_ID)
+    futil.log(f'{CMD_NAME} released its handlers, {futil.live_handlers()} still live')
@@ -0,0 +1,53 @@
+# Spoke lacing tables for the wheel assembly.
+# This module does not depend on adsk so tables can be computed (and tested) outside of Fusion.
+from functools import lru_cache
+
+# Values stored per spoke in a lacing table
+FIELDS = ('rimHole', 'flange', 'hubHole', 'flipped')
+LEFT = 0
+RIGHT = 1
+
+CROSS_NAMES = {0: 'Radial', 1: '1x', 2: '2x', 3: '3x', 4: '4x'}
+
+
+def validateLacing(spokes: int, crosses: int):
+    """Returns the message to show for a spoke count and cross count that can not be laced, or None."""
+    if spokes % 2 != 0 or spokes < 16 or spokes > 48:
+        return 'Spoke count must be even and between 16 and 48'
+    if crosses not in CROSS_NAMES:
+        return 'Lacing must be radial or 1x to 4x'
+    # Crossed spokes alternate leading and trailing around each flange, which needs an even number of holes per flange
+    if crosses and spokes % 4 != 0:
+        return f'{spokes} spokes can only be laced radially'
+    # Each cross turns a spoke by another hub hole spacing, at 90 degrees it would leave the flange tangentially
+    if crosses * 720 >= spokes * 90:
+        return f'{spokes} spokes can be laced at most {(spokes * 90 - 1) // 720}x'
+    return None
+
+
+@lru_cache(maxsize=None)
+def lacingTable(spokes: int, crosses: int) -> bytes:
+    """Computes which rim hole and hub hole every spoke joins for a cross laced wheel.
+
+    Rim holes are numbered around the rim, even holes go to the left flange and odd holes to the right one.
+    Each flange has spokes / 2 holes numbered around the axle starting at the hole in line with rim hole 0
+    (left) or 1 (right). Spokes from even hub holes lead and are flipped, spokes from odd hub holes trail,
+    and each one lands crosses hub hole spacings (two rim holes each) ahead of or behind its hub hole.
+
+    :returns:
+        A flat table of len(FIELDS) values per spoke, ordered by rim hole. Spoke i is
+        table[i * 4:i * 4 + 4] == (rimHole, flange, hubHole, flipped). The table is cached per
+        (spokes, crosses), which is why it is immutable bytes.
+    """
+    errMsg = validateLacing(spokes, crosses)
+    if errMsg:
+        raise Exception(errMsg)
+
+    table = bytearray(len(FIELDS) * spokes)
+    for flange in (LEFT, RIGHT):
+        for hubHole in range(spokes // 2):
+            leading = hubHole % 2 == 0
+            direction = 1 if leading else -1
+            rimHole = (2 * hubHole + flange + 2 * crosses * direction) % spokes
+            table[rimHole * 4:rimHole * 4 + 4] = (rimHole, flange, hubHole, leading)
+    return bytes(table)
@@ -1,9 +1,15 @@
+import json
+import time
+import uuid
 from enum import Enum
 from math import pi
   
 from ..spoke import logic as Spoke
 from ..rim import logic as Rim
 from ..hub import logic as Hub
+from . import lacing, spoke_length
+from ...lib import catalog, profiling, fusion360utils as futil
+from ... import config
 
 import adsk.core as core
 import adsk.fusion as fusion
@@ -31,30 +37,51 @@ class WheelLogic():
         self.spokeType = SpokeType.BUTTEDJ
         self.rim = ""
         self.rimSize = "700c"
+        self.crosses = 3
+        self.deferCompute = True
+        self.exportLengths = False
+        # Id of the wheel being edited, None builds a new one
+        self.wheelId = None
     
     def CreateCommandInputs(self, inputs: core.CommandInputs):
         global skipValidate
         skipValidate = True
 
+        self.wheelInput: core.DropDownCommandInput = inputs.addDropDownCommandInput('wheel', 'Wheel', core.DropDownStyles.TextListDropDownStyle)
+        self.wheelInput.listItems.add('New Wheel', True)
+        self.wheelInput.tooltip = 'Pick a wheel built earlier to only rebuild the parts affected by the changed inputs'
+        # Dropdown label -> (wheel id, spec)
+        self.wheels = {}
+        for wheelId, spec in listWheels():
+            label = wheelLabel(wheelId, spec)
+            self.wheels[label] = (wheelId, spec)
+            self.wheelInput.listItems.add(label, False)
+
+        parts = catalog.get_catalog()
+        # The hub and rim dropdowns only list the parts that fit the choices above them, see _fillHubs and _fillRims
+        self.hubTypeInput: core.DropDownCommandInput = inputs.addDropDownCommandInput('hubType', 'Hub Type', core.DropDownStyles.TextListDropDownStyle)
+        for hubType in parts.hubValues('type'):
+            self.hubTypeInput.listItems.add(hubType, hubType == 'Front')
+
         self.hubInput: core.DropDownCommandInput = inputs.addDropDownCommandInput(
             "hub", "Hub", core.DropDownStyles.TextListDropDownStyle
         )
-        for hub in Hub.hubData:
-            self.hubInput.listItems.add(hub, False)
-
-        self.rimInput: core.DropDownCommandInput = inputs.addDropDownCommandInput('rim', 'Rim', core.DropDownStyles.TextListDropDownStyle)
-        for rim in Rim.rimProfiles:
-            self.rimInput.listItems.add(rim, False)
+        self._fillHubs()
 
         self.sizeInput: core.DropDownCommandInput = inputs.addDropDownCommandInput('size', 'Size', core.DropDownStyles.TextListDropDownStyle)
-        # rimSizes = Rim.rimProfiles[self.rimInput.selectedItem.name]['sizes'].keys()
-        # for size in rimSizes:
-            # self.sizeInput.listItems.add(size, False)
+        for size in parts.rimSizes():
+            self.sizeInput.listItems.add(size, size == self.rimSize)
 
         self.spokesInput: core.DropDownCommandInput = inputs.addDropDownCommandInput('spokes', 'Spokes', core.DropDownStyles.TextListDropDownStyle)
-        # spokeCounts = Rim.rimProfiles[self.rimInput.selectedItem.name]['spokes']
-        # for count in spokeCounts:
-            # self.spokesInput.listItems.add(str(count), False)
+        for count in parts.drillings():
+            self.spokesInput.listItems.add(str(count), count == self.spokeQuantity)
+
+        self.rimInput: core.DropDownCommandInput = inputs.addDropDownCommandInput('rim', 'Rim', core.DropDownStyles.TextListDropDownStyle)
+        self._fillRims()
+
+        self.lacingInput: core.DropDownCommandInput = inputs.addDropDownCommandInput('lacing', 'Lacing', core.DropDownStyles.TextListDropDownStyle)
+        for crosses, name in lacing.CROSS_NAMES.items():
+            self.lacingInput.listItems.add(name, crosses == self.crosses)
 
         self.buttedInput: core.BoolValueCommandInput = inputs.addBoolValueInput('butted', 'Butted', True, '', False)
         # self.straightPullInput: core.BoolValueCommandInput = inputs.addBoolValueInput('straightPull', 'Straight Pull', True, '', False)
@@ -65,153 +92,354 @@ class WheelLogic():
         self.diameterInput.listItems.add('2.3 mm', False)
         self.diameterInput.listItems.add('2.6 mm', False)
 
+        self.deferComputeInput: core.BoolValueCommandInput = inputs.addBoolValueInput('deferCompute', 'Join Spokes Last', True, '', self.deferCompute)
+        self.deferComputeInput.tooltip = 'Add the spoke joints after all of the spokes are placed instead of joining each spoke as it is placed'
+
+        self.exportLengthsInput: core.BoolValueCommandInput = inputs.addBoolValueInput('exportLengths', 'Export Spoke Lengths', True, '', False)
+        self.exportLengthsInput.tooltip = 'Write the spoke lengths of every catalog hub and rim to a CSV file instead of building a wheel'
+
         self.errorMessageTextInput = inputs.addTextBoxCommandInput('errMessage', '', '', 2, True)
         self.errorMessageTextInput.isFullWidth = True
 
+        self.CreateValidator()
+
         skipValidate = False
 
     def HandleInputsChanged(self, args: core.InputChangedEventArgs):
         changedInput = args.input
         
         if not skipValidate:
-            if changedInput.id == 'rim':
-                self.sizeInput.listItems.clear()
-                self.spokesInput.listItems.clear()
-                rimSizes = Rim.rimProfiles[self.rimInput.selectedItem.name]['sizes'].keys()
-                for size in rimSizes:
-                    self.sizeInput.listItems.add(size, False)
-                spokeCounts = Rim.rimProfiles[self.rimInput.selectedItem.name]['spokes']
-                for count in spokeCounts:
-                    self.spokesInput.listItems.add(str(count), False)
+            if changedInput.id == 'hubType':
+                self._fillHubs()
+            elif changedInput.id in ('size', 'spokes'):
+                self._fillRims()
+            elif changedInput.id == 'wheel':
+                self._loadWheelInputs()
 
-    def HandleValidateInputs(self, args: core.ValidateInputsEventArgs):
+    # Lists the hubs of the selected type, keeping hub or else the current choice selected if it is one of them
+    def _fillHubs(self, hub: str = None):
+        hub = hub or selectedName(self.hubInput)
+        self.hubInput.listItems.clear()
+        for name in catalog.get_catalog().hubs(type=selectedName(self.hubTypeInput)):
+            self.hubInput.listItems.add(name, name == hub)
+
+    # Lists the rims that come in the selected size and drilling, keeping rim or else the current choice selected
+    def _fillRims(self, rim: str = None):
+        rim = rim or selectedName(self.rimInput)
+        self.rimInput.listItems.clear()
+        spokes = selectedName(self.spokesInput)
+        for name in catalog.get_catalog().rims(selectedName(self.sizeInput), int(spokes) if spokes else None):
+            self.rimInput.listItems.add(name, name == rim)
+
+    # Fills the dialog with the inputs the selected wheel was built with
+    def _loadWheelInputs(self):
+        global skipValidate
+        selected = self.wheels.get(self.wheelInput.selectedItem.name)
+        self.wheelId = selected[0] if selected else None
+        if not selected:
+            return
+        spec = selected[1]
         unitsMgr = design.unitsManager
+        skipValidate = True
+        hubType = catalog.get_catalog().hub(spec['hub'])['type']
+        for item in self.hubTypeInput.listItems:
+            item.isSelected = item.name == hubType
+        self._fillHubs(spec['hub'])
+        for item in self.sizeInput.listItems:
+            item.isSelected = item.name == spec['size']
+        for item in self.spokesInput.listItems:
+            item.isSelected = item.name == str(spec['spokes'])
+        self._fillRims(spec['rim'])
+        self.lacingInput.listItems.item(spec['crosses']).isSelected = True
+        self.buttedInput.value = spec['butted']
+        for item in self.diameterInput.listItems:
+            item.isSelected = abs(unitsMgr.evaluateExpression(item.name) - spec['diameter']) < 1e-6
+        skipValidate = False
+
+    def HandleValidateInputs(self, args: core.ValidateInputsEventArgs):
         if not skipValidate:
-            self.errorMessageTextInput.text = ''
-            self.hub = self.hubInput.selectedItem.name
-            self.rim = self.rimInput.selectedItem.name
-            self.size = self.sizeInput.selectedItem.name
-            self.spokes = int(self.spokesInput.selectedItem.name)
-            # if not self.lengthInput.isValidExpression:
-            #     self.errorMessageTextInput.text = 'The spoke length is invalid'
-            #     args.areInputsValid = False
-            #     return
-                     
-            # if self.lengthInput.value < 10 or self.lengthInput.value > 50:
-            #     self.errorMessageTextInput.text = 'The spoke length should be between 100 and 500 mm'
-            #     args.areInputsValid = False
-            #     return
-            # if self.bladedInput.value == True and self.buttedInput.value == True:
-            #     self.errorMessageTextInput.text = 'Bladed and Butted cannot both be checked'
-            #     args.areInputsValid = False
-            #     return
-            # args.areInputsValid = True
-            # self.bladed = self.bladedInput.value
-            # self.butted = self.buttedInput.value
-            # self.length = unitsMgr.evaluateExpression(self.lengthInput.expression)
-            # self.diameter = unitsMgr.evaluateExpression(self.diameterInput.selectedItem.name)
-            # self.straightPull = self.straightPullInput.value
+            message = self.validator.validate()
+            values = self.validator.values
+            self.hub = values['hub']
+            self.rim = values['rim']
+            self.size = values['size']
+            self.spokes = values['spokes']
+            self.crosses = values['crosses']
+            self.deferCompute = values['deferCompute']
+            self.exportLengths = values['exportLengths']
+            self.errorMessageTextInput.text = message
+            if message:
+                args.areInputsValid = False
+
+    def CreateValidator(self):
+        validator = self.validator = futil.Validator()
+        validator.input('hub', lambda: selectedName(self.hubInput))
+        validator.input('rim', lambda: selectedName(self.rimInput))
+        validator.input('size', lambda: selectedName(self.sizeInput))
+        validator.input('spokes', lambda: int(selectedName(self.spokesInput) or 0))
+        validator.input('crosses', lambda: self.lacingInput.selectedItem.index)
+        validator.input('deferCompute', lambda: self.deferComputeInput.value)
+        validator.input('exportLengths', lambda: self.exportLengthsInput.value)
+
+        @validator.rule('hub')
+        def hubChosen(hub):
+            if not hub:
+                return 'Please pick a hub'
+
+        @validator.rule('rim')
+        def rimChosen(rim):
+            if not rim:
+                return 'Please pick a rim, only rims in the selected size and drilling are listed'
+
+        @validator.rule('spokes', 'crosses')
+        def lacingFits(spokes, crosses):
+            return lacing.validateLacing(spokes, crosses)
 
     def HandleExecute(self, args: core.CommandEventArgs):
         unitsMgr = design.unitsManager
+        parts = catalog.get_catalog()
+
+        if self.exportLengths:
+            fileDialog = ui.createFileDialog()
+            fileDialog.title = 'Save spoke lengths'
+            fileDialog.filter = 'CSV files (*.csv)'
+            if fileDialog.showSave() != core.DialogResults.DialogOK:
+                return
+            spoke_length.exportTable(fileDialog.filename, parts.hubSpecs(), parts.rimSpecs())
+            futil.log(f'Spoke lengths written to {fileDialog.filename}', force_console=True)
+            return
 
         self.hub_logic = Hub.HubLogic()
-        self.hub_logic.hubType: Hub.HubType = Hub.hubData[self.hub]["type"]
-        self.hub_logic.brakeType: Hub.BrakeType = Hub.hubData[self.hub]["brake"]
-        self.hub_logic.axleType: Hub.AxleType = Hub.hubData[self.hub]["axle"]
-        self.hub_logic.axleDia = Hub.axleDiameters[self.hub_logic.hubType.name][self.hub_logic.axleType.name]
-        self.hub_logic.old = Hub.hubData[self.hub]["old"]
-        self.hub_logic.leftFlangeDia = Hub.hubData[self.hub]["leftFlangeDia"]
-        self.hub_logic.rightFlangeDia = Hub.hubData[self.hub]["rightFlangeDia"]
-        self.hub_logic.centerToLeftFlange = Hub.hubData[self.hub]["centerToLeftFlange"]
-        self.hub_logic.centerToRightFlange = Hub.hubData[self.hub]["centerToRightFlange"]
+        hub = parts.hub(self.hub)
+        self.hub_logic.hubType: Hub.HubType = Hub.HubType[hub["type"]]
+        self.hub_logic.brakeType: Hub.BrakeType = Hub.BrakeType[hub["brake"]]
+        self.hub_logic.axleType: Hub.AxleType = Hub.AxleType[hub["axle"]]
+        self.hub_logic.axleDia = parts.axleDiameter(hub["type"], hub["axle"])
+        self.hub_logic.old = hub["old"]
+        self.hub_logic.leftFlangeDia = hub["leftFlangeDia"]
+        self.hub_logic.rightFlangeDia = hub["rightFlangeDia"]
+        self.hub_logic.centerToLeftFlange = hub["centerToLeftFlange"]
+        self.hub_logic.centerToRightFlange = hub["centerToRightFlange"]
         self.hub_logic.spokes = self.spokes
         self.hub_logic.preset = self.hub
 
         self.spoke_logic = Spoke.SpokeLogic()
         # self.bladed = self.bladedInput.value
         self.spoke_logic.butted = self.buttedInput.value
-        self.length = {} # TODO calculate this length
+        # (left, right), the flanges usually sit at different distances from the center
+        erd = parts.rim(self.rim)['sizes'][self.size]
+        self.length = spoke_length.wheelLengths(hub, erd, self.spokes, self.crosses)
         self.diameter = unitsMgr.evaluateExpression(self.diameterInput.selectedItem.name)
+        self.spoke_logic.diameter = self.diameter
         # self.straightPull = self.straightPullInput.value
 
         self.rim_logic = Rim.RimLogic()
-        self.rim_logic.rimProfilePath = f'{self.rim_logic.resource_dir}{Rim.rimProfiles[self.rim]["profile"]}'
+        self.rim_logic.rimProfilePath = f'{self.rim_logic.resource_dir}{parts.rim(self.rim)["profile"]}'
         self.rim_logic.rim = self.rim
         self.rim_logic.size = self.size
         self.rim_logic.spokeCount = self.spokes
 
-        createWheel(self)
+        with profiling.recording('wheel', config.trace_dir, log=futil.log):
+            createWheel(self)
+
+# Name of the selected item of a dropdown, or an empty string when nothing is selected
+def selectedName(dropDown: core.DropDownCommandInput):
+    item = dropDown.selectedItem
+    return item.name if item else ''
+
+# Inputs whose change means the hub or the rim has to be built again, anything else leaves them in place
+HUB_INPUTS = {'hub', 'spokes'}
+RIM_INPUTS = {'rim', 'size', 'spokes'}
+
+def wheelSpec(self: WheelLogic):
+    return {
+        'hub': self.hub,
+        'rim': self.rim,
+        'size': self.size,
+        'spokes': self.spokes,
+        'crosses': self.crosses,
+        'butted': self.spoke_logic.butted,
+        'diameter': self.diameter,
+    }
+
+def wheelLabel(wheelId: str, spec: dict):
+    return f"{spec['hub']} / {spec['rim']} {spec['size']} x {spec['spokes']} ({wheelId})"
 
+# Returns (wheel id, spec) for every wheel built in the design
+def listWheels():
+    wheels = []
+    for attribute in design.attributes.itemsByGroup(config.attribute_group):
+        if attribute.name.startswith('wheel:'):
+            wheels.append((attribute.name[len('wheel:'):], json.loads(attribute.value)))
+    return wheels
+
+@profiling.traced()
+def loadWheel(wheelId: str):
+    """Finds the parts of a wheel built earlier from the attributes createWheel tagged them with.
+
+    :returns:
+        A dict with the wheel's 'spec', its 'hub' and 'rim' occurrences (None if they were deleted) and
+        'spokes', index -> dict of the spoke's 'occurrence', lacing 'row', component 'key' and 'joint'.
+    """
+    attribute = design.attributes.itemByName(config.attribute_group, f'wheel:{wheelId}')
+    if not attribute:
+        return None
+    wheel = {'spec': json.loads(attribute.value), 'hub': None, 'rim': None, 'spokes': {}}
+    for attribute in design.findAttributes(config.attribute_group, 'wheelPart'):
+        part = json.loads(attribute.value)
+        occurrence = fusion.Occurrence.cast(attribute.parent)
+        if not occurrence or part['wheel'] != wheelId:
+            continue
+        if part['role'] == 'spoke':
+            wheel['spokes'][part['index']] = {'occurrence': occurrence, 'row': tuple(part['row']), 'key': part['key'], 'joint': None}
+        else:
+            wheel[part['role']] = occurrence
+    for attribute in design.findAttributes(config.attribute_group, 'spokeJoint'):
+        part = json.loads(attribute.value)
+        joint = fusion.Joint.cast(attribute.parent)
+        if joint and part['wheel'] == wheelId and part['index'] in wheel['spokes']:
+            wheel['spokes'][part['index']]['joint'] = joint
+    return wheel
+
+def tagPart(occurrence: fusion.Occurrence, wheelId: str, role: str, **values):
+    occurrence.attributes.add(config.attribute_group, 'wheelPart', json.dumps(dict(values, wheel=wheelId, role=role)))
+
+def tagJoint(joint: fusion.Joint, wheelId: str, index: int):
+    joint.attributes.add(config.attribute_group, 'spokeJoint', json.dumps({'wheel': wheelId, 'index': index}))
+
+def spokeKey(spoke_logic: Spoke.SpokeLogic):
+    return json.dumps(list(spoke_logic.key))
+
+# Returns the first entity tagged with name whose body belongs to component
+def taggedEntity(name: str, component: fusion.Component):
+    for attribute in design.findAttributes(config.attribute_group, name):
+        entity = attribute.parent
+        if entity and entity.body.parentComponent == component:
+            return entity
+    return None
+
+# Returns (component, head edge, thread face) of the spoke component built for key, or None if there is none yet
+def spokeTemplate(key: str, spokeComponents: dict):
+    if key not in spokeComponents:
+        spokeComponents[key] = None
+        for attribute in design.findAttributes(config.attribute_group, 'spokeKey'):
+            component = fusion.Component.cast(attribute.parent)
+            if component and attribute.value == key:
+                spokeComponents[key] = (component, taggedEntity('spokeHead', component), taggedEntity('spokeThread', component))
+                break
+    return spokeComponents[key]
+
+@profiling.traced()
+def placeSpoke(spoke_logic: Spoke.SpokeLogic, spokeComponents: dict):
+    # Identical spokes share one component, each spoke in the wheel is just another occurrence of it
+    rootComp = design.rootComponent
+    key = spokeKey(spoke_logic)
+    template = spokeTemplate(key, spokeComponents)
+    if template is None:
+        (headEdge, threadFace, occurrence) = Spoke.createSpoke(spoke_logic)
+        occurrence.component.attributes.add(config.attribute_group, 'spokeKey', key)
+        headEdge.attributes.add(config.attribute_group, 'spokeHead', key)
+        threadFace.attributes.add(config.attribute_group, 'spokeThread', key)
+        spokeComponents[key] = (occurrence.component, headEdge, threadFace)
+    else:
+        occurrence = rootComp.occurrences.addExistingComponent(template[0], core.Matrix3D.create())
+    return occurrence
+
+def spokeJointGeometry(occurrence: fusion.Occurrence, key: str, spokeComponents: dict):
+    (component, headEdge, threadFace) = spokeTemplate(key, spokeComponents)
+    # Joint geometry has to come from proxies in the context of the occurrence being placed
+    return (headEdge.createForAssemblyContext(occurrence), threadFace.createForAssemblyContext(occurrence))
+
+@profiling.traced()
 def createWheel(self: WheelLogic):
+    """Builds a new wheel, or updates the wheel self.wheelId was built as.
+
+    Each wheel stores its inputs as a design attribute and tags its parts, so an update only rebuilds what
+    the changed inputs feed into. A new spoke count is edited into the hub and rim that are there and a new
+    size into the rim, a new hub or rim replaces it. A spoke is only replaced when its length or profile
+    changed and only joined again when it was replaced, its lacing changed or the hub was replaced or edited.
+    """
     rootComp = design.rootComponent
     joints = rootComp.joints
+    start = time.perf_counter()
 
-    [lHubEdges, rHubEdges] = Hub.createHub(self.hub_logic)
-    rimJointFaces = Rim.createRim(self.rim_logic)
+    spec = wheelSpec(self)
+    wheel = loadWheel(self.wheelId) if self.wheelId else None
+    wheelId = self.wheelId if wheel else uuid.uuid4().hex[:8]
+    changed = {name for name in spec if wheel is None or wheel['spec'].get(name) != spec[name]}
+
+    # The joints are between the spokes and the hub, so only a replaced or edited hub joins every spoke again
+    rejoinAll = False
+    hubOccurrence = wheel['hub'] if wheel else None
+    if hubOccurrence and not changed & HUB_INPUTS:
+        hubEdges = Hub.hubSpokeHoleEdges(hubOccurrence)
+    else:
+        hubEdges = None
+        # A new spoke count is a new hole pattern on the same hub
+        if hubOccurrence and changed & HUB_INPUTS == {'spokes'}:
+            hubEdges = Hub.updateHubSpokes(hubOccurrence, self.hub_logic)
+        if hubEdges is None:
+            if hubOccurrence:
+                hubOccurrence.deleteMe()
+            hubEdges = Hub.createHub(self.hub_logic)
+            tagPart(hubEdges[0][0].assemblyContext, wheelId, 'hub')
+        rejoinAll = True
+    [lHubEdges, rHubEdges] = hubEdges
+
+    # Nothing is joined to the rim yet, see jointInput1 below, so a rim can be replaced without touching the joints
+    rimOccurrence = wheel['rim'] if wheel else None
+    if not rimOccurrence or changed & RIM_INPUTS:
+        rimFaces = None
+        # A new size or spoke count is edited into the same rim, a new rim is a new profile
+        if rimOccurrence and 'rim' not in changed:
+            rimFaces = Rim.updateRim(rimOccurrence, self.rim_logic)
+        if rimFaces is None:
+            if rimOccurrence:
+                rimOccurrence.deleteMe()
+            rimFaces = Rim.createRim(self.rim_logic)
+            rimOccurrence = rootComp.occurrencesByComponent(rimFaces[0].body.parentComponent).item(0)
+            tagPart(rimOccurrence, wheelId, 'rim')
+    rimJointFaces = Rim.rimHoleFaces(rimOccurrence)
 
     # TODO create spoke nipples in rim
     # TODO create ball joints for each nipple
 
+    # One row per spoke of (rim hole, flange, hub hole, flipped), see lacing.lacingTable
+    table = lacing.lacingTable(self.spokes, self.crosses)
+
+    oldSpokes = wheel['spokes'] if wheel else {}
+    for index in [index for index in oldSpokes if index >= self.spokes]:
+        oldSpokes.pop(index)['occurrence'].deleteMe()
+
+    spokeComponents = {}
     spokes = []
-    for _ in range(self.spokes):
-        (spokeHeadEdge, spokeThreadFace) = Spoke.createSpoke(self.spoke_logic)
-        spokes.append([spokeHeadEdge, spokeThreadFace])
-
-    rimJointFaces0 = []
-    rimJointFaces1 = []
-    rimJointFaces2 = []
-    rimJointFaces3 = []
-    hubJointEdges0 = []
-    hubJointEdges1 = []
-    hubJointEdges2 = []
-    hubJointEdges3 = []
-
-    # TODO replace rim faces with nipple faces
-    for index, face in enumerate(rimJointFaces):
-        if index % 4 == 0:
-            rimJointFaces0.append(face)
-        elif index % 4 == 1:
-            rimJointFaces1.append(face)
-        elif index % 4 == 2:
-            rimJointFaces2.append(face)
+    for index in range(self.spokes):
+        row = tuple(table[index * 4:index * 4 + 4])
+        # Left and right spokes are different lengths, so each side gets its own shared component
+        self.spoke_logic.length = self.length[row[1]]
+        key = spokeKey(self.spoke_logic)
+        old = oldSpokes.get(index)
+        joint = old['joint'] if old else None
+        if old and old['key'] == key:
+            if old['row'] == row and not rejoinAll and joint and joint.isValid:
+                continue
+            occurrence = old['occurrence']
+            if joint and joint.isValid:
+                joint.deleteMe()
         else:
-            rimJointFaces3.append(face)
+            if old:
+                old['occurrence'].deleteMe()
+            occurrence = placeSpoke(self.spoke_logic, spokeComponents)
+        tagPart(occurrence, wheelId, 'spoke', index=index, row=row, key=key)
+        (spokeHeadEdge, spokeThreadFace) = spokeJointGeometry(occurrence, key, spokeComponents)
+        spokes.append((index, row, [spokeHeadEdge, spokeThreadFace]))
 
-    for index, edge in enumerate(lHubEdges):
-        if index % 2 == 0:
-            hubJointEdges0.append(edge)
-        else:
-            hubJointEdges2.append(edge)
-    
-    for index, edge in enumerate(rHubEdges):
-        if index % 2 == 0:
-            hubJointEdges1.append(edge)
-        else:
-            hubJointEdges3.append(edge)
-
-    for index, spoke in enumerate(spokes):
-        # if index % 2 == 0:
-        #     hubEdge = lHubEdges[int(index / 2)]
-        # else:
-        #     hubEdge = rHubEdges[int((index -1) / 2)]
-
-        if index % 4 == 0:
-            rimFace = rimJointFaces[index]
-            hubEdge = hubJointEdges0[int(index / 4)]
-            flipped = True
-        elif index % 4 == 1:
-            rimFace = rimJointFaces[int((index - 1) % 32)]
-            hubEdge = hubJointEdges1[int((index - 1) / 4)]
-            flipped = True
-        elif index % 4 == 2:
-            rimFace = rimJointFaces[int((index - 12) % 32)]
-            hubEdge = hubJointEdges2[int((index - 2) / 4)]
-            flipped = False
-        else:
-            rimFace = rimJointFaces[int((index - 13) % 32)]
-            hubEdge = hubJointEdges3[int((index - 3) / 4)]
-            flipped = False
+    hubEdges = (lHubEdges, rHubEdges)
+    jointInputs = []
+    for index, row, spoke in spokes:
+        rimHole, flange, hubHole, flipped = row
+        rimFace = rimJointFaces[rimHole]
+        hubEdge = hubEdges[flange][hubHole]
 
         geo0 = fusion.JointGeometry.createByCurve(hubEdge, fusion.JointKeyPointTypes.CenterKeyPoint)
         geo1 = fusion.JointGeometry.createByCurve(spoke[0], fusion.JointKeyPointTypes.CenterKeyPoint)
@@ -220,12 +448,36 @@ def createWheel(self: WheelLogic):
 
         
         jointInput0 = joints.createInput(geo0, geo1)
-        jointInput0.isFlipped = flipped
+        jointInput0.isFlipped = bool(flipped)
         jointInput0.setAsBallJointMotion(fusion.JointDirections.ZAxisJointDirection, fusion.JointDirections.XAxisJointDirection)
 
         jointInput1 = joints.createInput(geo2, geo3)
         jointInput1.isFlipped = False
         jointInput1.setAsBallJointMotion(fusion.JointDirections.ZAxisJointDirection, fusion.JointDirections.XAxisJointDirection)
 
-        joints.add(jointInput0)
-        # joints.add(jointInput1)
\ No newline at end of file
+        if self.deferCompute:
+            jointInputs.append((index, jointInput0))
+        else:
+            with profiling.span('wheel joint'):
+                tagJoint(joints.add(jointInput0), wheelId, index)
+        # joints.add(jointInput1)
+    buildTime = time.perf_counter() - start
+
+    # Adding a joint moves a spoke, and reading geometry after that can make Fusion recompute before it answers.
+    # With deferCompute every joint input is created from the unmoved spokes first and the joints are added here.
+    # Compute is not suspended, each joints.add still solves its own joint.
+    start = time.perf_counter()
+    with profiling.span('wheel joints add', joints=len(jointInputs)):
+        for index, jointInput in jointInputs:
+            tagJoint(joints.add(jointInput), wheelId, index)
+    jointTime = time.perf_counter() - start
+
+    design.attributes.add(config.attribute_group, f'wheel:{wheelId}', json.dumps(spec))
+    self.wheelId = wheelId
+
+    action = 'Updated' if wheel else 'Built'
+    if self.deferCompute:
+        futil.log(f'{action} wheel in {buildTime:.1f} s, {len(spokes)} spokes placed, joints added afterwards in {jointTime:.1f} s', force_console=True)
+    else:
+        futil.log(f'{action} wheel in {buildTime:.1f} s, {len(spokes)} spokes placed and joined as they were placed', force_console=True)
+
@@ -0,0 +1,103 @@
+# Spoke lengths from hub and rim dimensions, all lengths in cm like the rest of the add-in.
+# This module does not depend on adsk. NumPy is optional, it is only used to compute whole catalogs at once.
+import csv
+from itertools import product
+from math import cos, pi, sqrt
+
+from .lacing import CROSS_NAMES, validateLacing
+
+# Diameter of the spoke holes drilled in the hub flanges, see hub.logic.createHub
+SPOKE_HOLE_DIA = 0.25
+
+
+def spokeLength(erd: float, flangeDia: float, centerToFlange: float, spokes: int, crosses: int, holeDia: float = SPOKE_HOLE_DIA):
+    """Returns the length of a spoke from the hub flange hole to the nipple seat at the rim's ERD.
+
+    The spoke is the straight line between the flange hole and the rim hole, which sits
+    720 * crosses / spokes degrees around the axle from it. Half the hole diameter is taken off
+    because the spoke bends around the far side of the hole.
+    """
+    angle = 4 * pi * crosses / spokes
+    return sqrt(
+        (flangeDia / 2) ** 2 + (erd / 2) ** 2 + centerToFlange ** 2
+        - 2 * (flangeDia / 2) * (erd / 2) * cos(angle)
+    ) - holeDia / 2
+
+
+def wheelLengths(hub: dict, erd: float, spokes: int, crosses: int):
+    """Returns the (left, right) spoke lengths for a catalog hub laced to a rim with the given ERD."""
+    return (
+        spokeLength(erd, hub['leftFlangeDia'], hub['centerToLeftFlange'], spokes, crosses),
+        spokeLength(erd, hub['rightFlangeDia'], hub['centerToRightFlange'], spokes, crosses),
+    )
+
+
+def lengthMatrix(hubs: dict, rims: dict, crosses=tuple(CROSS_NAMES), vectorized: bool = True):
+    """Computes left and right spoke lengths for every hub, rim, size, spoke count and cross count.
+
+    Arguments:
+    hubs -- Dict of hub name to catalog hub spec, only the flange dimensions are used.
+    rims -- Dict of rim name to catalog rim spec, 'sizes' (ERD per size) and 'spokes' (drillings).
+    crosses -- Cross counts to compute, radial to 4x by default.
+    vectorized -- Computes the lengths with NumPy when it is installed, otherwise one wheel at a time.
+
+    :returns:
+        A list of (hub, rim, size, spokes, crosses, left, right) rows. Combinations that can not be
+        laced are left out.
+    """
+    hubNames = list(hubs)
+    wheels = [
+        (rim, size, erd, spokes)
+        for rim, rimData in rims.items()
+        for size, erd in rimData['sizes'].items()
+        for spokes in rimData['spokes']
+    ]
+    laceable = [
+        [validateLacing(spokes, cross) is None for cross in crosses]
+        for rim, size, erd, spokes in wheels
+    ]
+
+    numpy = None
+    if vectorized:
+        try:
+            import numpy
+        except ImportError:
+            pass
+
+    if numpy is None:
+        lengths = {}
+        for (h, hub), (w, wheel), (x, cross) in product(enumerate(hubNames), enumerate(wheels), enumerate(crosses)):
+            if laceable[w][x]:
+                lengths[h, w, x] = wheelLengths(hubs[hub], wheel[2], wheel[3], cross)
+    else:
+        # Hubs, wheels and crosses are the three axes, so every length comes out of one broadcast expression
+        flangeDia = numpy.array([[hubs[hub]['leftFlangeDia'], hubs[hub]['rightFlangeDia']] for hub in hubNames])
+        centerToFlange = numpy.array([[hubs[hub]['centerToLeftFlange'], hubs[hub]['centerToRightFlange']] for hub in hubNames])
+        erd = numpy.array([wheel[2] for wheel in wheels], dtype=float)
+        spokes = numpy.array([wheel[3] for wheel in wheels], dtype=float)
+        angle = 4 * pi * numpy.array(crosses, dtype=float)[None, :] / spokes[:, None]
+
+        flangeRad = flangeDia[:, None, None, :] / 2
+        rimRad = erd[None, :, None, None] / 2
+        matrix = numpy.sqrt(
+            flangeRad ** 2 + rimRad ** 2 + centerToFlange[:, None, None, :] ** 2
+            - 2 * flangeRad * rimRad * numpy.cos(angle)[None, :, :, None]
+        ) - SPOKE_HOLE_DIA / 2
+        lengths = {
+            (h, w, x): (float(matrix[h, w, x, 0]), float(matrix[h, w, x, 1]))
+            for h, w, x in zip(*numpy.nonzero(numpy.broadcast_to(numpy.array(laceable)[None], matrix.shape[:3])))
+        }
+
+    return [
+        (hubNames[h], wheels[w][0], wheels[w][1], wheels[w][3], crosses[x], left, right)
+        for (h, w, x), (left, right) in sorted(lengths.items())
+    ]
+
+
+def exportTable(path: str, hubs: dict, rims: dict):
+    """Writes lengthMatrix to a CSV file with the lengths in mm, the unit spokes are sold in."""
+    with open(path, 'w', newline='') as file:
+        writer = csv.writer(file)
+        writer.writerow(['hub', 'rim', 'size', 'spokes', 'lacing', 'left_mm', 'right_mm'])
+        for hub, rim, size, spokes, cross, left, right in lengthMatrix(hubs, rims):
+            writer.writerow([hub, rim, size, spokes, CROSS_NAMES[cross], f'{left * 10:.1f}', f'{right * 10:.1f}'])
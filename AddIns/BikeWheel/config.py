@@ -24,3 +24,10 @@ my_tab_name = "Bike Wheel"  # Only used if creating a custom Tab
 my_panel_id = f'{ADDIN_NAME}_panel_2'
 my_panel_name = ADDIN_NAME
 my_panel_after = ''
+
+# Attribute group for everything the add-in tags in a design so it can find its own geometry again
+attribute_group = f'{COMPANY_NAME}_{ADDIN_NAME}'
+
+# Chrome trace files of each build are written here while DEBUG is on, open them in chrome://tracing or Perfetto.
+# Only the newest profiling.TRACE_RETENTION of each command are kept.
+trace_dir = os.path.join(os.path.dirname(__file__), 'traces')
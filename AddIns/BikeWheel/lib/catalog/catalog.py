@@ -0,0 +1,110 @@
+import json
+import os
+
+# Bump this whenever the catalog file changes shape, older files are then refused instead of misread.
+CATALOG_VERSION = 1
+
+COMMANDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'commands')
+CATALOG_PATH = os.path.join(COMMANDS_DIR, 'catalog.json')
+
+# Hub fields that can be used to filter hubs
+HUB_INDEXES = ('type', 'brake', 'axle')
+
+_catalog = None
+
+
+class Catalog:
+    """Hub and rim specs from a catalog file, with indexes for the fields the dialogs filter on.
+
+    Hub specs hold 'type', 'brake' and 'axle' by enum member name, the flange dimensions and 'old'.
+    Rim specs hold the DXF 'profile', 'sizes' (ERD per size) and the 'spokes' counts it is drilled for.
+    Every length is in cm.
+    """
+
+    def __init__(self, data: dict) -> None:
+        if data.get('version') != CATALOG_VERSION:
+            raise Exception(f'Catalog version {data.get("version")} is not supported, expected {CATALOG_VERSION}')
+        self._hubs = data['hubs']
+        self._rims = data['rims']
+        self._axleDiameters = data['axleDiameters']
+
+        # (field, value) -> names, kept in catalog order so dropdowns list them the way the file does
+        self._hubIndex = {}
+        for name, hub in self._hubs.items():
+            for field in HUB_INDEXES:
+                self._hubIndex.setdefault((field, hub[field]), {})[name] = None
+        self._rimsBySize = {}
+        self._rimsBySpokes = {}
+        for name, rim in self._rims.items():
+            for size in rim['sizes']:
+                self._rimsBySize.setdefault(size, {})[name] = None
+            for spokes in rim['spokes']:
+                self._rimsBySpokes.setdefault(spokes, {})[name] = None
+
+    def hub(self, name: str) -> dict:
+        return self._hubs[name]
+
+    def rim(self, name: str) -> dict:
+        return self._rims[name]
+
+    def hubSpecs(self) -> dict:
+        """Returns every hub spec by name, e.g. for wheel.spoke_length.lengthMatrix."""
+        return self._hubs
+
+    def rimSpecs(self) -> dict:
+        return self._rims
+
+    def axleDiameter(self, hubType: str, axleType: str) -> float:
+        return self._axleDiameters[hubType][axleType]
+
+    def hubs(self, **filters) -> list:
+        """Returns the names of the hubs matching every given field, e.g. hubs(type='Rear', brake='CenterLock')."""
+        return _select(self._hubs, [self._hubIndex.get(item, {}) for item in filters.items()])
+
+    def rims(self, size: str = None, spokes: int = None) -> list:
+        """Returns the names of the rims available in a size and/or drilled for a spoke count."""
+        matches = []
+        if size is not None:
+            matches.append(self._rimsBySize.get(size, {}))
+        if spokes is not None:
+            matches.append(self._rimsBySpokes.get(spokes, {}))
+        return _select(self._rims, matches)
+
+    def hubValues(self, field: str) -> list:
+        """Returns the values hubs have for one of HUB_INDEXES, in catalog order."""
+        return [value for indexed, value in self._hubIndex if indexed == field]
+
+    def rimSizes(self) -> list:
+        """Returns every size a rim comes in, in catalog order."""
+        return list(self._rimsBySize)
+
+    def drillings(self) -> list:
+        """Returns every spoke count a rim is drilled for, fewest first."""
+        return sorted(self._rimsBySpokes)
+
+    def sizes(self, rim: str) -> list:
+        return list(self._rims[rim]['sizes'])
+
+    def spokeCounts(self, rim: str) -> list:
+        return list(self._rims[rim]['spokes'])
+
+
+def _select(everything: dict, matches: list) -> list:
+    if not matches:
+        return list(everything)
+    # Walk the smallest match and check the others, each check is a dict lookup
+    matches = sorted(matches, key=len)
+    return [name for name in matches[0] if all(name in match for match in matches[1:])]
+
+
+def load(path: str = CATALOG_PATH) -> Catalog:
+    with open(path) as file:
+        return Catalog(json.load(file))
+
+
+def get_catalog() -> Catalog:
+    """Returns the add-in's catalog, reading the catalog file the first time it is asked for."""
+    global _catalog
+    if _catalog is None:
+        _catalog = load()
+    return _catalog
@@ -0,0 +1,2 @@
+from .dxf_reader import *
+from .dxf_index import *
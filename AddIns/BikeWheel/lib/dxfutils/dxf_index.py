@@ -0,0 +1,137 @@
+import glob
+import hashlib
+import json
+import os
+
+from .dxf_reader import read_entities, entity_counts, build_regions, loop_area, bounding_box
+
+# Bump this whenever the stored metadata changes shape so old index files are rebuilt.
+INDEX_VERSION = 1
+
+# The add-in's commands folder, each command keeps its DXF files somewhere under its resources folder.
+COMMANDS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))), 'commands')
+INDEX_PATH = os.path.join(COMMANDS_DIR, 'dxf_index.json')
+
+_index = None
+
+
+def describe(path: str):
+    """Reads a DXF file and returns the metadata stored in the index for it.
+
+    Regions are sorted largest first. 'hollow' is the position of the region with the
+    most loops (the profile that has voids in it) or None when every region is a single loop.
+    """
+    entities = read_entities(path)
+    loops, regions, open_ends = build_regions(entities)
+    areas = [abs(loop_area(loop)) for loop in loops]
+    regions.sort(key=lambda region: -areas[region[0]])
+
+    described = []
+    for region in regions:
+        outer = areas[region[0]]
+        described.append({
+            'loops': len(region),
+            'area': round(outer - sum(areas[index] for index in region[1:]), 6),
+            'loopAreas': [round(areas[index], 6) for index in region],
+            'bbox': [round(value, 6) for value in bounding_box(loops[region[0]])],
+        })
+
+    hollow = None
+    for position, region in enumerate(described):
+        if region['loops'] > 1 and (hollow is None or region['loops'] > described[hollow]['loops']):
+            hollow = position
+
+    points = [point for loop in loops for point in loop]
+    return {
+        'entities': entity_counts(entities),
+        'openEnds': open_ends,
+        'bbox': [round(value, 6) for value in bounding_box(points)] if points else None,
+        'regions': described,
+        'hollow': hollow,
+    }
+
+
+def _file_hash(path: str):
+    with open(path, 'rb') as file:
+        return hashlib.sha1(file.read()).hexdigest()
+
+
+def build_index(commands_dir: str = COMMANDS_DIR, index_path: str = INDEX_PATH):
+    """Indexes every DXF file under commands/*/resources.
+
+    The index is keyed by file content hash, so only new or changed files are parsed
+    and files that were renamed or copied reuse their existing entry. The index file
+    is only rewritten when something changed.
+
+    :returns:
+        The index dict with 'version', 'files' (relative path -> hash) and 'entries'
+        (hash -> metadata from describe).
+    """
+    try:
+        with open(index_path) as file:
+            index = json.load(file)
+        if index.get('version') != INDEX_VERSION:
+            raise ValueError
+    except (OSError, ValueError):
+        index = {'version': INDEX_VERSION, 'files': {}, 'entries': {}}
+
+    files = {}
+    entries = {}
+    pattern = os.path.join(commands_dir, '*', 'resources', '**', '*.dxf')
+    for path in sorted(glob.glob(pattern, recursive=True)):
+        key = os.path.relpath(path, commands_dir).replace(os.sep, '/')
+        digest = _file_hash(path)
+        files[key] = digest
+        entries[digest] = index['entries'].get(digest) or describe(path)
+
+    if files != index['files'] or entries != index['entries']:
+        index = {'version': INDEX_VERSION, 'files': files, 'entries': entries}
+        with open(index_path, 'w') as file:
+            json.dump(index, file, separators=(',', ':'), sort_keys=True)
+    return index
+
+
+def lookup(path: str):
+    """Returns the index entry for a DXF file, building or refreshing the index on first use.
+
+    Arguments:
+    path -- Path of the DXF file, either absolute or relative to the commands folder.
+    """
+    global _index
+    full_path = os.path.abspath(os.path.join(COMMANDS_DIR, path))
+    if not os.path.isfile(full_path):
+        return None
+    # Hashing the file is far cheaper than importing it, and it catches DXFs edited since the index was built
+    digest = _file_hash(full_path)
+    if _index is None or digest not in _index['entries']:
+        _index = build_index()
+    return _index['entries'].get(digest)
+
+
+def hollow_loops(path: str):
+    """Returns how many loops the hollow region of a DXF file has, or None if it has no hollow region."""
+    entry = lookup(path)
+    if entry is None or entry['hollow'] is None:
+        return None
+    return entry['regions'][entry['hollow']]['loops']
+
+
+def validate(index: dict):
+    """Returns a list of problems found in the indexed DXF catalog."""
+    problems = []
+    for key, digest in sorted(index['files'].items()):
+        entry = index['entries'][digest]
+        if not entry['regions']:
+            problems.append(f'{key}: no closed regions')
+        elif key.startswith('rim/') and entry['hollow'] is None and len(entry['regions']) > 1:
+            problems.append(f'{key}: several regions but none of them is hollow')
+    return problems
+
+
+if __name__ == '__main__':
+    index = build_index()
+    for key, digest in sorted(index['files'].items()):
+        entry = index['entries'][digest]
+        print(f"{key}: {len(entry['regions'])} regions, loops {[region['loops'] for region in entry['regions']]}, hollow {entry['hollow']}")
+    for problem in validate(index):
+        print(problem)
@@ -0,0 +1,396 @@
+import math
+from collections import Counter
+
+# Distance under which two curve end points are treated as the same point when chaining loops.
+TOLERANCE = 1e-4
+
+# Number of straight segments used to approximate a full circle, arcs and splines use a share of it.
+SEGMENTS = 64
+
+
+def read_entities(path: str):
+    """Reads the ENTITIES section of an ASCII DXF file.
+
+    Arguments:
+    path -- The path of the DXF file.
+
+    :returns:
+        A list of dicts, one per entity, holding the entity type under 'type' and
+        every group code under its integer code. Repeated codes are kept as lists.
+    """
+    with open(path, encoding='utf-8', errors='replace') as file:
+        lines = file.read().splitlines()
+
+    entities = []
+    entity = None
+    section = None
+    expect_section_name = False
+    for index in range(0, len(lines) - 1, 2):
+        code = int(lines[index].strip())
+        value = lines[index + 1].strip()
+        if code == 0:
+            if value == 'SECTION':
+                expect_section_name = True
+                continue
+            if value == 'ENDSEC':
+                section = None
+            entity = None
+            if section == 'ENTITIES':
+                entity = {'type': value}
+                entities.append(entity)
+        elif expect_section_name and code == 2:
+            section = value
+            expect_section_name = False
+        elif entity is not None:
+            entity.setdefault(code, []).append(value)
+            if entity['type'] == 'LWPOLYLINE':
+                entity.setdefault('_order', []).append((code, value))
+    return entities
+
+
+def entity_counts(entities: list):
+    return dict(Counter(entity['type'] for entity in entities))
+
+
+def _floats(entity: dict, code: int):
+    return [float(value) for value in entity.get(code, [])]
+
+
+def _float(entity: dict, code: int, default: float = 0.0):
+    values = entity.get(code)
+    return float(values[0]) if values else default
+
+
+def _int(entity: dict, code: int, default: int = 0):
+    values = entity.get(code)
+    return int(values[0]) if values else default
+
+
+def _arc_points(cx: float, cy: float, radius: float, start: float, sweep: float):
+    steps = max(2, int(math.ceil(abs(sweep) / (2 * math.pi) * SEGMENTS)))
+    return [
+        (cx + radius * math.cos(start + sweep * step / steps), cy + radius * math.sin(start + sweep * step / steps))
+        for step in range(steps + 1)
+    ]
+
+
+def _bulge_points(start: tuple, end: tuple, bulge: float):
+    # A bulge is the tangent of a quarter of the included angle of the arc between two vertices
+    if abs(bulge) < 1e-12:
+        return [start, end]
+    sweep = 4 * math.atan(bulge)
+    radius = math.dist(start, end) / (2 * math.sin(sweep / 2))
+    direction = math.atan2(end[1] - start[1], end[0] - start[0]) + math.pi / 2 - sweep / 2
+    cx, cy = start[0] + radius * math.cos(direction), start[1] + radius * math.sin(direction)
+    start_angle = math.atan2(start[1] - cy, start[0] - cx)
+    return _arc_points(cx, cy, abs(radius), start_angle, sweep)
+
+
+def _spline_points(entity: dict):
+    degree = _int(entity, 71, 3)
+    knots = _floats(entity, 40)
+    xs, ys = _floats(entity, 10), _floats(entity, 20)
+    if not xs:
+        # Splines defined only by fit points pass through them, use them as the polyline.
+        return list(zip(_floats(entity, 11), _floats(entity, 21)))
+    weights = _floats(entity, 41) or [1.0] * len(xs)
+    controls = list(zip(xs, ys))
+    if len(knots) != len(controls) + degree + 1:
+        return controls
+
+    low, high = knots[degree], knots[len(controls)]
+    steps = max(len(controls), 1) * 8
+    points = []
+    for step in range(steps + 1):
+        points.append(_de_boor(low + (high - low) * step / steps, degree, knots, controls, weights))
+    return points
+
+
+def _de_boor(t: float, degree: int, knots: list, controls: list, weights: list):
+    span = degree
+    while span < len(controls) - 1 and t >= knots[span + 1]:
+        span += 1
+    # Homogeneous coordinates so rational splines are evaluated exactly
+    d = [
+        [controls[j][0] * weights[j], controls[j][1] * weights[j], weights[j]]
+        for j in range(span - degree, span + 1)
+    ]
+    for r in range(1, degree + 1):
+        for j in range(degree, r - 1, -1):
+            i = j + span - degree
+            denominator = knots[i + degree + 1 - r] - knots[i]
+            alpha = 0.0 if denominator == 0 else (t - knots[i]) / denominator
+            d[j] = [(1 - alpha) * d[j - 1][k] + alpha * d[j][k] for k in range(3)]
+    x, y, w = d[degree]
+    return (x / w, y / w)
+
+
+def entity_points(entity: dict):
+    """Approximates a DXF entity as a list of 2D points.
+
+    :returns:
+        A tuple of (points, closed). Unsupported entity types return an empty list.
+    """
+    kind = entity['type']
+    if kind == 'LINE':
+        return [(_float(entity, 10), _float(entity, 20)), (_float(entity, 11), _float(entity, 21))], False
+    if kind == 'CIRCLE':
+        points = _arc_points(_float(entity, 10), _float(entity, 20), _float(entity, 40), 0, 2 * math.pi)
+        return points[:-1], True
+    if kind == 'ARC':
+        start = math.radians(_float(entity, 50))
+        sweep = (math.radians(_float(entity, 51)) - start) % (2 * math.pi) or 2 * math.pi
+        return _arc_points(_float(entity, 10), _float(entity, 20), _float(entity, 40), start, sweep), False
+    if kind == 'LWPOLYLINE':
+        vertices = list(zip(_floats(entity, 10), _floats(entity, 20)))
+        closed = bool(_int(entity, 70) & 1)
+        # Bulges are optional per vertex, so read them in the order they follow each vertex
+        bulges = _vertex_bulges(entity, len(vertices))
+        points = [vertices[0]] if vertices else []
+        segments = len(vertices) if closed else len(vertices) - 1
+        for index in range(segments):
+            start, end = vertices[index], vertices[(index + 1) % len(vertices)]
+            points += _bulge_points(start, end, bulges[index])[1:]
+        if closed and points:
+            points = points[:-1]
+        return points, closed
+    if kind == 'SPLINE':
+        return _spline_points(entity), bool(_int(entity, 70) & 1)
+    return [], False
+
+
+def _vertex_bulges(entity: dict, count: int):
+    # Grouping by code loses the interleaving of codes, so LWPOLYLINEs also keep it in '_order'
+    bulges = [0.0] * count
+    vertex = -1
+    for code, value in entity.get('_order', []):
+        if code == 10:
+            vertex += 1
+        elif code == 42 and vertex >= 0:
+            bulges[vertex] = float(value)
+    return bulges
+
+
+def build_regions(entities: list, tolerance: float = TOLERANCE):
+    """Splits DXF entities into the closed regions Fusion turns into sketch profiles.
+
+    Open curves are joined into a graph at their end points and the faces of that
+    graph are traced, so curves shared by two regions are handled the same way the
+    Fusion sketch solver handles them. Each region is a face together with the
+    separate loops nested directly inside it (its holes).
+
+    Arguments:
+    entities -- Entities as returned by read_entities.
+    tolerance -- Maximum gap between end points that still counts as connected.
+
+    :returns:
+        A tuple of (loops, regions, open_ends). loops is a list of point lists,
+        regions is a list of lists of loop indexes with the outer loop first and
+        open_ends is the number of curve end points that are not connected to anything.
+    """
+    vertices = []
+    grid = {}
+
+    def snap(point):
+        cell = (round(point[0] / tolerance), round(point[1] / tolerance))
+        for dx in (-1, 0, 1):
+            for dy in (-1, 0, 1):
+                vertex = grid.get((cell[0] + dx, cell[1] + dy))
+                if vertex is not None and math.dist(vertices[vertex], point) <= tolerance:
+                    return vertex
+        grid[cell] = len(vertices)
+        vertices.append(point)
+        return len(vertices) - 1
+
+    # Closed entities are complete loops on their own, everything else becomes a graph edge
+    loops = []
+    owners = []
+    faces = []
+    outers = []
+    edges = []
+    for entity in entities:
+        points, closed = entity_points(entity)
+        if len(points) < 2:
+            continue
+        if not closed and math.dist(points[0], points[-1]) <= tolerance:
+            closed, points = True, points[:-1]
+        if closed:
+            if abs(loop_area(points)) > tolerance ** 2:
+                loops.append(points)
+                owners.append(('entity', len(loops) - 1))
+                faces.append(len(loops) - 1)
+                outers.append(len(loops) - 1)
+            continue
+        start, end = snap(points[0]), snap(points[-1])
+        if start != end:
+            edges.append((start, end, points))
+
+    # Curves that end on the middle of another curve split that curve, as the sketch solver would
+    degree = _degrees(edges, len(vertices))
+    for vertex in [vertex for vertex in range(len(vertices)) if degree[vertex] == 1]:
+        for index, (start, end, points) in enumerate(edges):
+            if vertex in (start, end):
+                continue
+            split = _split_index(points, vertices[vertex], tolerance)
+            if split is not None:
+                at, point = split
+                edges[index] = (start, vertex, points[:at] + [point])
+                edges.append((vertex, end, [point] + points[at:]))
+                break
+
+    # Overlapping straight segments end up joining the same two vertices, keep only one of them
+    straight = set()
+    for index, (start, end, points) in enumerate(edges):
+        if len(points) == 2:
+            if (min(start, end), max(start, end)) in straight:
+                edges[index] = (start, start, points)
+            straight.add((min(start, end), max(start, end)))
+    edges = [edge for edge in edges if edge[0] != edge[1]]
+
+    # Curves with a free end cannot bound a region, prune them until only cycles are left
+    degree = _degrees(edges, len(vertices))
+    open_ends = degree.count(1)
+    alive = [True] * len(edges)
+    pruned = True
+    while pruned:
+        pruned = False
+        for index, (start, end, _) in enumerate(edges):
+            if alive[index] and (degree[start] == 1 or degree[end] == 1):
+                alive[index] = False
+                degree[start] -= 1
+                degree[end] -= 1
+                pruned = True
+
+    # Half edge i * 2 runs along the curve, i * 2 + 1 runs against it
+    outgoing = {}
+    for index, (start, end, points) in enumerate(edges):
+        if not alive[index]:
+            continue
+        for half, vertex, toward in ((index * 2, start, _heading(points)), (index * 2 + 1, end, _heading(points[::-1]))):
+            origin = vertices[vertex]
+            angle = math.atan2(toward[1] - origin[1], toward[0] - origin[0])
+            outgoing.setdefault(vertex, []).append((angle, half))
+    for vertex in outgoing:
+        outgoing[vertex].sort()
+
+    def head(half):
+        start, end, _ = edges[half // 2]
+        return end if half % 2 == 0 else start
+
+    def half_points(half):
+        points = edges[half // 2][2]
+        return points if half % 2 == 0 else points[::-1]
+
+    # Leaving each vertex on the next edge clockwise from the one we arrived on keeps
+    # the traced face on our left, so bounded faces come out counter clockwise
+    visited = set()
+    cycles = []
+    for vertex in outgoing:
+        for _, first in outgoing[vertex]:
+            if first in visited:
+                continue
+            half = first
+            points = []
+            members = set()
+            while half not in visited:
+                visited.add(half)
+                members.add(half // 2)
+                points += half_points(half)[:-1]
+                around = outgoing[head(half)]
+                position = [entry[1] for entry in around].index(half ^ 1)
+                half = around[position - 1][1]
+            cycles.append((points, members))
+
+    # Label the connected components, the one clockwise cycle of each is its outer boundary
+    component = list(range(len(edges)))
+
+    def find(index):
+        while component[index] != index:
+            component[index] = component[component[index]]
+            index = component[index]
+        return index
+
+    for _, members in cycles:
+        members = list(members)
+        for member in members[1:]:
+            component[find(member)] = find(members[0])
+    for points, members in cycles:
+        area = loop_area(points)
+        if abs(area) <= tolerance ** 2:
+            continue
+        loops.append(points)
+        owners.append(('graph', find(next(iter(members)))))
+        (faces if area > 0 else outers).append(len(loops) - 1)
+
+    areas = [abs(loop_area(loop)) for loop in loops]
+    regions = {face: [face] for face in faces}
+    for outer in outers:
+        # An outer boundary is a hole of the smallest face of another component that contains it
+        containing = [
+            face for face in faces
+            if owners[face] != owners[outer] and areas[face] > areas[outer] and _contains(loops[face], loops[outer][0])
+        ]
+        if containing:
+            regions[min(containing, key=lambda face: areas[face])].append(outer)
+    return loops, list(regions.values()), open_ends
+
+
+def _heading(points: list):
+    # Curves that leave a vertex almost tangent to each other are ordered by where they head,
+    # the first sample alone is too close to the vertex to tell them apart reliably
+    reach = max(math.dist(points[0], point) for point in points) / 4
+    for point in points[1:]:
+        if math.dist(points[0], point) >= reach:
+            return point
+    return points[1]
+
+
+def _degrees(edges: list, count: int):
+    degree = [0] * count
+    for start, end, _ in edges:
+        degree[start] += 1
+        degree[end] += 1
+    return degree
+
+
+def _split_index(points: list, point: tuple, tolerance: float):
+    # Finds the polyline segment the point lies on and returns where to insert it
+    for index in range(1, len(points)):
+        (x1, y1), (x2, y2) = points[index - 1], points[index]
+        length = (x2 - x1) ** 2 + (y2 - y1) ** 2
+        if length == 0:
+            continue
+        t = ((point[0] - x1) * (x2 - x1) + (point[1] - y1) * (y2 - y1)) / length
+        if 0 < t < 1 and math.dist(point, (x1 + t * (x2 - x1), y1 + t * (y2 - y1))) <= tolerance:
+            if math.dist(point, points[index - 1]) > tolerance and math.dist(point, points[index]) > tolerance:
+                return index, point
+    return None
+
+
+def loop_area(points: list):
+    """Returns the signed area of a closed polygon, positive when counter clockwise."""
+    area = 0.0
+    for index in range(len(points)):
+        x1, y1 = points[index - 1]
+        x2, y2 = points[index]
+        area += x1 * y2 - x2 * y1
+    return area / 2
+
+
+def bounding_box(points: list):
+    xs = [point[0] for point in points]
+    ys = [point[1] for point in points]
+    return [min(xs), min(ys), max(xs), max(ys)]
+
+
+def _contains(polygon: list, point: tuple):
+    x, y = point
+    inside = False
+    for index in range(len(polygon)):
+        x1, y1 = polygon[index - 1]
+        x2, y2 = polygon[index]
+        if (y1 > y) != (y2 > y) and x < x1 + (y - y1) * (x2 - x1) / (y2 - y1):
+            inside = not inside
+    return inside
+
+
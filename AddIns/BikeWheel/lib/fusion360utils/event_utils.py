@@ -19,13 +19,88 @@ from .general_utils import handle_error
 # Global Variable to hold Event Handlers
 _handlers = []
 
+# Handler scopes by name, see handler_scope
+_scopes = {}
+
+# Handler type of each event class, read from the annotation of its add method
+_handler_types = {}
+
+# Generated handler classes by (handler type, name), so opening a dialog again does not define new classes
+_handler_classes = {}
+
+
+class HandlerScope:
+    """Keeps the handlers of one command run alive and releases them together.
+
+    Get one with handler_scope, add handlers to it with add and call release_scope (or release) from
+    the command's destroy event so nothing stays referenced once the dialog is closed.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.handlers = []
+
+    def __len__(self):
+        return len(self.handlers)
+
+    def add(self, event: adsk.core.Event, callback: Callable, *, name: str = None):
+        """Adds an event handler to the event and keeps it in this scope, see add_handler."""
+        return add_handler(event, callback, name=name, scope=self)
+
+    def release(self, remove: bool = False):
+        """Drops the scope's handlers.
+
+        Arguments:
+        remove -- Also removes each handler from its event. Not needed for the events of a command
+                  that is being destroyed, but needed for events that outlive it such as custom events.
+        """
+        if remove:
+            for event, handler in reversed(self.handlers):
+                try:
+                    event.remove(handler)
+                except:
+                    handle_error(self.name)
+        self.handlers = []
+        if _scopes.get(self.name) is self:
+            del _scopes[self.name]
+
+
+def handler_scope(name: str):
+    """Returns the handler scope with this name, creating it if it does not exist yet."""
+    scope = _scopes.get(name)
+    if scope is None:
+        scope = _scopes[name] = HandlerScope(name)
+    return scope
+
+
+def release_scope(name: str, remove: bool = False):
+    """Releases the handler scope with this name if there is one, see HandlerScope.release."""
+    scope = _scopes.get(name)
+    if scope is not None:
+        scope.release(remove)
+
+
+def handler_counts():
+    """Returns how many handlers are alive, in the global list and in each scope, and how many handler classes were generated."""
+    return {
+        'global': len(_handlers),
+        'scoped': {name: len(scope) for name, scope in _scopes.items()},
+        'classes': len(_handler_classes),
+    }
+
+
+def live_handlers():
+    """Returns the number of handlers add_handler is keeping alive, local_handlers lists are not included."""
+    return len(_handlers) + sum(len(scope) for scope in _scopes.values())
+
 
 def add_handler(
         event: adsk.core.Event,
         callback: Callable,
         *,
         name: str = None,
-        local_handlers: list = None
+        local_handlers: list = None,
+        scope: HandlerScope = None
 ):
     """Adds an event handler to the specified event.
 
@@ -42,22 +117,30 @@ def add_handler(
                       be cleared using the clear_handlers function. You may want
                       to maintain your own handler list so it can be managed 
                       independently for each command.
+    scope -- A HandlerScope that keeps the handler instead of local_handlers or
+             the global list, see handler_scope. This argument must be specified
+             by its keyword.
 
     :returns:
         The event handler that was created.  You don't often need this reference, but it can be useful in some cases.
     """   
-    module = sys.modules[event.__module__]
-    handler_type = module.__dict__[event.add.__annotations__['handler']]
-    handler = _create_handler(handler_type, callback, event, name, local_handlers)
+    event_type = type(event)
+    handler_type = _handler_types.get(event_type)
+    if handler_type is None:
+        module = sys.modules[event.__module__]
+        handler_type = _handler_types[event_type] = module.__dict__[event.add.__annotations__['handler']]
+    handler = _create_handler(handler_type, callback, event, name, local_handlers, scope)
     event.add(handler)
     return handler
 
 
 def clear_handlers():
-    """Clears the global list of handlers.
+    """Clears the global list of handlers and releases every handler scope.
     """
     global _handlers
     _handlers = []
+    for scope in list(_scopes.values()):
+        scope.release()
 
 
 def _create_handler(
@@ -65,24 +148,34 @@ def _create_handler(
         callback: Callable,
         event: adsk.core.Event,
         name: str = None,
-        local_handlers: list = None
+        local_handlers: list = None,
+        scope: HandlerScope = None
 ):
-    handler = _define_handler(handler_type, callback, name)()
-    (local_handlers if local_handlers is not None else _handlers).append(handler)
+    handler = _define_handler(handler_type, name)(callback)
+    if scope is not None:
+        scope.handlers.append((event, handler))
+    else:
+        (local_handlers if local_handlers is not None else _handlers).append(handler)
     return handler
 
 
-def _define_handler(handler_type, callback, name: str = None):
+def _define_handler(handler_type, name: str = None):
     name = name or handler_type.__name__
+    key = (handler_type, name)
+    if key in _handler_classes:
+        return _handler_classes[key]
 
+    # The callback is kept by each handler rather than the class, so one class serves every callback
     class Handler(handler_type):
-        def __init__(self):
+        def __init__(self, callback: Callable):
             super().__init__()
+            self.callback = callback
 
         def notify(self, args):
             try:
-                callback(args)
+                self.callback(args)
             except:
                 handle_error(name)
 
+    _handler_classes[key] = Handler
     return Handler
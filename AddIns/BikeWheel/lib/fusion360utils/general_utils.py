@@ -10,7 +10,11 @@
 #  UNINTERRUPTED OR ERROR FREE.
 
 import os
+import sys
+import threading
+import time
 import traceback
+from collections import deque
 import adsk.core
 
 app = adsk.core.Application.get()
@@ -20,30 +24,182 @@ ui = app.userInterface
 try:
     from ... import config
     DEBUG = config.DEBUG
+    LOG_FLUSH_EVENT_ID = f'{config.COMPANY_NAME}_{config.ADDIN_NAME}_logFlush'
 except:
     DEBUG = False
+    LOG_FLUSH_EVENT_ID = f'{__name__}_logFlush'
 
+# Messages below this level are only kept in the ring buffer, they are never formatted or written out.
+# Forced messages and errors always get through.
+LOG_LEVEL = adsk.core.LogLevels.InfoLogLevel if DEBUG else adsk.core.LogLevels.WarningLogLevel
 
-def log(message: str, level: adsk.core.LogLevels = adsk.core.LogLevels.InfoLogLevel, force_console: bool = False):
+# Number of recent messages kept in memory, see recent_log and dump_log
+LOG_BUFFER_SIZE = 2000
+
+# At most this many info messages with the same key, by default the line logging them, are written per period,
+# the rest are counted and the count is added to the next message with that key that gets through.
+# Warnings, errors and forced messages are never limited.
+RATE_LIMIT_COUNT = 5
+RATE_LIMIT_PERIOD = 1.0
+# Number of keys the rate limit keeps track of, the table is emptied once it holds this many
+RATE_LIMIT_KEYS = 500
+
+# Console messages are written in one app.log call per batch, once this many are waiting or once the
+# flush event fires this many seconds after the first one was queued.
+LOG_BATCH_SIZE = 50
+LOG_FLUSH_DELAY = 0.5
+
+_LEVEL_ORDER = {
+    adsk.core.LogLevels.InfoLogLevel: 0,
+    adsk.core.LogLevels.WarningLogLevel: 1,
+    adsk.core.LogLevels.ErrorLogLevel: 2,
+}
+_LEVEL_NAMES = {
+    adsk.core.LogLevels.InfoLogLevel: 'info',
+    adsk.core.LogLevels.WarningLogLevel: 'warning',
+    adsk.core.LogLevels.ErrorLogLevel: 'error',
+}
+
+# (time, level, message) of the latest messages, message may still be an unformatted callable
+_buffer = deque(maxlen=LOG_BUFFER_SIZE)
+# (text, level) waiting for the next flush to the Text Command window
+_pending = []
+# Key -> [period start, messages written in the period, messages dropped since the last one written]
+_rates = {}
+_lock = threading.Lock()
+_flush_event = None
+_flush_timer = None
+
+
+def log(message, level: adsk.core.LogLevels = adsk.core.LogLevels.InfoLogLevel, force_console: bool = False, key: str = None):
     """Utility function to easily handle logging in your app.
 
     Arguments:
-    message -- The message to log.
+    message -- The message to log, or a callable returning it that is only called if the message is written.
     level -- The logging severity level.
     force_console -- Forces the message to be written to the Text Command window. 
+    key -- Messages sharing a key share a rate limit, defaults to the file and line log is called from.
     """    
+    is_error = level == adsk.core.LogLevels.ErrorLogLevel
+    # Every message is kept in the ring buffer, the rate limit only holds back writing it out
+    _buffer.append((time.time(), level, message))
+    suppressed = 0
+    if _LEVEL_ORDER.get(level, 0) == 0 and not force_console:
+        if key is None:
+            # The text of a message changes from call to call, the line logging it does not
+            caller = sys._getframe(1)
+            key = (caller.f_code.co_filename, caller.f_lineno)
+        now = time.monotonic()
+        with _lock:
+            rate = _rates.get(key)
+            if rate is None or now - rate[0] >= RATE_LIMIT_PERIOD:
+                if len(_rates) >= RATE_LIMIT_KEYS:
+                    _rates.clear()
+                rate = _rates[key] = [now, 0, rate[2] if rate else 0]
+            if rate[1] >= RATE_LIMIT_COUNT:
+                rate[2] += 1
+                return
+            rate[1] += 1
+            suppressed, rate[2] = rate[2], 0
+
+    if not (is_error or force_console or _LEVEL_ORDER.get(level, 0) >= _LEVEL_ORDER[LOG_LEVEL]):
+        return
+
+    text = message() if callable(message) else message
+    if suppressed:
+        text = f'{text} ({suppressed} more like this were dropped)'
+
     # Always print to console, only seen through IDE.
-    print(message)  
+    print(text)
 
-    # Log all errors to Fusion log file.
-    if level == adsk.core.LogLevels.ErrorLogLevel:
-        log_type = adsk.core.LogTypes.FileLogType
-        app.log(message, level, log_type)
+    # Log all errors to Fusion log file, anything queued before is written first to keep the order.
+    if is_error:
+        flush_log()
+        app.log(text, level, adsk.core.LogTypes.FileLogType)
 
     # If config.DEBUG is True write all log messages to the console.
     if DEBUG or force_console:
-        log_type = adsk.core.LogTypes.ConsoleLogType
-        app.log(message, level, log_type)
+        with _lock:
+            _pending.append((text, level))
+            waiting = len(_pending)
+        if is_error or waiting >= LOG_BATCH_SIZE or _flush_event is None:
+            flush_log()
+        else:
+            _schedule_flush()
+
+
+def _schedule_flush():
+    global _flush_timer
+    with _lock:
+        if _flush_timer is not None:
+            return
+        _flush_timer = threading.Timer(LOG_FLUSH_DELAY, app.fireCustomEvent, (LOG_FLUSH_EVENT_ID,))
+        _flush_timer.daemon = True
+        _flush_timer.start()
+
+
+def flush_log():
+    """Writes the queued console messages to the Text Command window.
+
+    The Fusion API may only be used from the main thread, from any other thread this leaves the
+    messages for the flush event.
+    """
+    global _flush_timer
+    if threading.current_thread() is not threading.main_thread():
+        return
+    with _lock:
+        batch = _pending[:]
+        _pending.clear()
+        if _flush_timer is not None:
+            _flush_timer.cancel()
+            _flush_timer = None
+    # One call per run of messages with the same level
+    start = 0
+    for index in range(1, len(batch) + 1):
+        if index == len(batch) or batch[index][1] != batch[start][1]:
+            app.log('\n'.join(text for text, level in batch[start:index]), batch[start][1], adsk.core.LogTypes.ConsoleLogType)
+            start = index
+
+
+def start_logging():
+    """Registers the custom event that flushes queued console messages once the add-in is idle.
+
+    Until this is called, and after stop_logging, every console message is written right away.
+    """
+    global _flush_event
+    from .event_utils import add_handler, handler_scope
+    app.unregisterCustomEvent(LOG_FLUSH_EVENT_ID)
+    _flush_event = app.registerCustomEvent(LOG_FLUSH_EVENT_ID)
+    add_handler(_flush_event, lambda args: flush_log(), name='log_flush', scope=handler_scope(LOG_FLUSH_EVENT_ID))
+
+
+def stop_logging():
+    global _flush_event
+    from .event_utils import release_scope
+    flush_log()
+    if _flush_event is not None:
+        release_scope(LOG_FLUSH_EVENT_ID, remove=True)
+        app.unregisterCustomEvent(LOG_FLUSH_EVENT_ID)
+        _flush_event = None
+
+
+def recent_log(count: int = None):
+    """Returns the latest buffered messages as text lines, oldest first, including filtered ones."""
+    entries = list(_buffer)[-count:] if count else list(_buffer)
+    lines = []
+    for stamp, level, message in entries:
+        text = message() if callable(message) else message
+        lines.append(f'{time.strftime("%H:%M:%S", time.localtime(stamp))}.{int(stamp % 1 * 1000):03d} {_LEVEL_NAMES.get(level, level)}: {text}')
+    return lines
+
+
+def dump_log(path: str):
+    """Writes the buffered messages to a file, for attaching to a bug report."""
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as file:
+        file.write('\n'.join(recent_log()))
+        file.write('\n')
+    return path
 
 
 def handle_error(name: str, show_message_box: bool = False):
@@ -0,0 +1,112 @@
+#  Previews drawn as custom graphics while a command dialog is open, computed off the main thread.
+#  Subclasses only say how a computed result is drawn, see LivePreview.draw_graphics.
+
+import threading
+import traceback
+from typing import Callable
+
+import adsk.core
+import adsk.fusion
+from .general_utils import log
+from .event_utils import add_handler, handler_scope, release_scope
+
+app = adsk.core.Application.get()
+
+# Seconds to wait after the last change before computing a preview, so dragging a value only computes the last one
+PREVIEW_DELAY = 0.15
+
+
+class LivePreview:
+    """Draws the result of a computation as custom graphics while a command dialog is open.
+
+    Requests are debounced on a timer thread, which also runs compute since that has to be plain Python.
+    The result is handed back to the main thread through a custom event because the Fusion API can only
+    be used from there. Every request supersedes the ones before it, so a pending timer is cancelled and
+    a result that finishes after a newer request was made is never drawn.
+
+    Arguments:
+    event_id -- Id of the custom event, unique to the command.
+    compute -- Called on the timer thread with the request arguments, returns what draw_graphics draws.
+    delay -- Seconds to wait for another request before computing.
+    """
+
+    def __init__(self, event_id: str, compute: Callable, delay: float = PREVIEW_DELAY) -> None:
+        self.event_id = event_id
+        self.compute = compute
+        self.delay = delay
+        self.generation = 0
+        self.timer = None
+        self.ready = None
+        self.group = None
+        self.lock = threading.Lock()
+
+        app.unregisterCustomEvent(event_id)
+        self.event = app.registerCustomEvent(event_id)
+        add_handler(self.event, self._handle_ready, scope=handler_scope(event_id))
+
+    def request(self, *args):
+        with self.lock:
+            self.generation += 1
+            if self.timer:
+                self.timer.cancel()
+            self.timer = threading.Timer(self.delay, self._compute, (self.generation, args))
+            self.timer.daemon = True
+            self.timer.start()
+
+    # Runs on the timer thread, so nothing in here may touch the Fusion API other than firing the event
+    def _compute(self, generation: int, args: tuple):
+        if generation != self.generation:
+            return
+        try:
+            result = self.compute(*args)
+        except Exception:
+            # handle_error would write to the log file from this thread, a warning waits for the main thread
+            log(f'{self.event_id} failed\n{traceback.format_exc()}', adsk.core.LogLevels.WarningLogLevel)
+            return
+        with self.lock:
+            if generation != self.generation:
+                return
+            self.ready = (generation, result)
+        app.fireCustomEvent(self.event_id, str(generation))
+
+    def _handle_ready(self, args: adsk.core.CustomEventArgs):
+        with self.lock:
+            if not self.ready or self.ready[0] != self.generation:
+                return
+            generation, result = self.ready
+            self.ready = None
+        self.draw(result)
+
+    def draw(self, result):
+        self.clear()
+        design = adsk.fusion.Design.cast(app.activeProduct)
+        if not design:
+            return
+        self.group = design.rootComponent.customGraphicsGroups.add()
+        self.draw_graphics(self.group, result)
+        app.activeViewport.refresh()
+
+    def draw_graphics(self, group: adsk.fusion.CustomGraphicsGroup, result):
+        """Adds the graphics for a computed result to group, called on the main thread."""
+        raise NotImplementedError
+
+    def clear(self):
+        if self.group and self.group.isValid:
+            self.group.deleteMe()
+            app.activeViewport.refresh()
+        self.group = None
+
+    def cancel(self):
+        with self.lock:
+            self.generation += 1
+            self.ready = None
+            if self.timer:
+                self.timer.cancel()
+                self.timer = None
+        self.clear()
+
+    def close(self):
+        self.cancel()
+        # The custom event outlives the command, so its handler is taken off it as well as released
+        release_scope(self.event_id, remove=True)
+        app.unregisterCustomEvent(self.event_id)
@@ -0,0 +1,2 @@
+from .edge_index import *
+from .profiles import *
@@ -0,0 +1,84 @@
+from math import atan2, pi
+
+import adsk.core as core
+import adsk.fusion as fusion
+
+
+def circle_key(edge: fusion.BRepEdge, tolerance: float = 1e-5):
+    """Returns a hashable key for a circular edge built from its center and radius, or None for other edges.
+
+    Entity tokens are not guaranteed to be the same string each time the same edge is asked for,
+    so edges that are found through different faces or features are matched by geometry instead.
+    """
+    circle = core.Circle3D.cast(edge.geometry)
+    if not circle:
+        return None
+    center = circle.center
+    return (
+        round(center.x / tolerance),
+        round(center.y / tolerance),
+        round(center.z / tolerance),
+        round(circle.radius / tolerance),
+    )
+
+
+class CircleEdgeIndex:
+    """Hash index of the circular edges of some faces, so membership tests are a dict lookup
+    instead of a scan of a live API collection with a proxy comparison per element.
+    """
+
+    def __init__(self, edges, tolerance: float = 1e-5) -> None:
+        self.tolerance = tolerance
+        self._edges = {}
+        for edge in edges:
+            key = circle_key(edge, tolerance)
+            if key is not None:
+                self._edges[key] = edge
+
+    def __len__(self):
+        return len(self._edges)
+
+    def __contains__(self, edge: fusion.BRepEdge):
+        return circle_key(edge, self.tolerance) in self._edges
+
+    def matches(self, faces):
+        """Returns the edges of faces that are in the index, each one once."""
+        found = {}
+        for face in faces:
+            for edge in face.edges:
+                key = circle_key(edge, self.tolerance)
+                if key in self._edges and key not in found:
+                    found[key] = edge
+        return list(found.values())
+
+
+def angular_order(edges, axis: core.Vector3D, reference: core.Point3D, origin: core.Point3D = None):
+    """Sorts circular edges by the angle of their centers around an axis.
+
+    Arguments:
+    edges -- Circular edges to sort.
+    axis -- Direction of the axis the edges are arranged around.
+    reference -- A point whose direction from the axis is angle zero, usually the center of the first edge.
+    origin -- A point on the axis, the model origin when not given.
+    """
+    origin = origin or core.Point3D.create(0, 0, 0)
+    axis = axis.copy()
+    axis.normalize()
+    start = _perpendicular(origin.vectorTo(reference), axis)
+    start.normalize()
+    side = axis.crossProduct(start)
+
+    def angle(edge):
+        direction = _perpendicular(origin.vectorTo(core.Circle3D.cast(edge.geometry).center), axis)
+        angle = atan2(direction.dotProduct(side), direction.dotProduct(start))
+        # The reference edge itself can come out a rounding error below zero, it has to stay first
+        return angle + 2 * pi if angle < -1e-9 else max(angle, 0.0)
+
+    return sorted(edges, key=angle)
+
+
+def _perpendicular(vector: core.Vector3D, axis: core.Vector3D):
+    along = axis.copy()
+    along.scaleBy(vector.dotProduct(axis))
+    vector.subtract(along)
+    return vector
@@ -0,0 +1,27 @@
+import os
+
+import adsk.fusion as fusion
+
+from .. import dxfutils
+
+
+def hollow_profile(sketch: fusion.Sketch, path: str, min_loops: int = 2) -> fusion.Profile:
+    """Returns the profile of an imported DXF sketch that has the voids in it.
+
+    The loop count from the DXF index is only a hint, Fusion does not always build its profiles the way
+    the index counts them. Without a match the first profile with at least min_loops loops is taken.
+
+    Arguments:
+    sketch -- The sketch the DXF file was imported into.
+    path -- Path of the DXF file.
+    min_loops -- Loops the profile has at least, counting the outer one.
+    """
+    hollowLoops = dxfutils.hollow_loops(path)
+    if hollowLoops is not None:
+        for profile in sketch.profiles:
+            if profile.profileLoops.count == hollowLoops:
+                return profile
+    for profile in sketch.profiles:
+        if profile.profileLoops.count >= min_loops:
+            return profile
+    raise RuntimeError(f'No profile with {min_loops} or more loops in {os.path.basename(path)}')
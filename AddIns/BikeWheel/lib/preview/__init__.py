@@ -0,0 +1,2 @@
+from .meshes import *
+from .mesh_preview import *
@@ -0,0 +1,19 @@
+import adsk.core as core
+import adsk.fusion as fusion
+from .. import fusion360utils as futil
+
+
+class MeshPreview(futil.LivePreview):
+    """Live preview of simplified parts, compute returns a list of meshes.Mesh objects.
+
+    Arguments:
+    event_id -- Id of the custom event, unique to the command.
+    compute -- Called on the timer thread with the request arguments, returns a list of meshes.
+    """
+
+    def draw_graphics(self, group: fusion.CustomGraphicsGroup, meshes: list):
+        color = core.CustomGraphicsSolidColorEffect.create(core.Color.create(255, 128, 0, 255))
+        for mesh in meshes:
+            coordinates = core.CustomGraphicsCoordinates.create(list(mesh.coordinates))
+            graphics = group.addMesh(coordinates, list(mesh.indices), list(mesh.normals), list(mesh.indices))
+            graphics.color = color
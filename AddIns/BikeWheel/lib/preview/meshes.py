@@ -0,0 +1,106 @@
+import math
+from array import array
+
+# Number of steps around the axis of a revolved outline or a tube, the preview only has to read as the part
+SEGMENTS = 24
+
+
+class Mesh:
+    """Triangle mesh in the flat layout custom graphics take.
+
+    coordinates holds x, y, z per vertex, indices three vertex indexes per triangle and
+    normals one unit vector per vertex, in the same layout as coordinates.
+    """
+
+    def __init__(self, coordinates: array, indices: array) -> None:
+        self.coordinates = coordinates
+        self.indices = indices
+        self.normals = vertex_normals(coordinates, indices)
+
+    def __len__(self):
+        return len(self.indices) // 3
+
+
+def _grid(coordinates: array, rings: int, segments: int, closed: bool):
+    # Quads between ring i and i + 1, each ring holding segments vertices around the axis
+    indices = array('i')
+    for ring in range(rings if closed else rings - 1):
+        start = ring * segments
+        following = ((ring + 1) % rings) * segments
+        for step in range(segments):
+            a = start + step
+            b = start + (step + 1) % segments
+            c = following + (step + 1) % segments
+            d = following + step
+            indices.extend((a, b, c, a, c, d))
+    return Mesh(coordinates, indices)
+
+
+def revolve(outline: list, axisY: float = 0.0, segments: int = SEGMENTS):
+    """Revolves a closed outline around a line parallel to the X axis.
+
+    Arguments:
+    outline -- (x, radius) points of the outline, in order, the last one connects back to the first.
+    axisY -- Y coordinate of the axis, it runs through z = 0.
+    segments -- Steps around the axis.
+    """
+    # The triangles face outwards when the outline runs counter clockwise in (x, radius)
+    area = sum(x0 * r1 - x1 * r0 for (x0, r0), (x1, r1) in zip(outline, outline[1:] + outline[:1]))
+    if area < 0:
+        outline = outline[::-1]
+    coordinates = array('d')
+    for x, radius in outline:
+        for step in range(segments):
+            angle = 2 * math.pi * step / segments
+            coordinates.extend((x, axisY - radius * math.cos(angle), radius * math.sin(angle)))
+    return _grid(coordinates, len(outline), segments, True)
+
+
+def tube(path: list, radii: list, segments: int = SEGMENTS):
+    """Sweeps a circle along a polyline in the XY plane.
+
+    Arguments:
+    path -- (x, y) points of the polyline.
+    radii -- Radius of the tube at each point of the path.
+    segments -- Steps around the polyline.
+    """
+    coordinates = array('d')
+    for index, (x, y) in enumerate(path):
+        # The circle at a corner is turned halfway between the segments that meet there
+        before = path[max(index - 1, 0)]
+        after = path[min(index + 1, len(path) - 1)]
+        dx, dy = after[0] - before[0], after[1] - before[1]
+        length = math.hypot(dx, dy) or 1.0
+        nx, ny = -dy / length, dx / length
+        for step in range(segments):
+            angle = 2 * math.pi * step / segments
+            offset = radii[index] * math.cos(angle)
+            coordinates.extend((x + nx * offset, y + ny * offset, radii[index] * math.sin(angle)))
+    return _grid(coordinates, len(path), segments, False)
+
+
+def vertex_normals(coordinates: array, indices: array):
+    """Averages the normals of the triangles around each vertex."""
+    sums = [0.0] * len(coordinates)
+    for triangle in range(0, len(indices), 3):
+        a, b, c = (indices[triangle + corner] * 3 for corner in range(3))
+        ux, uy, uz = coordinates[b] - coordinates[a], coordinates[b + 1] - coordinates[a + 1], coordinates[b + 2] - coordinates[a + 2]
+        vx, vy, vz = coordinates[c] - coordinates[a], coordinates[c + 1] - coordinates[a + 1], coordinates[c + 2] - coordinates[a + 2]
+        normal = (uy * vz - uz * vy, uz * vx - ux * vz, ux * vy - uy * vx)
+        for vertex in (a, b, c):
+            for axis in range(3):
+                sums[vertex + axis] += normal[axis]
+    normals = array('d', sums)
+    for vertex in range(0, len(normals), 3):
+        length = math.sqrt(normals[vertex] ** 2 + normals[vertex + 1] ** 2 + normals[vertex + 2] ** 2)
+        if length:
+            for axis in range(3):
+                normals[vertex + axis] /= length
+    return normals
+
+
+def decimate(points: list, count: int):
+    """Keeps at most count points of a closed outline, evenly spread along it."""
+    if len(points) <= count:
+        return list(points)
+    return [points[index * len(points) // count] for index in range(count)]
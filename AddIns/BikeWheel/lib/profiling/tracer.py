@@ -0,0 +1,233 @@
+import functools
+import json
+import os
+import sys
+import threading
+import time
+
+# Off unless enable() is called, every entry point below then returns right away.
+_enabled = False
+
+# Open spans of the current recording, innermost last
+_stack = []
+# Finished spans as Chrome trace events, in the order they ended
+_events = []
+_origin = 0.0
+_previous_profile = None
+
+# Trace files of each recording name kept in its folder, the oldest are deleted once a new one is written
+TRACE_RETENTION = 20
+
+
+class _NullSpan:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ('name', 'args', 'start', 'api_calls', 'child_api_calls')
+
+    def __init__(self, name: str, args: dict):
+        self.name = name
+        self.args = args
+        self.api_calls = 0
+        self.child_api_calls = 0
+
+    def __enter__(self):
+        if not _stack:
+            _install_hook()
+        _stack.append(self)
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        end = time.perf_counter()
+        _stack.pop()
+        total_calls = self.api_calls + self.child_api_calls
+        if _stack:
+            _stack[-1].child_api_calls += total_calls
+        else:
+            _remove_hook()
+        _events.append({
+            'name': self.name,
+            'ph': 'X',
+            'ts': round((self.start - _origin) * 1e6, 1),
+            'dur': round((end - self.start) * 1e6, 1),
+            'pid': os.getpid(),
+            'tid': threading.get_ident(),
+            'args': dict(self.args, apiCalls=total_calls, selfApiCalls=self.api_calls),
+        })
+        return False
+
+
+def _is_api(frame):
+    return frame is not None and frame.f_globals.get('__name__', '').startswith('adsk.')
+
+
+def _profile(frame, event, arg):
+    # Calls adsk makes into itself are part of the one call that was made from our code
+    if event == 'call':
+        if _stack and _is_api(frame) and not _is_api(frame.f_back):
+            _stack[-1].api_calls += 1
+    elif event == 'c_call':
+        if _stack and (getattr(arg, '__module__', None) or '').startswith('adsk') and not _is_api(frame):
+            _stack[-1].api_calls += 1
+
+
+def _install_hook():
+    global _previous_profile
+    _previous_profile = sys.getprofile()
+    sys.setprofile(_profile)
+
+
+def _remove_hook():
+    global _previous_profile
+    sys.setprofile(_previous_profile)
+    _previous_profile = None
+
+
+def enable(on: bool = True):
+    """Turns recording on or off, while it is off spans, traced functions and recordings cost one check."""
+    global _enabled
+    _enabled = on
+
+
+def enabled():
+    return _enabled
+
+
+def reset():
+    global _origin
+    _events.clear()
+    _origin = time.perf_counter()
+
+
+def span(name: str, **args):
+    """Returns a context manager timing a build stage.
+
+    Calls into the adsk modules made while the span is innermost are counted towards it. Only method
+    calls are seen, property reads go straight to the C extension and do not show up.
+
+    Arguments:
+    name -- The stage name shown in the trace and the summary.
+    args -- Extra values stored with the stage in the trace.
+    """
+    if not _enabled or threading.current_thread() is not threading.main_thread():
+        return _NULL_SPAN
+    return _Span(name, args)
+
+
+def traced(name: str = None):
+    """Decorator running the whole function in a span, named after the function unless a name is given."""
+    def decorator(func):
+        stage = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def events():
+    return list(_events)
+
+
+def chrome_trace():
+    """Returns the recorded spans in the Chrome trace event format, load it in chrome://tracing or Perfetto."""
+    return {'traceEvents': sorted(_events, key=lambda event: event['ts']), 'displayTimeUnit': 'ms'}
+
+
+def write_chrome_trace(path: str):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as file:
+        json.dump(chrome_trace(), file, separators=(',', ':'))
+    return path
+
+
+def prune_traces(directory: str, name: str, keep: int = TRACE_RETENTION):
+    """Deletes all but the newest keep trace files written by recordings called name."""
+    prefix = f'{name}-'
+    # The time stamp in the file names sorts them oldest first
+    traces = sorted(entry for entry in os.listdir(directory) if entry.startswith(prefix) and entry.endswith('.json'))
+    for entry in traces[:max(len(traces) - keep, 0)]:
+        try:
+            os.remove(os.path.join(directory, entry))
+        except OSError:
+            pass
+
+
+def summary():
+    """Returns a text table of the recorded stages with their count, time and adsk calls, slowest first."""
+    stages = {}
+    for event in _events:
+        stage = stages.setdefault(event['name'], [0, 0.0, 0, 0])
+        stage[0] += 1
+        stage[1] += event['dur'] / 1000
+        stage[2] += event['args']['apiCalls']
+        stage[3] += event['args']['selfApiCalls']
+    if not stages:
+        return 'No stages recorded'
+
+    width = max(len('stage'), max(len(name) for name in stages))
+    lines = [f"{'stage':<{width}}  {'count':>5}  {'total ms':>10}  {'mean ms':>9}  {'api calls':>9}  {'self calls':>10}"]
+    for name, (count, total, calls, self_calls) in sorted(stages.items(), key=lambda item: -item[1][1]):
+        lines.append(f'{name:<{width}}  {count:>5}  {total:>10.1f}  {total / count:>9.1f}  {calls:>9}  {self_calls:>10}')
+    return '\n'.join(lines)
+
+
+class recording:
+    """Records one command run, then writes its Chrome trace and logs the summary table.
+
+    Used as a context manager around the whole build. Does nothing while recording is disabled.
+
+    Arguments:
+    name -- Name of the root span, also used for the trace file name.
+    directory -- Folder the trace file is written to.
+    log -- Called with the summary and the trace file path once the run finished.
+    keep -- Number of trace files of this name kept in directory, older ones are deleted.
+    """
+
+    def __init__(self, name: str, directory: str, log=print, keep: int = TRACE_RETENTION):
+        self.name = name
+        self.directory = directory
+        self.log = log
+        self.keep = keep
+        self.span = _NULL_SPAN
+        self.path = None
+
+    def __enter__(self):
+        if _enabled and not _stack:
+            reset()
+            self.span = span(self.name)
+        self.span.__enter__()
+        return self
+
+    def __exit__(self, *exc):
+        self.span.__exit__(*exc)
+        if self.span is not _NULL_SPAN:
+            self.path = write_chrome_trace(self._trace_path())
+            prune_traces(self.directory, self.name, self.keep)
+            self.log(f'{self.name} stages:\n{summary()}\nTrace written to {self.path}')
+        return False
+
+    def _trace_path(self):
+        # The stamp has milliseconds so runs in the same second get their own file, a run that lands on a taken
+        # millisecond moves to the next free one, which keeps the file names sorting oldest first
+        milliseconds = int(time.time() * 1000)
+        while True:
+            seconds, fraction = divmod(milliseconds, 1000)
+            stamp = f"{time.strftime('%Y%m%d-%H%M%S', time.localtime(seconds))}-{fraction:03d}"
+            path = os.path.join(self.directory, f'{self.name}-{stamp}.json')
+            if not os.path.exists(path):
+                return path
+            milliseconds += 1
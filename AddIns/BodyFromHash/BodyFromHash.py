@@ -5,6 +5,9 @@ from .lib import fusion360utils as futil
 
 def run(context):
     try:
+        # Console messages are queued and written in batches once the add-in is idle
+        futil.start_logging()
+
         # This will run the start function in each of your commands as defined in commands/__init__.py
         commands.start()
 
@@ -14,6 +17,9 @@ def run(context):
 
 def stop(context):
     try:
+        # Write out whatever is still queued before the flush event goes away with the handlers
+        futil.stop_logging()
+
         # Remove all of the event handlers your app has created
         futil.clear_handlers()
 
@@ -0,0 +1,74 @@
+# Times each helpers.createPipe strategy on hashes of increasing length.
+# The command only offers this when config.DEBUG is set.
+import os
+import random
+import time
+import adsk, adsk.core as core
+from . import logic
+from .helpers import helpers
+from ...lib import fusion360utils as futil
+from ... import config
+
+app = core.Application.get()
+
+# Hex digits in each benchmark hash, every step roughly doubles the number of segments in the walk
+HASH_LENGTHS = (16, 32, 64, 128, 256)
+REPEATS = 3
+REPORT_PATH = os.path.join(config.path_cache_dir, 'pipe_benchmark.csv')
+
+# The same seed gives the same hashes every run so results can be compared between builds
+def benchmarkHashes(lengths=HASH_LENGTHS, seed: int = 0):
+    generator = random.Random(seed)
+    return [f'{generator.getrandbits(4 * length):0{length}x}' for length in lengths]
+
+def run(strategies=helpers.PIPE_STRATEGIES, lengths=HASH_LENGTHS, repeats: int = REPEATS):
+    """Builds every hash with every strategy in a scratch document and reports the best time of each.
+
+    :returns:
+        A list of (hash length, segments, strategy, status, seconds) rows.
+    """
+    hashes = benchmarkHashes(lengths)
+    # A scratch document keeps the benchmark bodies out of the user's design, it is closed without saving
+    document = app.documents.add(core.DocumentTypes.FusionDesignDocumentType)
+
+    progressDialog = app.userInterface.createProgressDialog()
+    progressDialog.isCancelButtonShown = True
+    progressDialog.show('Pipe Benchmark', 'Build %v of %m', 0, len(hashes) * len(strategies) * repeats)
+
+    rows = []
+    builds = 0
+    for hash in hashes:
+        # The walk is shared by every strategy so only the feature build is timed
+        path = logic.hashPath('16', hash)
+        segments = len(path[0]) // 3 - 1
+        for strategy in strategies:
+            status = 'OK'
+            times = []
+            for _ in range(repeats):
+                if progressDialog.wasCancelled:
+                    status = 'Cancelled'
+                    break
+                start = time.perf_counter()
+                try:
+                    logic.createBody('16', hash, path=path, strategy=strategy)
+                except RuntimeError:
+                    status = 'Failed'
+                    break
+                times.append(time.perf_counter() - start)
+                builds += 1
+                progressDialog.progressValue = builds
+                adsk.doEvents()
+            rows.append((len(hash), segments, strategy, status, min(times) if times else 0.0))
+
+    progressDialog.hide()
+    document.close(False)
+
+    os.makedirs(os.path.dirname(REPORT_PATH), exist_ok=True)
+    with open(REPORT_PATH, 'w') as file:
+        file.write('hash_length,segments,strategy,status,best_ms\n')
+        for length, segments, strategy, status, seconds in rows:
+            file.write(f'{length},{segments},{strategy},{status},{seconds * 1000:.1f}\n')
+    for length, segments, strategy, status, seconds in rows:
+        futil.log(f'{length:>4} digits {segments:>5} segments {strategy:>8}: {status} {seconds * 1000:.1f} ms', force_console=True)
+    futil.log(f'Pipe benchmark written to {REPORT_PATH}', force_console=True)
+    return rows
@@ -28,10 +28,6 @@ COMMAND_BESIDE_ID = 'ScriptsManagerCommand'
 # Resource location for command icons, here we assume a sub folder in this directory named "resources".
 ICON_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'resources', '')
 
-# Local list of event handlers used to maintain a reference so
-# they are not released and garbage collected.
-local_handlers = []
-
 
 # Executed when add-in is run.
 def start():
@@ -80,12 +76,14 @@ def command_created(args: core.CommandCreatedEventArgs):
     inputs = args.command.commandInputs
 
 
-    # Connect to the events that are needed by this command.
-    futil.add_handler(args.command.execute, command_execute, local_handlers=local_handlers)
-    futil.add_handler(args.command.inputChanged, command_input_changed, local_handlers=local_handlers)
-    futil.add_handler(args.command.executePreview, command_preview, local_handlers=local_handlers)
-    futil.add_handler(args.command.validateInputs, command_validate_input, local_handlers=local_handlers)
-    futil.add_handler(args.command.destroy, command_destroy, local_handlers=local_handlers)
+    # Connect to the events that are needed by this command. The handlers are kept in a scope named after
+    # the command so they are not garbage collected while the dialog is open, and released when it is destroyed.
+    scope = futil.handler_scope(CMD_ID)
+    futil.add_handler(args.command.execute, command_execute, scope=scope)
+    futil.add_handler(args.command.inputChanged, command_input_changed, scope=scope)
+    futil.add_handler(args.command.executePreview, command_preview, scope=scope)
+    futil.add_handler(args.command.validateInputs, command_validate_input, scope=scope)
+    futil.add_handler(args.command.destroy, command_destroy, scope=scope)
 
     # Define the dialog for your command by adding different inputs to the command.
     # Create an instance of the BodyFromHash command class.
@@ -109,8 +107,9 @@ def command_execute(args: core.CommandEventArgs):
 # This event handler is called when the command needs to compute a new preview in the graphics window.
 def command_preview(args: core.CommandEventArgs):
     # General logging for debug.
-    futil.log(f'{CMD_NAME} Command Preview Event')
-    # body_from_hash_logic.HandleExecute(args)
+    futil.log(lambda: f'{CMD_NAME} Command Preview Event')
+    # The real body is only built on OK, the preview draws the walk as lines
+    body_from_hash_logic.HandlePreview(args)
 
 
 # This event handler is called when the user changes anything in the command dialog
@@ -121,14 +120,14 @@ def command_input_changed(args: core.InputChangedEventArgs):
 
     if changed_input.id != 'errMessage':
         # General logging for debug.
-        futil.log(f'{CMD_NAME} Input Changed Event fired from a change to {changed_input.id}')
+        futil.log(lambda: f'{CMD_NAME} Input Changed Event fired from a change to {changed_input.id}')
         body_from_hash_logic.HandleInputsChanged(args)
 
 # This event handler is called when the user interacts with any of the inputs in the dialog
 # which allows you to verify that all of the inputs are valid and enables the OK button.
 def command_validate_input(args: core.ValidateInputsEventArgs):
     # General logging for debug.
-    futil.log(f'{CMD_NAME} Validate Input Event')
+    futil.log(lambda: f'{CMD_NAME} Validate Input Event')
     body_from_hash_logic.HandleValidateInputs(args)
     
         
@@ -136,6 +135,7 @@ def command_validate_input(args: core.ValidateInputsEventArgs):
 def command_destroy(args: core.CommandEventArgs):
     # General logging for debug.
     futil.log(f'{CMD_NAME} Command Destroy Event')
+    body_from_hash_logic.HandleDestroy(args)
 
-    global local_handlers
-    local_handlers = []
+    futil.release_scope(CMD_ID)
+    futil.log(f'{CMD_NAME} released its handlers, {futil.live_handlers()} still live')
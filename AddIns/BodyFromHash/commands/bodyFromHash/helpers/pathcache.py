@@ -0,0 +1,135 @@
+# On-disk cache of computed hash paths so repeated and batch runs skip the walk.
+# This module does not depend on adsk.
+import hashlib
+import json
+import os
+import struct
+import sys
+import threading
+from array import array
+
+# Bump this whenever the entry layout or the walk itself changes, older entries are then treated as misses.
+CACHE_VERSION = 1
+
+_MAGIC = b'BFHC'
+_HEADER = struct.Struct('<4sHI')
+
+
+def normalize(hash: str, base) -> str:
+    # int() ignores case, surrounding whitespace and leading zeros, so the cache key does too
+    digits = hash.strip().lower().lstrip('0') or '0'
+    return f'{int(base)}:{digits}'
+
+
+class PathCache:
+    """Size bounded, least recently used cache of (vertices, metadata) keyed by (hash, base).
+
+    Each entry is one file holding a versioned header, JSON metadata and the raw vertex array.
+    Recency is the file's modification time, which is refreshed on every hit unless touch is False,
+    so the eviction order survives between sessions.
+    """
+
+    def __init__(self, directory: str, maxBytes: int = 64 * 1024 * 1024) -> None:
+        self.directory = directory
+        self.maxBytes = maxBytes
+        self.hits = 0
+        self.misses = 0
+        self._sizes = None
+        # The dialog preview computes paths on a timer thread while the command may be using the cache
+        self._lock = threading.RLock()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + '.bin')
+
+    def _load_sizes(self):
+        # File sizes are read once per session and then kept up to date in memory
+        if self._sizes is None:
+            self._sizes = {}
+            if os.path.isdir(self.directory):
+                for name in os.listdir(self.directory):
+                    if name.endswith('.bin'):
+                        self._sizes[os.path.join(self.directory, name)] = os.path.getsize(os.path.join(self.directory, name))
+        return self._sizes
+
+    def get(self, hash: str, base, touch: bool = True):
+        """Returns (vertices, metadata) for a hash or None on a miss, touch=False leaves its recency alone."""
+        with self._lock:
+            return self._get(hash, base, touch)
+
+    def _get(self, hash: str, base, touch: bool = True):
+        key = normalize(hash, base)
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as file:
+                magic, version, headerLength = _HEADER.unpack(file.read(_HEADER.size))
+                if magic != _MAGIC or version != CACHE_VERSION:
+                    raise ValueError('stale cache entry')
+                metadata = json.loads(file.read(headerLength))
+                if metadata.pop('key') != key:
+                    raise ValueError('cache key collision')
+                vertices = array('i')
+                vertices.frombytes(file.read())
+            if sys.byteorder != 'little':
+                vertices.byteswap()
+            if touch:
+                os.utime(path)
+        except (OSError, ValueError, struct.error):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return vertices, metadata
+
+    def put(self, hash: str, base, vertices: array, metadata: dict):
+        with self._lock:
+            self._put(hash, base, vertices, metadata)
+
+    def _put(self, hash: str, base, vertices: array, metadata: dict):
+        key = normalize(hash, base)
+        path = self._path(key)
+        header = json.dumps(dict(metadata, key=key), separators=(',', ':')).encode()
+        data = array('i', vertices)
+        if sys.byteorder != 'little':
+            data.byteswap()
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(path, 'wb') as file:
+            file.write(_HEADER.pack(_MAGIC, CACHE_VERSION, len(header)))
+            file.write(header)
+            file.write(data.tobytes())
+        sizes = self._load_sizes()
+        sizes[path] = os.path.getsize(path)
+        self._evict(keep=path)
+
+    def _evict(self, keep: str):
+        sizes = self._load_sizes()
+        total = sum(sizes.values())
+        if total <= self.maxBytes:
+            return
+        # Oldest first, by last use
+        for path in sorted(sizes, key=lambda path: os.path.getmtime(path) if os.path.exists(path) else 0):
+            if total <= self.maxBytes:
+                break
+            if path == keep:
+                continue
+            total -= sizes.pop(path)
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def clear(self):
+        with self._lock:
+            self._clear()
+
+    def _clear(self):
+        for path in list(self._load_sizes()):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        self._sizes = {}
+        self.hits = 0
+        self.misses = 0
+
+    def stats(self) -> str:
+        return f'path cache: {self.hits} hits, {self.misses} misses, {len(self._load_sizes())} entries'
@@ -1,5 +1,10 @@
+import csv
+import os
+import time
 import adsk, adsk.core as core, adsk.fusion as fusion
-from .helpers import helpers
+from .helpers import helpers, walk, pathcache
+from ...lib import fusion360utils as futil
+from ... import config
 
 app = core.Application.get()
 if app:
@@ -7,11 +12,21 @@ if app:
     createPoint = core.Point3D.create
     alert = ui.messageBox
 skipValidate = False
+pathCache = pathcache.PathCache(config.path_cache_dir, config.path_cache_max_bytes)
+
+PREVIEW_EVENT_ID = f'{config.COMPANY_NAME}_{config.ADDIN_NAME}_bodyFromHashPreview'
+# Seconds to wait after the last change before computing a preview, so typing a hash only walks it once
+PREVIEW_DELAY = 0.3
+# Digit characters in order of value, a base uses the first base of them
+DIGITS = '0123456789abcdefghijklmnopqrstuvwxyz'
 
 class BodyFromHashLogic():
     def __init__(self) -> None:
         self.hash = '0000000000000000000700ee25d025cf3a2e29706b74b55c0a39d46206c569a2'
         self.base = '16'
+        self.batch = False
+        self.benchmark = False
+        self.preview = HashPreview()
 
     def CreateCommandInputs(self, inputs: core.CommandInputs):
         global skipValidate
@@ -19,56 +34,219 @@ class BodyFromHashLogic():
 
         self.hashInput = inputs.addStringValueInput('hash', 'Hash', self.hash)
         self.baseInput = inputs.addStringValueInput('base', 'Base', self.base)
-        
+        self.batchInput = inputs.addBoolValueInput('batch', 'Batch From File', True, '', self.batch)
+        self.batchInput.tooltip = 'Build a body for every hash in a text or CSV file, one "hash" or "hash,base" per line'
+        self.benchmarkInput = None
+        if config.DEBUG:
+            self.benchmarkInput = inputs.addBoolValueInput('benchmark', 'Benchmark Pipes', True, '', self.benchmark)
+            self.benchmarkInput.tooltip = 'Time every pipe strategy on hashes of increasing length in a scratch document'
+
         self.errorMessageTextInput = inputs.addTextBoxCommandInput('errMessage', '', '', 2, True)
         self.errorMessageTextInput.isFullWidth = True
 
+        self.CreateValidator()
+
         skipValidate = False
 
     def HandleInputsChanged(self, args: core.InputChangedEventArgs):
-        pass
+        if args.input.id == 'batch':
+            # In batch mode the hashes come from the file, the base is used for lines without one
+            self.hashInput.isVisible = not self.batchInput.value
 
     def HandleValidateInputs(self, args: core.ValidateInputsEventArgs):
         if not skipValidate:
-            self.errorMessageTextInput.text = ''
-
-            # hashInput: core.StringValueCommandInput = inputs.itemById('hash')
-            # baseInput: core.StringValueCommandInput = inputs.itemById('base')
-
             # Verify the validity of the input values. This controls if the OK button is enabled or not.
-            if len(self.hashInput.value) == 0:
-                args.areInputsValid = False
-                self.errorMessageTextInput.text = 'Please provide a hash string'
-                return
-            if int(self.baseInput.value) < 2 or int(self.baseInput.value) > 36:
+            errMsg = self.validator.validate()
+            self.errorMessageTextInput.text = errMsg
+            if errMsg:
                 args.areInputsValid = False
-                self.errorMessageTextInput.text = 'Please provide a base between 2 and 36'
+                # There is no walk for a hash that does not parse in the base given, so the previous one goes
+                self.preview.cancel()
                 return
-
-            try:
-                int(self.hashInput.value, int(self.baseInput.value))
-            except Exception as e:
-                errMsg: str = e.args[0]
-                if errMsg.startswith('invalid literal for int()'):
-                    args.areInputsValid = False
-                    self.errorMessageTextInput.text = 'Base is not valid for the hash provided'
-                    return
-                else:
-                    raise
             args.areInputsValid = True
-            self.hash = self.hashInput.value
-            self.base = self.baseInput.value
+            values = self.validator.values
+            self.hash = values['hash']
+            self.base = values['base']
+            self.batch = values['batch']
+            self.benchmark = values['benchmark']
+
+    def CreateValidator(self):
+        validator = self.validator = futil.Validator()
+        validator.input('hash', lambda: self.hashInput.value)
+        validator.input('base', lambda: self.baseInput.value)
+        validator.input('batch', lambda: self.batchInput.value)
+        validator.input('benchmark', lambda: self.benchmarkInput.value if self.benchmarkInput else False)
+
+        # In batch mode the hashes come from the file, so only the base is checked
+        @validator.rule('hash', 'batch')
+        def hashGiven(hash, batch):
+            if not batch and len(hash) == 0:
+                return 'Please provide a hash string'
+
+        @validator.rule('base')
+        def baseValid(base):
+            return validateBase(base)
+
+        @validator.rule('hash', 'base', 'batch')
+        def hashFitsBase(hash, base, batch):
+            if not batch and not hashFitsDigits(hash, base):
+                return hashDigitsMessage(hash)
+
+    def HandlePreview(self, args: core.CommandEventArgs):
+        if self.batch:
+            self.preview.cancel()
+        else:
+            self.preview.request(self.hash, self.base)
 
     def HandleExecute(self, args: core.CommandEventArgs):
         # Get a reference to your command's inputs.
         # inputs = args.command.commandInputs
+        self.preview.cancel()
+
+        if self.benchmark:
+            from . import benchmark
+            benchmark.run()
+        elif self.batch:
+            fileDialog = ui.createFileDialog()
+            fileDialog.title = 'Select a file of hashes'
+            fileDialog.filter = 'Hash files (*.txt *.csv);;All files (*.*)'
+            if fileDialog.showOpen() != core.DialogResults.DialogOK:
+                return
+            createBodiesFromFile(fileDialog.filename, self.base)
+        else:
+            try:
+                createBody(self.base, self.hash)
+            except RuntimeError as error:
+                alert(str(error))
+
+    def HandleDestroy(self, args: core.CommandEventArgs):
+        self.preview.close()
+
+
+class HashPreview(futil.LivePreview):
+    """Draws the walk for a hash as custom graphics lines while the dialog is open."""
+
+    def __init__(self) -> None:
+        super().__init__(PREVIEW_EVENT_ID, lambda hash, base: hashPath(base, hash, persist=False)[0], PREVIEW_DELAY)
+
+    def draw_graphics(self, group: fusion.CustomGraphicsGroup, vertices):
+        coordinates = core.CustomGraphicsCoordinates.create([float(value) for value in vertices])
+        # One line strip through every corner, an empty index list draws the coordinates in order
+        lines = group.addLines(coordinates, [], True)
+        lines.color = core.CustomGraphicsSolidColorEffect.create(core.Color.create(255, 128, 0, 255))
+        lines.weight = 2
 
-        createBody(self.base, self.hash)
 
+def validateBase(base: str):
+    if not base.isdigit() or int(base) < 2 or int(base) > 36:
+        return 'Please provide a base between 2 and 36'
+    return None
 
-def createBody(base: str, hash: str):
-        base10Hash = int(hash, int(base))
-        base6Hash = helpers.base(base10Hash, 6)
+# Returns the message to show for an invalid hash and base, or None if they are valid
+def validateHash(hash: str, base: str):
+    if len(hash) == 0:
+        return 'Please provide a hash string'
+    errMsg = validateBase(base)
+    if errMsg:
+        return errMsg
+    if not hashFitsDigits(hash, base):
+        return hashDigitsMessage(hash)
+    return None
+
+# The message for a hash hashFitsDigits rejected
+def hashDigitsMessage(hash: str):
+    return 'The hash must not be zero' if not hash.strip('0') else 'Base is not valid for the hash provided'
+
+# Checks the characters of the hash instead of parsing it, which is linear in its length where int() is not.
+# This is stricter than int(), which also takes signs, prefixes, underscores and surrounding whitespace.
+# A hash of only zeros is rejected too, zero has no base 6 digits to walk so its path would be empty.
+def hashFitsDigits(hash: str, base: str):
+    digits = DIGITS[:int(base)]
+    return set(hash.lower()) <= set(digits) and bool(hash.strip('0'))
+
+# With persist False the cache is only read, the preview walks every partial hash typed into the dialog
+def hashPath(base: str, hash: str, persist: bool = True):
+    cached = pathCache.get(hash, base, touch=persist)
+    if cached:
+        vertices, metadata = cached
+        return vertices, metadata['removed']
+
+    base10Hash = int(hash, int(base))
+    # The walk reads the base 6 digits as they are generated, a number never has more of them than bits
+    base6Digits = helpers.digits(base10Hash, 6)
+    # Straight runs are merged so the path and sweep only see one curve per corner
+    vertices, removed = walk.simplify(walk.walk(base6Digits, base10Hash.bit_length()))
+    if persist:
+        pathCache.put(hash, base, vertices, {'removed': removed})
+    return vertices, removed
+
+# Yields (line number, hash, base) for each hash in a text or CSV file without reading it all in
+def readHashes(path: str, defaultBase: str):
+    with open(path, newline='') as file:
+        for lineNumber, line in enumerate(file, 1):
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            fields = [field.strip() for field in line.split(',')]
+            base = fields[1] if len(fields) > 1 and fields[1] else defaultBase
+            yield lineNumber, fields[0], base
+
+def createBodiesFromFile(filePath: str, defaultBase: str):
+    report = []
+    built = 0
+    progressDialog = None
+    # A hash that fails is reported and the next one is built, the report is written whatever happened
+    try:
+        # Validate and walk every hash up front so the Fusion pass only has to build geometry
+        jobs = []
+        for lineNumber, hash, base in readHashes(filePath, defaultBase):
+            errMsg = validateHash(hash, base)
+            if errMsg:
+                report.append((lineNumber, hash, base, errMsg, 0.0, 0.0))
+                continue
+            start = time.perf_counter()
+            try:
+                bodyPath = hashPath(base, hash)
+            except Exception as error:
+                report.append((lineNumber, hash, base, f'Failed: {error}', time.perf_counter() - start, 0.0))
+                continue
+            jobs.append((lineNumber, hash, base, bodyPath, time.perf_counter() - start))
+
+        progressDialog = ui.createProgressDialog()
+        progressDialog.isCancelButtonShown = True
+        progressDialog.show('Body From Hash', 'Building body %v of %m', 0, len(jobs))
+        for done, (lineNumber, hash, base, bodyPath, pathTime) in enumerate(jobs, 1):
+            if progressDialog.wasCancelled:
+                report.append((lineNumber, hash, base, 'Cancelled', pathTime, 0.0))
+                continue
+            start = time.perf_counter()
+            try:
+                status = 'OK' if createBody(base, hash, bodyPath) else 'Failed: no body was built'
+            except Exception as error:
+                status = f'Failed: {error}'
+            report.append((lineNumber, hash, base, status, pathTime, time.perf_counter() - start))
+            if status == 'OK':
+                built += 1
+            progressDialog.progressValue = done
+            # Let the progress dialog repaint and see the cancel button
+            adsk.doEvents()
+    finally:
+        if progressDialog:
+            progressDialog.hide()
+        report.sort()
+        reportPath = f'{os.path.splitext(filePath)[0]}_report.csv'
+        with open(reportPath, 'w', newline='') as file:
+            writer = csv.writer(file)
+            writer.writerow(('line', 'hash', 'base', 'status', 'path_ms', 'build_ms'))
+            for lineNumber, hash, base, status, pathTime, buildTime in report:
+                writer.writerow((lineNumber, hash, base, status, f'{pathTime * 1000:.1f}', f'{buildTime * 1000:.1f}'))
+        totalTime = sum(row[4] + row[5] for row in report)
+        futil.log(f'Built {built} of {len(report)} bodies in {totalTime:.1f} s, report written to {reportPath}', force_console=True)
+        futil.log(pathCache.stats(), force_console=True)
+
+
+def createBody(base: str, hash: str, path: tuple = None, strategy: str = None):
+        vertices, removed = path or hashPath(base, hash)
 
         design: fusion.Design = app.activeProduct
         root = design.rootComponent
@@ -83,43 +261,21 @@ def createBody(base: str, hash: str):
         xYPlane = root.xYConstructionPlane
         sketch: fusion.Sketch = sketches.add(xYPlane)
 
-        lines = sketch.sketchCurves.sketchLines
-        position = [0,0,0]
-        prevPositions = [position]
-
-        for char in base6Hash:
-            direction = helpers.directionFromDigit(char)
-            
-            if direction == 'XPOS': 
-                nextPoint = [position[0] + 1, position[1], position[2]]
-            elif direction == 'XNEG':
-                nextPoint = [position[0] - 1, position[1], position[2]]
-            elif direction == 'YPOS': 
-                nextPoint = [position[0], position[1] + 1, position[2]]
-            elif direction == 'YNEG': 
-                nextPoint = [position[0], position[1] - 1, position[2]]
-            elif direction == 'ZPOS': 
-                nextPoint = [position[0], position[1], position[2] + 1]
-            elif direction == 'ZNEG': 
-                nextPoint = [position[0], position[1], position[2] - 1]
-
-            if nextPoint in prevPositions:
-                continue
-            line = lines.addByTwoPoints(
-                createPoint(position[0], position[1], position[2]),
-                createPoint(nextPoint[0], nextPoint[1], nextPoint[2])
-                )
-            if line is None:
-                alert('Failed to draw line...')
-                return
- 
-            prevPositions.append(nextPoint)
-            position = nextPoint
-            # curvesCollection.add(line)
-            # adsk.doEvents()
+        futil.log(f'Path simplification removed {removed} of {removed + len(vertices) // 3 - 1} segments, {pathCache.stats()}')
+        points = [createPoint(x, y, z) for (x, y, z) in walk.points(vertices)]
 
         curvesCollection = core.ObjectCollection.create()
-        for line in lines:
+        lines = sketch.sketchCurves.sketchLines
+        line = None
+        for point in points[1:]:
+            # Start each line on the end of the previous one so the path is one connected chain
+            line = lines.addByTwoPoints(line.endSketchPoint if line else points[0], point)
+            if line is None:
+                # The batch reports this for the hash and goes on, so nothing may wait on a message box here
+                sketch.deleteMe()
+                newOcc.deleteMe()
+                raise RuntimeError(f'Failed to draw line {curvesCollection.count + 1} of {len(points) - 1}')
             curvesCollection.add(line)
-        helpers.createPipe(newComp, curvesCollection, 0.2, 0.04)
+
+        return helpers.createPipe(newComp, curvesCollection, 0.2, 0.04, strategy or config.pipe_strategy)
         # app.activeViewport.refresh()
\ No newline at end of file
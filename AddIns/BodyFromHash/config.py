@@ -18,4 +18,12 @@ ADDIN_NAME = os.path.basename(os.path.dirname(__file__))
 COMPANY_NAME = 'RJP'
 
 # Palettes
-sample_palette_id = f'{COMPANY_NAME}_{ADDIN_NAME}_palette_id'
\ No newline at end of file
+sample_palette_id = f'{COMPANY_NAME}_{ADDIN_NAME}_palette_id'
+
+# On-disk cache of computed hash paths, the oldest entries are removed once it grows past the size limit
+path_cache_dir = os.path.join(os.path.dirname(__file__), 'cache')
+path_cache_max_bytes = 64 * 1024 * 1024
+
+# How BodyFromHash builds the hollow tube, one of helpers.PIPE_STRATEGIES.
+# 'annular' sweeps a ring once, 'shell' is the older sweep and shell which is slower on long paths.
+pipe_strategy = 'annular'
@@ -1,2 +1,4 @@
 from .general_utils import *
 from .event_utils import *
+from .validation_utils import *
+from .preview_utils import *
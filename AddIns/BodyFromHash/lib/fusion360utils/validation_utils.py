@@ -0,0 +1,98 @@
+#  Validation of command dialog inputs, declared once and re-evaluated only as far as the inputs changed.
+#  This module does not depend on adsk so validators can be exercised outside of Fusion.
+
+from typing import Callable
+
+
+class _Step:
+    """A rule or derived value, remembering its result for the last values of its sources."""
+
+    def __init__(self, name: str, sources: tuple, func: Callable):
+        self.name = name
+        self.sources = sources
+        self.func = func
+        self.args = None
+        self.result = None
+
+    def __call__(self, values: dict):
+        args = tuple(values[source] for source in self.sources)
+        if args != self.args:
+            self.result = self.func(*args)
+            self.args = args
+        return self.result
+
+
+class Validator:
+    """Declarative validation of a command dialog.
+
+    Inputs are registered with a reader returning their current value. Derived values and rules are
+    functions of named inputs or earlier derived values, rules return an error message or None and are
+    checked in the order they were added. validate() reads every input once, returns the last verdict
+    right away when none of them changed and otherwise only re-runs the derived values and rules whose
+    sources did.
+
+        validator = futil.Validator()
+        validator.input('old', lambda: self.oldInput.value)
+
+        @validator.rule('old')
+        def oldPositive(old):
+            return 'OLD must be greater than 0' if old <= 0 else None
+    """
+
+    def __init__(self) -> None:
+        self._readers = {}
+        self._derived = []
+        self._rules = []
+        self._fingerprint = None
+        self._message = ''
+        self.values = {}
+        self.hits = 0
+        self.misses = 0
+
+    def input(self, name: str, reader: Callable):
+        self._readers[name] = reader
+        self._fingerprint = None
+
+    def derive(self, name: str, *sources: str):
+        """Decorator adding a value computed from the named inputs, kept in values under name."""
+        def decorator(func):
+            self._derived.append(_Step(name, sources, func))
+            self._fingerprint = None
+            return func
+        return decorator
+
+    def rule(self, *sources: str):
+        """Decorator adding a rule called with the named values, returning an error message or None."""
+        def decorator(func):
+            self._rules.append(_Step(func.__name__, sources, func))
+            self._fingerprint = None
+            return func
+        return decorator
+
+    def validate(self) -> str:
+        """Returns the message of the first failing rule, or an empty string when every rule passes."""
+        fingerprint = tuple(reader() for reader in self._readers.values())
+        if fingerprint == self._fingerprint:
+            self.hits += 1
+            return self._message
+        self.misses += 1
+
+        values = dict(zip(self._readers, fingerprint))
+        for step in self._derived:
+            values[step.name] = step(values)
+        message = ''
+        for step in self._rules:
+            message = step(values) or ''
+            if message:
+                break
+
+        self.values = values
+        self._fingerprint = fingerprint
+        self._message = message
+        return message
+
+    def reset(self):
+        """Forgets every remembered result, for when something the readers do not cover changed."""
+        self._fingerprint = None
+        for step in self._derived + self._rules:
+            step.args = None
@@ -0,0 +1,14 @@
+"""Stand-in for the adsk package, see _standin. Put the Benchmarks folder first on sys.path to use it."""
+from ._standin import recorder
+
+
+def doEvents():
+    recorder.call('adsk.doEvents')
+
+
+def terminate():
+    recorder.call('adsk.terminate')
+
+
+def autoTerminate(value: bool):
+    recorder.call('adsk.autoTerminate')
@@ -0,0 +1,453 @@
+"""Recording stand-in for the Fusion 360 API.
+
+Every class and member looked up on adsk.core and adsk.fusion exists, every call succeeds and returns
+another stand-in object. Each call, property read and property write is counted against a modeled cost,
+so a build can be run and measured without Fusion. Only the behavior the add-ins rely on to find their
+own geometry again is modeled: attributes, components and occurrences, proxies, collections and casts.
+Geometry is not, see NUMBERS, apart from the cylinders of temporary tool bodies that a combine cut leaves
+behind as faces.
+"""
+import re
+from collections import Counter
+
+# Modeled cost in milliseconds of calling a member, keyed by 'owner.member' where owner is the name of the
+# collection or call the object came from. Members not listed cost DEFAULT_CALL_COST.
+CALL_COSTS = {
+    'importManager.importToTarget': 150.0,
+    'occurrences.addNewComponent': 10.0,
+    'occurrences.addExistingComponent': 4.0,
+    'sketches.add': 5.0,
+    'extrudeFeatures.add': 40.0,
+    'revolveFeatures.add': 60.0,
+    'sweepFeatures.add': 80.0,
+    'loftFeatures.add': 80.0,
+    'pipeFeatures.add': 80.0,
+    'shellFeatures.add': 60.0,
+    'circularPatternFeatures.add': 120.0,
+    'moveFeatures.add': 20.0,
+    'threadFeatures.add': 60.0,
+    'splitFaceFeatures.add': 30.0,
+    'combineFeatures.add': 100.0,
+    'baseFeatures.add': 5.0,
+    'bRepBodies.add': 10.0,
+    'constructionPlanes.add': 2.0,
+    'createCylinderOrCone': 0.5,
+    'booleanOperation': 2.0,
+    'joints.add': 25.0,
+    'findAttributes': 2.0,
+    'deleteMe': 5.0,
+}
+DEFAULT_CALL_COST = 0.05
+READ_COST = 0.01
+WRITE_COST = 0.02
+
+# Number of items in a collection nothing was added to, keyed by the name of the collection
+COUNTS = {
+    'profiles': 4,
+    'bodies': 1,
+    # Enough circular edges on a hub flange face for the spoke holes of the wheel cases
+    'edges': 24,
+}
+DEFAULT_COUNT = 4
+
+# Properties that read as numbers until they are set, and methods that return numbers. An entity's numbers
+# are its position in the collection it came from, so entities of one collection tell apart by geometry.
+NUMBERS = {'x', 'y', 'z', 'radius', 'value', 'length', 'area', 'volume', 'progressValue'}
+NUMERIC_METHODS = {'dotProduct', 'distanceTo', 'angleTo'}
+
+# Collections of faces and the faces in them, edges read through them are shared by the feature or body above
+FACES = {'edges', 'faces', 'sideFaces', 'startFaces', 'endFaces'}
+
+# Members that name a component, an object read through them is its own component
+COMPONENTS = {'component', 'rootComponent'}
+
+_UNITS = {'mm': 0.1, 'cm': 1.0, 'm': 100.0, 'in': 2.54, 'deg': 3.141592653589793 / 180, 'rad': 1.0, '': 1.0}
+
+
+class Recorder:
+    """Counts what a run asked of the API, see reset()."""
+
+    def __init__(self) -> None:
+        self.reset()
+
+    def reset(self):
+        self.calls = Counter()
+        self.reads = Counter()
+        self.writes = Counter()
+        self.cost = 0.0
+        self.objects = 0
+        self.attributes = []
+        self.occurrences = []
+        # Reads of members that are then called are taken back, only reads made since the reset count
+        self.generation = getattr(self, 'generation', 0) + 1
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    @property
+    def total_reads(self):
+        return sum(self.reads.values())
+
+    @property
+    def total_writes(self):
+        return sum(self.writes.values())
+
+    def call(self, key: str):
+        self.calls[key] += 1
+        self.cost += CALL_COSTS.get(key, CALL_COSTS.get(key.split('.')[-1], DEFAULT_CALL_COST))
+
+    def read(self, key: str):
+        self.reads[key] += 1
+        self.cost += READ_COST
+
+    def write(self, key: str):
+        self.writes[key] += 1
+        self.cost += WRITE_COST
+
+
+recorder = Recorder()
+# Cylinders of the tool bodies, in the order they were built, whose faces a combine cut leaves out
+missing_cylinders = set()
+# Modules keep the Application they got at import, so singletons outlive reset()
+_singletons = {}
+
+
+class StandIn:
+    """Any API object, members that were never set are created on first use."""
+
+    def __init__(self, kind: str = None, parent=None, index: int = None, component=None) -> None:
+        recorder.objects += 1
+        object.__setattr__(self, '_kind', kind or type(self).__name__)
+        object.__setattr__(self, '_parent', parent)
+        object.__setattr__(self, '_index', index)
+        object.__setattr__(self, '_component', component if component is not None else getattr(parent, '_component', None))
+        object.__setattr__(self, '_values', {})
+        object.__setattr__(self, '_items', {})
+
+    def __repr__(self):
+        return f'<{self._kind}>'
+
+    def __getattr__(self, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        key = f'{self._kind}.{name}'
+        recorder.read(key)
+        values = self._values
+        if name in values:
+            value = values[name]
+            if isinstance(value, Member):
+                value._read()
+            return value
+        if name == 'count':
+            return self._count()
+        if name in NUMBERS:
+            return self._number()
+        if name == 'parentComponent':
+            return self._component
+        if name == 'isValid':
+            return True
+        if name == 'attributes':
+            value = Attributes('attributes', self)
+        elif name in COMPONENTS:
+            value = StandIn(name, self)
+            object.__setattr__(value, '_component', value)
+        else:
+            value = Member(name, self)
+            value._read()
+        values[name] = value
+        return value
+
+    def __setattr__(self, name: str, value):
+        recorder.write(f'{self._kind}.{name}')
+        self._values[name] = value
+
+    def __call__(self, *args, **kwargs):
+        return StandIn(self._kind, self)
+
+    def __iter__(self):
+        for index in range(self.count):
+            yield self.item(index)
+
+    def __len__(self):
+        return self.count
+
+    def __bool__(self):
+        return True
+
+    def __getitem__(self, index: int):
+        return self.item(index)
+
+    def __contains__(self, entity):
+        return any(item is entity for item in self)
+
+    def __eq__(self, other):
+        return self is other
+
+    def __hash__(self):
+        return id(self)
+
+    def _count(self):
+        if self._kind == 'faces' and self._parent is not None:
+            # A pattern feature has a face for each instance it added
+            quantity = _input_value(self._parent, 'quantity')
+            if quantity is not None:
+                return int(quantity) - 1
+        if self._kind == 'profileLoops':
+            # The nth profile of a sketch has n loops, so a profile with any expected number of loops can be found
+            return (self._parent._index or 0) + 1
+        return COUNTS.get(self._kind, DEFAULT_COUNT)
+
+    def _number(self):
+        owner = self
+        while owner is not None and not isinstance(owner, type):
+            if owner._index is not None:
+                return float(owner._index)
+            owner = owner._parent
+        return 0.0
+
+    def _item(self, index):
+        owner = self
+        if self._kind == 'edges':
+            # The faces of one feature or body share their edges
+            while owner._parent is not None and owner._parent._kind in FACES:
+                owner = owner._parent
+            if owner is not self and owner._parent is not None:
+                owner = owner._parent
+        items = owner._items
+        if index not in items:
+            items[index] = StandIn(self._kind, self, index=index)
+        return items[index]
+
+
+class Member(StandIn):
+    """A member read from an object, it reads as an object and can be called as a method."""
+
+    _reads = (0, 0)
+
+    def _read(self):
+        generation, reads = self._reads
+        object.__setattr__(self, '_reads', (recorder.generation, reads + 1 if generation == recorder.generation else 1))
+
+    def __call__(self, *args, **kwargs):
+        owner = self._parent
+        name = self._kind
+        key = f'{owner._kind}.{name}'
+        # Reading the member to call it is part of the call
+        generation, reads = self._reads
+        if generation == recorder.generation and reads:
+            object.__setattr__(self, '_reads', (generation, reads - 1))
+            recorder.reads[key] -= 1
+            recorder.cost -= READ_COST
+        recorder.call(key)
+        return _call(owner, name, args)
+
+
+class Attributes(StandIn):
+    def _matches(self, group: str, name: str = None):
+        return [attribute for attribute in recorder.attributes
+                if attribute._parent is self and _matches(attribute, group, name)]
+
+
+class Collection(StandIn):
+    """A collection of known items, as returned by attribute searches and ObjectCollection.create."""
+
+    def __init__(self, kind: str, items=(), parent=None) -> None:
+        super().__init__(kind, parent)
+        object.__setattr__(self, '_list', list(items))
+
+    def _count(self):
+        return len(self._list)
+
+    def _item(self, index):
+        return self._list[index] if 0 <= index < len(self._list) else None
+
+
+def _call(owner: StandIn, name: str, args: tuple):
+    kind = owner._kind
+    if name == 'item':
+        return owner._item(args[0])
+    if name == 'cast':
+        return args[0] if isinstance(args[0], StandIn) else None
+    if name == 'get':
+        # Application.get, TemporaryBRepManager.get and the like return the same object every time
+        if kind not in _singletons:
+            _singletons[kind] = _singleton(kind)
+        return _singletons[kind]
+    if name == 'create' and kind in ('Point3D', 'Vector3D'):
+        point = StandIn(kind)
+        for axis, value in zip('xyz', args):
+            point._values[axis] = value
+        return point
+    if name == 'create' and kind == 'ObjectCollection':
+        return Collection('ObjectCollection')
+    if name == 'add' and isinstance(owner, Collection):
+        owner._list.append(args[0])
+        return True
+    if name == 'add' and isinstance(owner, Attributes):
+        return _add_attribute(owner, *args)
+    if name == 'itemByName' and isinstance(owner, Attributes):
+        matches = owner._matches(args[0], args[1])
+        return matches[0] if matches else None
+    if name == 'itemsByGroup' and isinstance(owner, Attributes):
+        return Collection('attributes', owner._matches(args[0]))
+    if name == 'findAttributes':
+        return Collection('attributes', [attribute for attribute in recorder.attributes
+                                         if _matches(attribute, args[0], args[1]) and _is_valid(attribute._parent._parent)])
+    if name in ('addNewComponent', 'addExistingComponent'):
+        occurrence = StandIn('occurrence', owner)
+        if name == 'addExistingComponent':
+            occurrence._values['component'] = args[0]
+        recorder.occurrences.append(occurrence)
+        return occurrence
+    if name == 'occurrencesByComponent':
+        return Collection('occurrences', [occurrence for occurrence in recorder.occurrences
+                                          if _is_valid(occurrence) and occurrence._values.get('component') is args[0]])
+    if name == 'createForAssemblyContext':
+        proxy = StandIn(kind, owner._parent, component=owner._component)
+        proxy._values['assemblyContext'] = args[0]
+        proxy._values['nativeObject'] = owner
+        return proxy
+    if name == 'deleteMe':
+        owner._values['isValid'] = False
+        if owner in recorder.attributes:
+            recorder.attributes.remove(owner)
+        return True
+    if name == 'evaluateExpression':
+        return _evaluate(args[0])
+    if name == 'messageBox':
+        return 0
+    if name in NUMERIC_METHODS:
+        return owner._number()
+    if name == 'createCylinderOrCone':
+        # Tool bodies remember their cylinders, so the faces a combine cut leaves can be told apart by position
+        body = StandIn('tempBRepBody', owner)
+        object.__setattr__(body, '_cylinders', [args])
+        return body
+    if name == 'booleanOperation':
+        # Only unions of tool bodies are built, the cylinders of the tool are added to the target
+        target, tool = args[0], args[1]
+        target.__dict__.setdefault('_cylinders', []).extend(tool.__dict__.get('_cylinders', ()))
+        return True
+    if name == 'add' and kind == 'bRepBodies' and '_cylinders' in getattr(args[0], '__dict__', {}):
+        body = StandIn('bRepBody', owner)
+        object.__setattr__(body, '_cylinders', list(args[0]._cylinders))
+        return body
+    if name == 'add' and kind == 'combineFeatures':
+        return _combine(owner, args[0])
+    if name == 'createByReal':
+        value = StandIn(name, owner)
+        value._values['realValue'] = args[0]
+        return value
+    result = StandIn(name, owner)
+    object.__setattr__(result, '_args', args)
+    return result
+
+
+# A combine cut whose body has a cylindrical face for every cylinder of its tool bodies, centered on the cylinder
+def _combine(owner: StandIn, combineInput: StandIn):
+    feature = StandIn('add', owner)
+    target, tools = combineInput.__dict__['_args'][:2]
+    body = StandIn('bRepBody', feature)
+    faces = []
+    cylinders = [cylinder for tool in tools._list for cylinder in tool.__dict__.get('_cylinders', ())]
+    for number, (start, radius, end, _) in enumerate(cylinders):
+        if number in missing_cylinders:
+            continue
+        face = StandIn('face', body, index=len(faces))
+        geometry = StandIn('Cylinder', face)
+        geometry._values['radius'] = radius
+        middle = StandIn('Point3D')
+        for axis in 'xyz':
+            middle._values[axis] = (start._values[axis] + end._values[axis]) / 2
+        face._values.update(geometry=geometry, pointOnFace=middle, body=body)
+        faces.append(face)
+    body._values['faces'] = Collection('faces', faces, body)
+    feature._values['bodies'] = Collection('bodies', [body], feature)
+    return feature
+
+
+# Returns the real value an input object that created entity was given for name, or None
+def _input_value(entity: StandIn, name: str):
+    args = getattr(entity, '__dict__', {}).get('_args')
+    if not args or not isinstance(args[0], StandIn):
+        return None
+    value = args[0]._values.get(name)
+    return value._values.get('realValue') if isinstance(value, StandIn) else None
+
+
+def _singleton(kind: str):
+    instance = StandIn(kind)
+    if kind == 'Application':
+        design = StandIn('activeProduct')
+        object.__setattr__(design, '_component', design)
+        instance._values['activeProduct'] = design
+    return instance
+
+
+def _add_attribute(attributes: Attributes, group: str, name: str, value: str):
+    for attribute in attributes._matches(group, name):
+        attribute._values['value'] = value
+        return attribute
+    attribute = StandIn('attribute', attributes)
+    attribute._values.update(groupName=group, name=name, value=value, parent=attributes._parent)
+    recorder.attributes.append(attribute)
+    return attribute
+
+
+# Reads the stand-in's own state without counting it as an API read
+def _matches(attribute: StandIn, group: str, name: str = None):
+    values = attribute._values
+    return values['groupName'] == group and (name is None or values['name'] == name)
+
+
+def _is_valid(entity: StandIn):
+    # Deleting an occurrence deletes what was tagged inside its component
+    if not entity._values.get('isValid', True):
+        return False
+    component = entity._component
+    if component is not None:
+        owners = [occurrence for occurrence in recorder.occurrences if occurrence._values.get('component') is component]
+        if owners and not any(occurrence._values.get('isValid', True) for occurrence in owners):
+            return False
+    return True
+
+
+def _evaluate(expression: str):
+    match = re.fullmatch(r'\s*([-+]?[0-9.]+)\s*([a-z]*)\s*', expression)
+    if not match:
+        return 0.0
+    return float(match.group(1)) * _UNITS.get(match.group(2), 1.0)
+
+
+class _StandInType(type):
+    """Class level members, such as enum values and static methods like cast and create."""
+
+    def __getattr__(cls, name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        members = cls.__dict__.get('_members')
+        if members is None:
+            # A class the add-in derived from a stand-in, such as an event handler
+            raise AttributeError(name)
+        recorder.read(f'{cls.__name__}.{name}')
+        if name not in members:
+            members[name] = Member(name, cls._owner)
+        members[name]._read()
+        return members[name]
+
+
+def namespace(module: str):
+    """Returns a module __getattr__ creating a stand-in class for every name looked up on the module."""
+    classes = {}
+
+    def __getattr__(name: str):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        if name not in classes:
+            cls = _StandInType(name, (StandIn,), {'_members': {}, '__module__': f'adsk.{module}'})
+            cls._owner = StandIn(name)
+            classes[name] = cls
+        return classes[name]
+
+    return __getattr__
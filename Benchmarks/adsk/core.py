@@ -0,0 +1,3 @@
+from ._standin import namespace
+
+__getattr__ = namespace('core')
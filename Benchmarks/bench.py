@@ -0,0 +1,340 @@
+"""Offline build benchmark for the add-ins, run against the recording adsk stand-in.
+
+Runs each create* function for every catalog entry and reports the API calls, property reads and writes,
+stand-in objects, Python allocations, modeled API time and wall time of each case. The API counts are
+compared with baseline.json and the run fails when a case got more expensive or raised an error.
+
+    python Benchmarks/bench.py                 run every case and compare with the baseline
+    python Benchmarks/bench.py -k hub          only run cases whose name contains 'hub'
+    python Benchmarks/bench.py --update        write the current counts as the new baseline
+"""
+import argparse
+import contextlib
+import csv
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+import traceback
+import tracemalloc
+import types
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT_DIR = os.path.dirname(BENCHMARKS_DIR)
+BASELINE_PATH = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+
+# The stand-in has to shadow any real adsk package, and the add-ins are imported as packages from AddIns
+sys.path[:0] = [BENCHMARKS_DIR, os.path.join(ROOT_DIR, 'AddIns')]
+
+from adsk import _standin  # noqa: E402
+from adsk._standin import recorder  # noqa: E402
+
+# Counts that may grow by this share before a case counts as a regression
+TOLERANCE = 0.02
+
+# Spoke lengths in cm used for the standalone spoke cases
+SPOKE_LENGTH = 29.0
+
+# Hex digits of the body from hash cases
+HASH_LENGTHS = (16, 64)
+
+
+def bike_wheel_cases():
+    from BikeWheel.commands.hub import logic as Hub
+    from BikeWheel.commands.rim import logic as Rim
+    from BikeWheel.commands.spoke import logic as Spoke
+    from BikeWheel.commands.wheel import logic as Wheel
+    from BikeWheel.lib import catalog, dxfutils
+
+    parts = catalog.get_catalog()
+
+    def hubLogic(name: str, spokes: int):
+        hub = parts.hub(name)
+        logic = Hub.HubLogic()
+        logic.hubType = Hub.HubType[hub['type']]
+        logic.brakeType = Hub.BrakeType[hub['brake']]
+        logic.axleType = Hub.AxleType[hub['axle']]
+        logic.axleDia = parts.axleDiameter(hub['type'], hub['axle'])
+        logic.old = hub['old']
+        logic.leftFlangeDia = hub['leftFlangeDia']
+        logic.rightFlangeDia = hub['rightFlangeDia']
+        logic.centerToLeftFlange = hub['centerToLeftFlange']
+        logic.centerToRightFlange = hub['centerToRightFlange']
+        logic.spokes = spokes
+        logic.preset = name
+        return logic
+
+    def rimLogic(name: str, size: str, spokes: int, method: str):
+        logic = Rim.RimLogic()
+        logic.rimProfilePath = f'{logic.resource_dir}{parts.rim(name)["profile"]}'
+        logic.rim = name
+        logic.size = size
+        logic.spokeCount = spokes
+        logic.holeMethod = method
+        return logic
+
+    def spokeLogic(butted: bool, diameter: float = 0.2):
+        logic = Spoke.SpokeLogic()
+        logic.length = SPOKE_LENGTH
+        logic.diameter = diameter
+        logic.butted = butted
+        logic.bladed = False
+        logic.straightPull = False
+        return logic
+
+    def wheelLogic(hub: str, rim: str, size: str, spokes: int, crosses: int):
+        logic = Wheel.WheelLogic()
+        logic.hub = hub
+        logic.rim = rim
+        logic.size = size
+        logic.spokes = spokes
+        logic.crosses = crosses
+        logic.hub_logic = hubLogic(hub, spokes)
+        logic.rim_logic = rimLogic(rim, size, spokes, 'combine')
+        logic.spoke_logic = spokeLogic(False)
+        logic.length = Wheel.spoke_length.wheelLengths(parts.hub(hub), parts.rim(rim)['sizes'][size], spokes, crosses)
+        logic.diameter = 0.2
+        return logic
+
+    @contextlib.contextmanager
+    def designType(parametric: bool):
+        # The add-ins share one design, the stand-in's is neither parametric nor direct until it is told
+        import adsk.fusion
+        designType = Rim.design._values.get('designType')
+        if parametric:
+            Rim.design._values['designType'] = adsk.fusion.DesignTypes.ParametricDesignType
+        try:
+            yield
+        finally:
+            Rim.design._values['designType'] = designType
+
+    def missingHoleFace(name: str, size: str, spokes: int, parametric: bool):
+        # The first cylinder of the tool bodies is the spoke hole of hole 1
+        _standin.missing_cylinders.add(0)
+        try:
+            with designType(parametric):
+                jointFaces = Rim.createRim(rimLogic(name, size, spokes, 'combine'))
+        except Exception as error:
+            if parametric or 'rim hole 1 of' not in str(error):
+                raise
+            return
+        finally:
+            _standin.missing_cylinders.clear()
+        assert parametric, 'a direct design cut by combine without a face for hole 1'
+        assert recorder.calls['circularPatternFeatures.add'] == 2, 'the holes were not patterned after the combine cut missed a face'
+        assert len(jointFaces) == spokes and all(jointFaces), 'the patterned rim is missing joint faces'
+
+    def profileMismatch(name: str, size: str, spokes: int):
+        # The DXF index counts loops its own way, a count no imported profile has falls back to the loop scan
+        hollowLoops = dxfutils.hollow_loops
+        dxfutils.hollow_loops = lambda path: 99
+        try:
+            Rim.createRim(rimLogic(name, size, spokes, 'pattern'))
+        finally:
+            dxfutils.hollow_loops = hollowLoops
+        assert recorder.calls['revolveFeatures.createInput'] == 1, 'the rim was not revolved from a fallback profile'
+
+    def spokeLengths():
+        # The NumPy and the pure Python matrix have to agree with each other and with wheelLengths
+        hubs, rims = parts.hubSpecs(), parts.rimSpecs()
+        plain = Wheel.spoke_length.lengthMatrix(hubs, rims, vectorized=False)
+        rows = Wheel.spoke_length.lengthMatrix(hubs, rims)
+        assert [row[:5] for row in rows] == [row[:5] for row in plain], 'the matrices hold different wheels'
+        for (hub, rim, size, spokes, crosses, left, right), row in zip(plain, rows):
+            expected = Wheel.spoke_length.wheelLengths(hubs[hub], rims[rim]['sizes'][size], spokes, crosses)
+            assert max(abs(a - b) for a, b in zip((left, right, *row[5:]), expected * 2)) < 1e-9, f'{row[:5]} is off'
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'lengths.csv')
+            Wheel.spoke_length.exportTable(path, hubs, rims)
+            with open(path, newline='') as file:
+                assert len(list(csv.reader(file))) == len(rows) + 1, 'the table is missing rows'
+
+    def diameterUpdate(hub: str, rim: str, size: str):
+        # Builds a wheel, then runs the command on it again with only a thicker spoke picked
+        logic = wheelLogic(hub, rim, size, 32, 3)
+        Wheel.createWheel(logic)
+        logic.buttedInput = types.SimpleNamespace(value=logic.spoke_logic.butted)
+        logic.diameterInput = types.SimpleNamespace(selectedItem=types.SimpleNamespace(name='2.3 mm'))
+        logic.HandleExecute(None)
+        spokes = Wheel.loadWheel(logic.wheelId)['spokes']
+        assert len(spokes) == 32, 'the update lost spokes'
+        assert all(abs(json.loads(spoke['key'])[1] - 0.23) < 1e-9 for spoke in spokes.values()), 'spokes kept their old diameter'
+
+    def partsUpdate(hub: str, rim: str, size: str, spokes: int, newSize: str, newSpokes: int):
+        # Builds a wheel, then updates it to another size or spoke count, which edits its hub and rim
+        with designType(True):
+            logic = wheelLogic(hub, rim, size, spokes, 3)
+            Wheel.createWheel(logic)
+            before = Wheel.loadWheel(logic.wheelId)
+            update = wheelLogic(hub, rim, newSize, newSpokes, 3)
+            update.wheelId = logic.wheelId
+            Wheel.createWheel(update)
+            after = Wheel.loadWheel(logic.wheelId)
+        assert after['hub'] is before['hub'] and after['rim'] is before['rim'], 'the hub or rim was built again'
+        assert len(after['spokes']) == newSpokes, 'the update left the wrong number of spokes'
+        assert len(Rim.rimHoleFaces(after['rim'])) == newSpokes, 'the rim holes were not tagged again'
+        if newSpokes != spokes:
+            assert Hub.findHubTemplate(hubLogic(hub, newSpokes).key), 'the edited hub is not found for its new spoke count'
+            assert not Hub.findHubTemplate(hubLogic(hub, spokes).key), 'the edited hub is still found for its old spoke count'
+
+    def rimReplaced(hub: str, rim: str, size: str):
+        # Builds a wheel, deletes its rim and runs the update, which builds a rim and leaves the spokes alone
+        logic = wheelLogic(hub, rim, size, 32, 3)
+        Wheel.createWheel(logic)
+        Wheel.loadWheel(logic.wheelId)['rim'].deleteMe()
+        Wheel.createWheel(logic)
+        assert Wheel.loadWheel(logic.wheelId)['rim'], 'the rim was not built again'
+        assert recorder.calls['joints.add'] == 32, 'spokes were joined again for a new rim'
+
+    cases = {}
+    for name in parts.hubSpecs():
+        cases[f'hub {name}'] = lambda name=name: Hub.createHub(hubLogic(name, 32))
+    for name in parts.rimSpecs():
+        for size in parts.sizes(name):
+            spokes = parts.spokeCounts(name)[0]
+            for method in ('combine', 'pattern'):
+                cases[f'rim {name} {size} x {spokes} {method}'] = lambda name=name, size=size, spokes=spokes, method=method: Rim.createRim(rimLogic(name, size, spokes, method))
+    # A combine cut that leaves a hole without a face falls back to patterns, or stops in a direct design
+    name = next(iter(parts.rimSpecs()))
+    size, spokes = parts.sizes(name)[0], parts.spokeCounts(name)[0]
+    for parametric in (True, False):
+        cases[f'rim {name} {size} x {spokes} combine missing face {"parametric" if parametric else "direct"}'] = \
+            lambda name=name, size=size, spokes=spokes, parametric=parametric: missingHoleFace(name, size, spokes, parametric)
+    cases[f'rim {name} {size} x {spokes} profile loops mismatch'] = lambda name=name, size=size, spokes=spokes: profileMismatch(name, size, spokes)
+    cases['spoke lengths'] = spokeLengths
+    for butted in (False, True):
+        cases[f'spoke {"butted" if butted else "plain"}'] = lambda butted=butted: Spoke.createSpoke(spokeLogic(butted))
+    # Every hub once, each laced to the next 32 hole rim in turn
+    rims = [rim for rim in parts.rimSpecs() if 32 in parts.spokeCounts(rim)]
+    for index, hub in enumerate(parts.hubSpecs()):
+        rim = rims[index % len(rims)]
+        size = parts.sizes(rim)[-1]
+        cases[f'wheel {hub} / {rim} {size} x 32'] = lambda hub=hub, rim=rim, size=size: Wheel.createWheel(wheelLogic(hub, rim, size, 32, 3))
+    cases[f'wheel {hub} / {rim} {size} x 32 diameter update'] = lambda hub=hub, rim=rim, size=size: diameterUpdate(hub, rim, size)
+    rim = 'Velocity Dyad'
+    cases[f'wheel {hub} / {rim} 700c x 32 spoke count update'] = lambda hub=hub, rim=rim: partsUpdate(hub, rim, '700c', 32, '700c', 36)
+    cases[f'wheel {hub} / {rim} 700c x 32 size update'] = lambda hub=hub, rim=rim: partsUpdate(hub, rim, '700c', 32, '650b', 32)
+    cases[f'wheel {hub} / {rim} 700c x 32 rim replaced'] = lambda hub=hub, rim=rim: rimReplaced(hub, rim, '700c')
+    return cases
+
+
+def body_from_hash_cases():
+    from BodyFromHash.commands.bodyFromHash import logic, benchmark
+    from BodyFromHash.commands.bodyFromHash.helpers import helpers, pathcache, walk
+
+    def previewPath(hash: str):
+        # The preview walks whatever is typed into the dialog, only building a body may add it to the cache
+        pathCache = logic.pathCache
+        with tempfile.TemporaryDirectory() as directory:
+            logic.pathCache = pathcache.PathCache(directory)
+            try:
+                logic.hashPath('16', hash, persist=False)
+                assert not os.listdir(directory), 'the preview wrote its path to the cache'
+                logic.hashPath('16', hash)
+                assert len(os.listdir(directory)) == 1, 'the path of a built body was not cached'
+            finally:
+                logic.pathCache = pathCache
+
+    cases = {}
+    for hash in benchmark.benchmarkHashes(HASH_LENGTHS):
+        # The walk is computed here so the path cache on disk is left alone
+        number = int(hash, 16)
+        path = walk.simplify(walk.walk(helpers.digits(number, 6), number.bit_length()))
+        for strategy in helpers.PIPE_STRATEGIES:
+            cases[f'body {len(hash)} digits {strategy}'] = lambda hash=hash, path=path, strategy=strategy: logic.createBody('16', hash, path=path, strategy=strategy)
+    cases['body preview path'] = lambda hash=hash: previewPath(hash)
+    return cases
+
+
+def run_case(build):
+    recorder.reset()
+    tracemalloc.start()
+    start = time.perf_counter()
+    error = None
+    try:
+        # The add-ins log to the console as they build
+        with contextlib.redirect_stdout(io.StringIO()):
+            build()
+    except Exception:
+        error = traceback.format_exc(limit=-3).strip().splitlines()[-1]
+    wall = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return {
+        'calls': recorder.total_calls,
+        'reads': recorder.total_reads,
+        'writes': recorder.total_writes,
+        'objects': recorder.objects,
+        'peakKiB': round(peak / 1024, 1),
+        'apiMs': round(recorder.cost, 1),
+        'wallMs': round(wall * 1000, 1),
+        'error': error,
+    }
+
+
+def compare(name: str, result: dict, baseline: dict):
+    """Returns the problems of one case against its baseline entry, any error is one."""
+    if result['error']:
+        return [f'{name}: {result["error"]}']
+    expected = baseline.get(name)
+    if expected is None:
+        return []
+    problems = []
+    for count in ('calls', 'reads', 'writes'):
+        if result[count] > expected[count] * (1 + TOLERANCE):
+            problems.append(f'{name}: {count} went from {expected[count]} to {result[count]}')
+    return problems
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('-k', dest='keyword', default='', help='only run cases whose name contains this')
+    parser.add_argument('--update', action='store_true', help='write the counts of this run as the baseline')
+    options = parser.parse_args(argv)
+
+    cases = {}
+    cases.update(bike_wheel_cases())
+    cases.update(body_from_hash_cases())
+    cases = {name: build for name, build in cases.items() if options.keyword in name}
+
+    try:
+        with open(BASELINE_PATH) as file:
+            baseline = json.load(file)
+    except OSError:
+        baseline = {}
+
+    results = {}
+    problems = []
+    width = max(len(name) for name in cases)
+    print(f"{'case':<{width}}  {'calls':>6}  {'reads':>6}  {'writes':>6}  {'objects':>7}  {'peak KiB':>8}  {'api ms':>8}  {'wall ms':>7}")
+    for name, build in cases.items():
+        result = run_case(build)
+        results[name] = result
+        problems += compare(name, result, baseline)
+        print(f"{name:<{width}}  {result['calls']:>6}  {result['reads']:>6}  {result['writes']:>6}  {result['objects']:>7}  "
+              f"{result['peakKiB']:>8}  {result['apiMs']:>8}  {result['wallMs']:>7}{'  FAILED' if result['error'] else ''}")
+
+    if options.update:
+        failed = [name for name, result in results.items() if result['error']]
+        if failed:
+            print(f'Baseline not written, {len(failed)} cases failed')
+            for name in failed:
+                print(f'{name}: {results[name]["error"]}')
+            return 1
+        baseline.update({name: {count: result[count] for count in ('calls', 'reads', 'writes')}
+                         for name, result in results.items()})
+        with open(BASELINE_PATH, 'w') as file:
+            json.dump(baseline, file, indent=1, sort_keys=True)
+            file.write('\n')
+        print(f'Baseline written to {BASELINE_PATH}')
+        return 0
+
+    for problem in problems:
+        print(problem)
+    return 1 if problems else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -2,7 +2,7 @@
 #Description-
 
 import adsk, adsk.core as core, adsk.fusion as fusion, adsk.cam, traceback
-from .helpers import helpers
+from .helpers import helpers, walk
 defaultHash = '0000000000000000000700ee25d025cf3a2e29706b74b55c0a39d46206c569a2'
 defaultBase = '16'
 
@@ -104,39 +104,20 @@ class BodyFromHash:
         sketch: fusion.Sketch = sketches.add(root.xYConstructionPlane)
         curves = sketch.sketchCurves
         lines = curves.sketchLines
-        position = [0,0,0]
-        prevPositions = [[0,0,0]]
         # origin = points.add(createPoint(position[0], position[1], 0))
         curvesCollection = core.ObjectCollection.create()
 
-        for item in str(base6Hash):
-            direction = helpers.directionFromDigit(item)
-            
-            if direction == 'XPOS': 
-                point2 = [position[0] + 1, position[1], position[2]]
-            elif direction == 'XNEG':
-                point2 = [position[0] - 1, position[1], position[2]]
-            elif direction == 'YPOS': 
-                point2 = [position[0], position[1] + 1, position[2]]
-            elif direction == 'YNEG': 
-                point2 = [position[0], position[1] - 1, position[2]]
-            elif direction == 'ZPOS': 
-                point2 = [position[0], position[1], position[2] + 1]
-            elif direction == 'ZNEG': 
-                point2 = [position[0], position[1], position[2] - 1]
-
-            if point2 in prevPositions:
-                continue
-            line = lines.addByTwoPoints(
-                createPoint(position[0], position[1], position[2]),
-                createPoint(point2[0], point2[1], point2[2])
-                )
+        # Straight runs are merged so the path and sweep only see one curve per corner
+        vertices, removed = walk.simplify(walk.walk(str(base6Hash)))
+        points = [createPoint(x, y, z) for (x, y, z) in walk.points(vertices)]
+
+        line = None
+        for point in points[1:]:
+            line = lines.addByTwoPoints(line.endSketchPoint if line else points[0], point)
             if line is None:
                 alert('Failed to draw line...')
                 return
- 
-            prevPositions.append(point2)
-            position = point2
+
             curvesCollection.add(line)
             adsk.doEvents()
 
@@ -9,23 +9,63 @@ directions = {
     'ZNEG': '5'
 }
 
+DIGITS = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
+# Chunks below base ** (2 ** _LEAF_LEVEL) are converted one divmod per digit, above that they are split in half
+_LEAF_LEVEL = 6
+
 # Convert integer to baseX where x <= 36
 def base(decimal: int, base: int) :
     if base < 2 or base > 36:
         raise Exception('Supplied base must be between 2 and 36')
-    list = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZ"
-    answer = ""
-    while decimal != 0 :
-        answer  += list[decimal % base]
-        decimal //= base
-    return answer[::-1]
+    return ''.join([DIGITS[digit] for digit in digits(decimal, base)])
+
+def digits(decimal: int, base: int):
+    """Yields the digits of a non-negative integer in the given base as ints, most significant first.
+
+    The number is split in half by powers of the base, base ** (2 ** level), so each big division
+    halves the size of what is left instead of taking one digit off the end. Zero yields no digits.
+    """
+    if decimal <= 0:
+        return
+    powers = [base]
+    while powers[-1] <= decimal:
+        powers.append(powers[-1] * powers[-1])
+    yield from _digits(decimal, powers, len(powers) - 1, False)
+
+# Yields the digits of a chunk smaller than powers[level], padded with leading zeros to 2 ** level digits
+# when it is the low half of a larger number
+def _digits(decimal: int, powers: list, level: int, pad: bool):
+    if level <= _LEAF_LEVEL:
+        chunk = []
+        while decimal:
+            decimal, digit = divmod(decimal, powers[0])
+            chunk.append(digit)
+        if pad:
+            chunk.extend([0] * ((1 << level) - len(chunk)))
+        yield from reversed(chunk)
+        return
+    high, low = divmod(decimal, powers[level - 1])
+    if high or pad:
+        yield from _digits(high, powers, level - 1, pad)
+        yield from _digits(low, powers, level - 1, True)
+    else:
+        yield from _digits(low, powers, level - 1, False)
 
 def directionFromDigit(digit: str):
     for key, value in directions.items():
         if digit == value:
             return key
 
-def createPipe(comp: fusion.Component, curves: fusion.SketchCurves, radius: int, pipeThickness: int):
+# Ways createPipe can build the hollow tube
+# shell   -- sweep a solid circle, then shell it open through the start and end faces
+# annular -- sweep a ring of two circles, so the tube is hollow from a single feature
+# pipe    -- a hollow pipe feature straight from the path, no profile sketch needed
+PIPE_STRATEGIES = ('shell', 'annular', 'pipe')
+
+def createPipe(comp: fusion.Component, curves: fusion.SketchCurves, radius: int, pipeThickness: int, strategy: str = 'shell'):
+    if strategy not in PIPE_STRATEGIES:
+        raise Exception(f'Unknown pipe strategy {strategy}, expected one of {", ".join(PIPE_STRATEGIES)}')
+
     # create path
     feats = comp.features
     chainedOption = fusion.ChainedCurveOptions.connectedChainedCurves
@@ -33,6 +73,15 @@ def createPipe(comp: fusion.Component, curves: fusion.SketchCurves, radius: int,
         chainedOption = fusion.ChainedCurveOptions.tangentChainedCurves
     path = fusion.Path.create(curves, chainedOption)
     path = feats.createPath(curves)
+
+    if strategy == 'pipe':
+        pipeFeats = feats.pipeFeatures
+        pipeInput = pipeFeats.createInput(path, fusion.FeatureOperations.NewBodyFeatureOperation)
+        pipeInput.sectionType = fusion.PipeSectionTypes.CircularPipeSectionType
+        pipeInput.sectionSize = core.ValueInput.createByReal(radius * 2)
+        pipeInput.isHollow = True
+        pipeInput.sectionThickness = core.ValueInput.createByReal(pipeThickness)
+        return pipeFeats.add(pipeInput)
     
     # create profile
     planes = comp.constructionPlanes
@@ -45,14 +94,23 @@ def createPipe(comp: fusion.Component, curves: fusion.SketchCurves, radius: int,
     
     center = plane.geometry.origin
     center = sketch.modelToSketchSpace(center)
-    sketch.sketchCurves.sketchCircles.addByCenterRadius(center, radius)
+    circles = sketch.sketchCurves.sketchCircles
+    circles.addByCenterRadius(center, radius)
     profile = sketch.profiles[0]
+    if strategy == 'annular':
+        circles.addByCenterRadius(center, radius - pipeThickness)
+        # The ring is the profile with an inner loop, the other one is the inner disc
+        for candidate in sketch.profiles:
+            if candidate.profileLoops.count == 2:
+                profile = candidate
     
     # create sweep
     sweepFeats = feats.sweepFeatures
     sweepInput = sweepFeats.createInput(profile, path, fusion.FeatureOperations.NewBodyFeatureOperation)
     sweepInput.orientation = fusion.SweepOrientationTypes.PerpendicularOrientationType
     sweepFeat = sweepFeats.add(sweepInput)
+    if strategy == 'annular':
+        return sweepFeat
     
     # create shell
     startFaces = sweepFeat.startFaces
@@ -72,4 +130,4 @@ def createPipe(comp: fusion.Component, curves: fusion.SketchCurves, radius: int,
     shellFeats = feats.shellFeatures
     shellInput = shellFeats.createInput(objCol, False)
     shellInput.insideThickness = core.ValueInput.createByReal(pipeThickness)
-    shellFeats.add(shellInput)
+    return shellFeats.add(shellInput)
@@ -0,0 +1,88 @@
+# Self-avoiding lattice walk used to turn a base 6 digit string into a path.
+# This module does not depend on adsk so paths can be computed (and tested) outside of Fusion.
+from array import array
+
+# Unit step for each base 6 digit, in the same order as helpers.directions
+# (XPOS, XNEG, YPOS, YNEG, ZPOS, ZNEG).
+STEPS = (
+    (1, 0, 0),
+    (-1, 0, 0),
+    (0, 1, 0),
+    (0, -1, 0),
+    (0, 0, 1),
+    (0, 0, -1),
+)
+
+
+def walk(digits, maxSteps: int = None) -> array:
+    """Walks the lattice one unit step per digit, skipping steps onto points already visited.
+
+    Arguments:
+    digits -- An iterable of base 6 digits, either characters '0'-'5' or ints 0-5.
+    maxSteps -- An upper bound on the number of digits. When given, digits can be a generator
+                that is consumed as the walk goes instead of being collected into a list first.
+
+    :returns:
+        A flat array of the visited vertex coordinates [x0, y0, z0, x1, y1, z1, ...],
+        starting at the origin.
+    """
+    if maxSteps is None:
+        if not isinstance(digits, (str, bytes, bytearray, list, tuple)):
+            digits = list(digits)
+        maxSteps = len(digits)
+
+    # Pack x, y and z into one int so the visited set hashes a single int instead of a tuple.
+    # Each coordinate is offset to stay positive and gets enough bits to never carry into the next one.
+    bits = max(maxSteps, 1).bit_length() + 2
+    offset = 1 << (bits - 1)
+    mask = (1 << bits) - 1
+    deltas = [dx + (dy << bits) + (dz << (2 * bits)) for dx, dy, dz in STEPS]
+    table = {}
+    for digit, delta in enumerate(deltas):
+        table[digit] = delta
+        table[str(digit)] = delta
+        table[ord(str(digit))] = delta
+
+    position = offset + (offset << bits) + (offset << (2 * bits))
+    visited = {position}
+    path = [position]
+    for digit in digits:
+        nextPosition = position + table[digit]
+        if nextPosition in visited:
+            continue
+        visited.add(nextPosition)
+        path.append(nextPosition)
+        position = nextPosition
+
+    vertices = array('i', bytes(12 * len(path)))
+    for index, packed in enumerate(path):
+        vertices[index * 3] = (packed & mask) - offset
+        vertices[index * 3 + 1] = ((packed >> bits) & mask) - offset
+        vertices[index * 3 + 2] = (packed >> (2 * bits)) - offset
+    return vertices
+
+
+def points(vertices: array):
+    """Splits a flat vertex array into (x, y, z) tuples."""
+    return list(zip(vertices[0::3], vertices[1::3], vertices[2::3]))
+
+
+def simplify(vertices: array):
+    """Merges runs of steps in the same direction into single segments.
+
+    :returns:
+        A tuple of (vertices, removed) where vertices only keeps the corners of the path
+        and removed is the number of segments that were merged away.
+    """
+    path = points(vertices)
+    if len(path) < 3:
+        return array('i', vertices), 0
+
+    corners = array('i', path[0])
+    for previous, current, following in zip(path, path[1:], path[2:]):
+        incoming = (current[0] - previous[0], current[1] - previous[1], current[2] - previous[2])
+        outgoing = (following[0] - current[0], following[1] - current[1], following[2] - current[2])
+        if incoming != outgoing:
+            corners.extend(current)
+    corners.extend(path[-1])
+    return corners, len(path) - len(corners) // 3